@@ -0,0 +1,31 @@
+import tkinter as tk
+from tkinter import filedialog
+from deepfake_analyses.screening import count_exclusions, screen_export
+
+def select_csv_file():
+    root = tk.Tk()
+    root.withdraw()  # Hide the root window
+    file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
+    if not file_path:
+        print("No file selected.")
+        return None
+    return file_path
+
+def main():
+    file_path = select_csv_file()
+    if not file_path:
+        return
+
+    save_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+    if not save_path:
+        print("File save cancelled.")
+        return
+
+    # Flag speeders, straight-liners and out-of-range answers; the loader of 3_ to 5_ drops them
+    flags = screen_export(file_path, save_path)
+    for reason, count in count_exclusions(flags).items():
+        print(f"{reason}: {count}")
+    print(f"Screened CSV file saved to {save_path}")
+
+if __name__ == "__main__":
+    main()
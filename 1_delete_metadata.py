@@ -1,6 +1,7 @@
 import pandas as pd
 import tkinter as tk
 from tkinter import filedialog
+from deepfake_analyses.survey import additional_columns_to_delete, initial_columns_to_delete
 
 def confirm_action(prompt):
     while True:
@@ -38,12 +39,8 @@ def main():
     print("Initial DataFrame:")
     print(df.head())  # Show the initial part of the DataFrame for confirmation
     
-    initial_columns_to_delete = ["StartDate", "EndDate", "Status", "IPAddress", "Progress", "Duration (in seconds)"]
     df = delete_columns(df, initial_columns_to_delete)
     
-    additional_columns_to_delete = ["RecordedDate", "ResponseId", "RecipientLastName", "RecipientFirstName", 
-                                    "RecipientEmail", "ExternalReference", "LocationLatitude", "LocationLongitude", 
-                                    "DistributionChannel", "UserLanguage"]
     df = delete_columns(df, additional_columns_to_delete)
 
     print("Modified DataFrame:")
@@ -2,6 +2,7 @@ import pandas as pd
 import tkinter as tk
 from tkinter import filedialog
 import json
+from deepfake_analyses.cleaning import apply_recode_mappings, recode_column
 
 def select_csv_file():
     root = tk.Tk()
@@ -40,10 +41,6 @@ def get_recode_mapping():
         mapping[old_value] = new_value
     return mapping
 
-def recode_column(df, column_name, mapping):
-    df[column_name] = df[column_name].replace(mapping)
-    return df
-
 def save_recode_mappings(mappings):
     file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json")])
     if file_path:
@@ -64,15 +61,6 @@ def load_recode_mappings():
         print("Loading recode mappings cancelled.")
         return None
 
-def apply_recode_mappings(df, mappings):
-    for column, mapping in mappings.items():
-        if column in df.columns:
-            df = recode_column(df, column, mapping)
-            print(f"Recode mapping applied to column '{column}'.")
-        else:
-            print(f"Column '{column}' not found in the DataFrame.")
-    return df
-
 def main():
     load_choice = input("Do you want to load recode mappings from a file? (y/n): ").strip().lower()
     if load_choice == 'y':
@@ -0,0 +1,36 @@
+# Shared analysis code used by the numbered scripts, also usable as a library:
+#   from deepfake_analyses import load_and_filter_data, analyze_stances
+# The names below are imported from their modules on first use, so importing the package
+# loads nothing; matplotlib, scipy and statsmodels are only loaded by what needs them.
+import importlib
+
+_exports = {
+    'survey': ['load_survey', 'load_and_filter_data', 'filter_finished', 'valid_responses',
+               'pre_influence_cols', 'post_influence_cols', 'stance_titles', 'descriptions'],
+    'stances': ['analyze_stances'],
+    'transitions': ['transition_tables', 'merge_transition_tables', 'transition_test', 'sign_counts'],
+    'blocks': ['available_blocks', 'describe_block', 'describe_blocks', 'aggregate_deepfake_blocks',
+               'filter_and_separate_columns', 'calculate_means_and_ttests', 'compare_biden_trump', 'print_results'],
+    'regression': ['load_data_from_json', 'prepare_data', 'rating_groups', 'perform_regression',
+                   'credibility_sharing_regression'],
+    'correlation': ['correlation_matrices', 'reliability_table'],
+    'multiverse': ['run_multiverse'],
+    'features': ['respondent_features', 'load_features', 'join_features'],
+    'batch': ['load_surveys', 'load_score_sets', 'analyze_surveys', 'regress_score_sets',
+              'stance_table', 'comparison_table', 'coefficient_table'],
+}
+_modules = {name: module for module, names in _exports.items() for name in names}
+
+__all__ = list(_modules)
+
+
+def __getattr__(name):
+    if name not in _modules:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'{__name__}.{_modules[name]}'), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
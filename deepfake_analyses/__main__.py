@@ -0,0 +1,3 @@
+from deepfake_analyses.cli import main
+
+main()
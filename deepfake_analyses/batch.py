@@ -0,0 +1,86 @@
+import contextlib
+import io
+import os
+
+import pandas as pd
+
+from deepfake_analyses import trace
+from deepfake_analyses.blocks import aggregate_deepfake_blocks, compare_biden_trump, describe_blocks
+from deepfake_analyses.multiverse import regression_terms
+from deepfake_analyses.regression import load_data_from_json, perform_regression, prepare_data, rating_groups
+from deepfake_analyses.stances import analyze_stances
+from deepfake_analyses.survey import load_and_filter_data, post_influence_cols, pre_influence_cols, stance_titles
+
+# The 3_ to 5_ analyses over many datasets in one interpreter, for use from Python:
+#   results = analyze_surveys(load_surveys(['wave1.csv', 'wave2.csv']))
+#   stance_table(results)
+# Datasets are {name: DataFrame} or {name: score list}; every function returns per-dataset
+# results under the same names, and the *_table functions put them side by side.
+
+
+# Name of a dataset after its file, e.g. 'wave1' for data/wave1.csv
+def dataset_name(file_path):
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+# Valid responses of every recoded survey, {name: DataFrame}
+def load_surveys(file_paths):
+    return {dataset_name(path): load_and_filter_data(path) for path in file_paths}
+
+
+# Score lists of every 5_ JSON file, {name: data}
+def load_score_sets(file_paths):
+    return {dataset_name(path): load_data_from_json(path) for path in file_paths}
+
+
+# 3_ stance t-tests, 4_ block descriptives, aggregates and Biden vs. Trump comparison of every
+# survey, {name: {'stances': ..., 'blocks': ..., 'aggregate': ..., 'comparison': ...}}. What
+# the analyses print is discarded.
+@trace.traced
+def analyze_surveys(surveys, cluster=False):
+    results = {}
+    for name, df in surveys.items():
+        with trace.span('survey', dataset=name), contextlib.redirect_stdout(io.StringIO()):
+            results[name] = {
+                'stances': analyze_stances(df, pre_influence_cols, post_influence_cols, stance_titles),
+                'blocks': describe_blocks(df),
+                'aggregate': aggregate_deepfake_blocks(df),
+                'comparison': compare_biden_trump(df, cluster=cluster),
+            }
+    return results
+
+
+# 5_ politician x stance regression of every score set, {name: fitted model}
+@trace.traced
+def regress_score_sets(score_sets, engine='numpy', cluster=False, video_effects=False):
+    models = {}
+    for name, data in score_sets.items():
+        X, y = prepare_data(data)
+        respondents, videos = rating_groups(data) if engine == 'mixed' or cluster else (None, None)
+        models[name] = perform_regression(X, y, engine=engine, respondents=respondents,
+                                          videos=videos if video_effects else None, cluster=cluster)
+    return models
+
+
+# t and p of every stance test, one row per dataset and stance
+def stance_table(results):
+    rows = {(name, stance_titles[key]): {'t': float(t_stat), 'p': float(p_val)}
+            for name, result in results.items() for key, (t_stat, p_val) in result['stances'].items()}
+    return pd.DataFrame.from_dict(rows, orient='index').rename_axis(['dataset', 'stance'])
+
+
+# Biden vs. Trump means, medians and p-value of every question type, one row per dataset and type
+def comparison_table(results):
+    rows = {(name, question): values for name, result in results.items() for question, values in result['comparison'].items()}
+    return pd.DataFrame.from_dict(rows, orient='index').rename_axis(['dataset', 'question'])
+
+
+# Coefficient, standard error and p-value of every term, one row per dataset and term; the
+# ordinal model has thresholds instead of a constant
+def coefficient_table(models):
+    rows = {}
+    for name, model in models.items():
+        terms = regression_terms[-len(model.params):]
+        for i, term in enumerate(terms):
+            rows[(name, term)] = {'coef': model.params[i], 'std err': model.bse[i], 'p': model.pvalues[i]}
+    return pd.DataFrame.from_dict(rows, orient='index').rename_axis(['dataset', 'term'])
@@ -0,0 +1,135 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from deepfake_analyses.synthetic import generate_export, generate_scores
+
+# Stages timed by default; 'startup' is the cold start of the CLI itself
+default_stages = ['startup', 'screen', 'delete-metadata', 'recode', 'stances', 'blocks', 'aggregate', 'comparison',
+                  'analyze', 'regression-confbi', 'regression-cred']
+
+
+# Runs the CLI and reports the peak RSS of this process image on stderr. Linux keeps
+# ru_maxrss across fork and exec, so the parent's rusage would include its own peak.
+_CHILD = """
+import atexit, sys
+
+def _report_peak():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    sys.stderr.write('\\n__peak_rss_kb__ ' + line.split()[1] + '\\n')
+    except OSError:
+        pass
+
+atexit.register(_report_peak)
+from deepfake_analyses.cli import main
+main(sys.argv[1:])
+"""
+
+
+# Command line of one stage on the files prepared for one size
+def _stage_command(stage, files):
+    command = [sys.executable, '-c', _CHILD]
+    if stage == 'startup':
+        return command + ['--help']
+    if stage == 'screen':
+        return command + [stage, '--input', files['export'], '--output', files['screened']]
+    if stage == 'delete-metadata':
+        return command + [stage, '--input', files['export'], '--output', files['cleaned']]
+    if stage == 'recode':
+        return command + [stage, '--input', files['cleaned'], '--mappings', files['mappings'], '--output', files['recoded']]
+    if stage.startswith('regression'):
+        command += [stage, '--input', files['credible']]
+        return command + (['--share', files['share']] if stage == 'regression-cred' else [])
+    return command + [stage, '--input', files['recoded']]
+
+
+# Run one command headlessly and measure its wall time and peak resident memory.
+# Uses os.wait4, so this only runs on Unix.
+def measure(command):
+    env = {**os.environ, 'MPLBACKEND': 'Agg'}
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=env)
+    stderr = process.stderr.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    wall_seconds = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    stderr = stderr.decode(errors='replace')
+    marker = stderr.rfind('__peak_rss_kb__ ')
+    if marker >= 0:
+        peak_rss_mb = int(stderr[marker:].split()[1]) / 1024
+        stderr = stderr[:marker]
+    else:
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        peak_rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    return {'wall_seconds': wall_seconds, 'peak_rss_mb': peak_rss_mb, 'returncode': process.returncode,
+            'error': stderr[-2000:] if process.returncode else ''}
+
+
+# Synthetic inputs for one size, generated once and reused by later runs
+def prepare_inputs(workdir, respondents, missing_rate=0.05, seed=0):
+    prefix = os.path.join(workdir, f'synthetic_{respondents}')
+    files = {
+        'export': f'{prefix}_export.csv',
+        'screened': f'{prefix}_screened.csv',
+        'cleaned': f'{prefix}_cleaned.csv',
+        'recoded': f'{prefix}_recoded.csv',
+        'mappings': os.path.join(workdir, 'no_recoding.json'),
+        'credible': f'{prefix}_credible.json',
+        'share': f'{prefix}_share.json',
+    }
+    os.makedirs(workdir, exist_ok=True)
+    if not os.path.exists(files['export']):
+        generate_export(files['export'], respondents, missing_rate=missing_rate, seed=seed)
+    if not os.path.exists(files['credible']):
+        generate_scores(files['credible'], files['share'], respondents, missing_rate=missing_rate, seed=seed)
+    with open(files['mappings'], 'w') as f:
+        json.dump({}, f)
+    return files
+
+
+# Time every stage for every size; stages run in pipeline order so each one finds its input
+def run_benchmarks(sizes, workdir, stages=None, missing_rate=0.05, repeat=1):
+    stages = stages or default_stages
+    records = []
+    for respondents in sizes:
+        # The cold start reads no input, so timing only it generates nothing
+        files = prepare_inputs(workdir, respondents, missing_rate=missing_rate) if set(stages) - {'startup'} else {}
+        for stage in stages:
+            for run in range(repeat):
+                record = {'stage': stage, 'respondents': respondents, 'run': run}
+                record.update(measure(_stage_command(stage, files)))
+                records.append(record)
+                print(f"{stage:<20} {respondents:>10d} {record['wall_seconds']:10.3f} s {record['peak_rss_mb']:10.1f} MB"
+                      + ("" if record['returncode'] == 0 else f"  FAILED ({record['returncode']})"))
+    return records
+
+
+# Stages that failed or whose best run over the repeats took longer than max_seconds or more
+# than max_mb of peak memory, one message each; e.g. a cold start that imports pandas again
+def check_limits(records, max_seconds=None, max_mb=None):
+    best = {}
+    for record in records:
+        key = (record['stage'], record['respondents'])
+        seconds, mb, failed = best.get(key, (float('inf'), float('inf'), False))
+        best[key] = (min(seconds, record['wall_seconds']), min(mb, record['peak_rss_mb']), failed or record['returncode'] != 0)
+
+    problems = []
+    for (stage, respondents), (seconds, mb, failed) in best.items():
+        if failed:
+            problems.append(f"{stage} ({respondents} respondents) failed")
+        if max_seconds is not None and seconds > max_seconds:
+            problems.append(f"{stage} ({respondents} respondents) took {seconds:.3f} s, the limit is {max_seconds} s")
+        if max_mb is not None and mb > max_mb:
+            problems.append(f"{stage} ({respondents} respondents) used {mb:.1f} MB, the limit is {max_mb} MB")
+    return problems
+
+
+def save_records(records, file_path):
+    with open(file_path, 'w') as f:
+        json.dump(records, f, indent=2)
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+from deepfake_analyses import npstats, trace
+from deepfake_analyses.survey import blocks, mapping_questions, mapping_share
+
+question_types = {
+    '__1': 'real',
+    '__2': 'credible',
+    '__3': 'deepfake',
+    '_share': 'sharing intention'
+}
+
+
+# Map numerical values to descriptions
+def map_values(value, mapping):
+    lower = int(np.floor(value))
+    upper = int(np.ceil(value))
+    if lower == upper:
+        return mapping[lower]
+    return f"{mapping[lower]} - {mapping[upper]}"
+
+
+# Question blocks whose four columns are all present in the export
+def available_blocks(df):
+    return {block: questions for block, questions in blocks.items() if all(q in df.columns for q in questions)}
+
+
+# Readable descriptors of a block's question columns
+def column_descriptors(columns, block):
+    descriptors = []
+    for q in columns:
+        if q.endswith('__1'):
+            descriptors.append(f"{block} real")
+        elif q.endswith('__2'):
+            descriptors.append(f"{block} credible")
+        elif q.endswith('__3'):
+            descriptors.append(f"{block} deepfake_belief")
+        elif q.endswith('_share'):
+            descriptors.append(f"{block} sharing intention")
+    return descriptors
+
+
+# Descriptive statistics of one block with readable column descriptors
+@trace.traced
+def describe_block(block_data, block):
+    block_data_described = block_data.describe().loc[['mean', 'std', 'min', '25%', '50%', '75%', 'max']]
+    block_data_described.columns = column_descriptors(block_data.columns, block)
+    return block_data_described
+
+
+# Mean of every column translated back to its answer label
+def describe_mean_text(block_data_described):
+    return pd.DataFrame([map_values(val, mapping_questions if 'sharing intention' not in col else mapping_share) for val, col in zip(block_data_described.loc['mean'], block_data_described.columns)], index=block_data_described.columns, columns=['mean_txt']).T
+
+
+# Descriptive statistics of every available block
+def describe_blocks(df):
+    return {block: describe_block(df[questions], block) for block, questions in available_blocks(df).items()}
+
+
+# Global means and medians per question type over all deepfake blocks
+@trace.traced
+def aggregate_deepfake_blocks(df, exclude='Trump_Bonus'):
+    deepfake_blocks = [questions for block, questions in available_blocks(df).items() if block != exclude]
+
+    global_means = {}
+    global_medians = {}
+    for position, question_type in enumerate(question_types.values()):
+        columns = [questions[position] for questions in deepfake_blocks]
+        values = df[columns].to_numpy(dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        global_means[question_type] = values.mean() if values.size else np.nan
+        global_medians[question_type] = np.median(values) if values.size else np.nan
+
+    return aggregated_frame(global_means, global_medians)
+
+
+# Mean and median rows per question type, labelled like the aggregated block columns
+def aggregated_frame(global_means, global_medians):
+    aggregated_df = pd.DataFrame([global_means, global_medians]).T
+    aggregated_df.columns = ['Mean', 'Median']
+    aggregated_df = aggregated_df.T
+
+    aggregated_df.columns = [
+        '__real',
+        '__credible',
+        '__deepfake_belief',
+        '__sharing intention'
+    ]
+    return aggregated_df
+
+
+# Filter out non-deepfake columns and separate Trump and Biden columns
+def filter_and_separate_columns(df):
+    # Exclude Trump_Bonus (real video)
+    columns_to_exclude = [col for col in df.columns if 'Trump_Bonus' in col]
+    df_filtered = df.drop(columns=columns_to_exclude)
+
+    # Separate Trump and Biden columns
+    biden_columns = [col for col in df_filtered.columns if 'Biden' in col]
+    trump_columns = [col for col in df_filtered.columns if 'Trump' in col and 'Bonus' not in col]
+
+    return df_filtered, biden_columns, trump_columns
+
+
+# Calculate means, medians, and perform t-tests. Every respondent rates several videos of each
+# politician; cluster=True clusters the t-test by respondent instead of treating all ratings
+# as independent.
+@trace.traced
+def calculate_means_and_ttests(df, biden_columns, trump_columns, cluster=False):
+    results = {}
+
+    for question in question_types:
+        biden_ratings = df[biden_columns].filter(like=question).to_numpy(dtype=float)
+        trump_ratings = df[trump_columns].filter(like=question).to_numpy(dtype=float)
+        biden_responses = biden_ratings.flatten()
+        trump_responses = trump_ratings.flatten()
+
+        # Calculate means and medians
+        biden_mean = np.nanmean(biden_responses)
+        trump_mean = np.nanmean(trump_responses)
+        biden_median = np.nanmedian(biden_responses)
+        trump_median = np.nanmedian(trump_responses)
+
+        # Perform t-test
+        if cluster:
+            t_stat, p_val = npstats.cluster_ttest_ind(biden_ratings, trump_ratings)
+        else:
+            t_stat, p_val = npstats.ttest_ind(biden_responses, trump_responses)
+        results[question] = {'biden_mean': biden_mean, 'trump_mean': trump_mean, 'biden_median': biden_median, 'trump_median': trump_median, 'p_val': p_val}
+
+    return results
+
+
+# Biden vs. Trump deepfake comparison without copying the survey first
+def compare_biden_trump(df, cluster=False):
+    biden_columns = [col for col in df.columns if 'Biden' in col]
+    trump_columns = [col for col in df.columns if 'Trump' in col and 'Bonus' not in col]
+    return calculate_means_and_ttests(df, biden_columns, trump_columns, cluster=cluster)
+
+
+def print_results(results):
+    print("Question & Biden Mean & Trump Mean & Biden Median & Trump Median & p-value")
+    for question, result in results.items():
+        question_label = question.replace('__', '').replace('_', '')
+        biden_mean = result['biden_mean']
+        trump_mean = result['trump_mean']
+        biden_median = result['biden_median']
+        trump_median = result['trump_median']
+        p_val = result['p_val']
+        print(f"{question_label} & {biden_mean:.2f} & {trump_mean:.2f} & {biden_median:.2f} & {trump_median:.2f} & {p_val:.4f}")
@@ -0,0 +1,31 @@
+import json
+
+from deepfake_analyses import trace
+
+
+# Drop the given columns, ignoring the ones the export does not contain
+@trace.traced
+def drop_columns(df, columns):
+    existing_columns = [col for col in columns if col in df.columns]
+    return df.drop(columns=existing_columns), existing_columns
+
+
+def recode_column(df, column_name, mapping):
+    df[column_name] = df[column_name].replace(mapping)
+    return df
+
+
+def load_recode_mappings(file_path):
+    with open(file_path, 'r') as f:
+        return json.load(f)
+
+
+@trace.traced
+def apply_recode_mappings(df, mappings):
+    for column, mapping in mappings.items():
+        if column in df.columns:
+            df = recode_column(df, column, mapping)
+            print(f"Recode mapping applied to column '{column}'.")
+        else:
+            print(f"Column '{column}' not found in the DataFrame.")
+    return df
@@ -0,0 +1,771 @@
+import argparse
+import os
+
+# Every stage imports its analysis modules inside the handler, so that starting the
+# CLI, or running one stage, only loads the libraries that stage actually needs.
+
+
+def run_screen(args):
+    from deepfake_analyses.cleaning import load_recode_mappings
+    from deepfake_analyses.screening import count_exclusions, exclusion_flags, screen_export
+
+    flags = screen_export(args.input, args.output, speeder_fraction=args.speeder_fraction,
+                          min_duration=args.min_duration, min_answered=args.min_answered,
+                          mappings=load_recode_mappings(args.mappings) if args.mappings else None)
+    counts = count_exclusions(flags)
+    for reason in exclusion_flags:
+        print(f"{reason}: {counts[reason]}")
+    print(f"{counts['excluded']} of {len(flags)} responses flagged for exclusion.")
+    print(f"Screened CSV file saved to {args.output}")
+
+
+def run_delete_metadata(args):
+    from deepfake_analyses.cleaning import drop_columns
+    from deepfake_analyses.survey import additional_columns_to_delete, initial_columns_to_delete, read_csv
+
+    df = read_csv(args.input)
+    df, deleted = drop_columns(df, initial_columns_to_delete + additional_columns_to_delete)
+    print(f"Columns {', '.join(deleted)} deleted successfully.")
+    df.to_csv(args.output, index=False)
+    print(f"Modified CSV file saved to {args.output}")
+
+
+def run_recode(args):
+    from deepfake_analyses.cleaning import apply_recode_mappings, load_recode_mappings
+    from deepfake_analyses.survey import read_csv
+
+    df = read_csv(args.input)
+    df = apply_recode_mappings(df, load_recode_mappings(args.mappings))
+    df.to_csv(args.output, index=False)
+    print(f"Modified CSV file saved to {args.output}")
+
+
+def run_stances(args):
+    from deepfake_analyses.stances import analyze_stances
+    from deepfake_analyses.survey import (descriptions, load_and_filter_data, post_influence_cols,
+                                          pre_influence_cols, stance_titles)
+
+    plot = None
+    if args.plot:
+        from deepfake_analyses.plots import plot_transitions
+
+        def plot(table, key):
+            plot_transitions(table, stance_titles[key], descriptions[stance_titles[key]])
+
+    df_filtered = load_and_filter_data(args.input)
+    return analyze_stances(df_filtered, pre_influence_cols, post_influence_cols, stance_titles, plot=plot)
+
+
+def run_blocks(args):
+    from deepfake_analyses.blocks import available_blocks, describe_block
+    from deepfake_analyses.survey import load_and_filter_data
+
+    df_filtered = load_and_filter_data(args.input)
+    described = {}
+    for block, questions in available_blocks(df_filtered).items():
+        block_data = df_filtered[questions]
+        described[block] = describe_block(block_data, block)
+        print(f"\nDescriptive Statistics for {block} (Numerical Values):")
+        print(described[block])
+
+        if args.plot and not args.grid:
+            from deepfake_analyses.plots import plot_custom_boxplot
+            plot_custom_boxplot(block_data, block)
+
+    if args.grid:
+        from deepfake_analyses.plots import plot_block_grid
+        plot_block_grid(df_filtered, args.grid, cols=args.cols, per_page=args.per_page)
+        print(f"Block boxplots saved to {args.grid}")
+    return described
+
+
+def run_aggregate(args):
+    from deepfake_analyses.blocks import aggregate_deepfake_blocks, available_blocks
+    from deepfake_analyses.survey import load_and_filter_data
+
+    df_filtered = load_and_filter_data(args.input)
+    aggregate_labels = ['__real?', '__credible?', '__deepfake?', '__sharing intention']
+    described = {}
+
+    trump_bonus_block = "Trump_Bonus"
+    bonus_questions = available_blocks(df_filtered).get(trump_bonus_block)
+    if bonus_questions is not None:
+        block_data = df_filtered[bonus_questions]
+        described[trump_bonus_block] = block_data.describe()
+        print(f"\nDescriptive Statistics for {trump_bonus_block} (Numerical Values):")
+        print(described[trump_bonus_block])
+        if args.plot:
+            from deepfake_analyses.plots import plot_custom_boxplot
+            plot_custom_boxplot(block_data, 'All Real Videos', x_labels=aggregate_labels, fontsize=12)
+
+    aggregated_df = aggregate_deepfake_blocks(df_filtered, exclude=trump_bonus_block)
+    described['Deepfakes'] = aggregated_df
+    print("\nDescriptive Statistics for aggregated deepfake videos (Numerical Values):")
+    print(aggregated_df)
+    if args.plot:
+        from deepfake_analyses.plots import plot_custom_boxplot
+        plot_custom_boxplot(aggregated_df, 'All Deepfake Videos', x_labels=aggregate_labels, fontsize=12)
+    return described
+
+
+def run_comparison(args):
+    from deepfake_analyses.blocks import calculate_means_and_ttests, filter_and_separate_columns, print_results
+    from deepfake_analyses.survey import load_and_filter_data
+
+    df_filtered = load_and_filter_data(args.input)
+    df_filtered, biden_columns, trump_columns = filter_and_separate_columns(df_filtered)
+    results = calculate_means_and_ttests(df_filtered, biden_columns, trump_columns, cluster=args.cluster)
+    print_results(results)
+
+    if args.plot:
+        from deepfake_analyses.plots import plot_combined_boxplots
+        plot_combined_boxplots(df_filtered, biden_columns, trump_columns, results)
+    return results
+
+
+def run_analyze(args):
+    from deepfake_analyses.blocks import aggregate_deepfake_blocks, compare_biden_trump, describe_blocks, print_results
+    from deepfake_analyses.shared import run_on_shared_survey
+    from deepfake_analyses.stances import analyze_stances
+    from deepfake_analyses.survey import load_and_filter_data, post_influence_cols, pre_influence_cols, stance_titles
+
+    tasks = {
+        'stances': (analyze_stances, (pre_influence_cols, post_influence_cols, stance_titles)),
+        'blocks': (describe_blocks, ()),
+        'aggregate': (aggregate_deepfake_blocks, ()),
+        'comparison': (compare_biden_trump, ()),
+    }
+    results = run_on_shared_survey(load_and_filter_data(args.input), tasks, jobs=args.jobs)
+
+    print(results['stances'][1], end='')
+    for block, block_data_described in results['blocks'][0].items():
+        print(f"\nDescriptive Statistics for {block} (Numerical Values):")
+        print(block_data_described)
+    print("\nDescriptive Statistics for aggregated deepfake videos (Numerical Values):")
+    print(results['aggregate'][0])
+    print()
+    print_results(results['comparison'][0])
+
+
+def run_regression(args):
+    from deepfake_analyses.regression import load_data_from_json, perform_regression, prepare_data, rating_groups
+
+    data = load_data_from_json(args.input)
+    X, y = prepare_data(data)
+    respondents, videos = rating_groups(data) if args.engine == 'mixed' or args.cluster else (None, None)
+    if args.covariates:
+        if not args.features:
+            raise ValueError("--covariates needs the feature table of the survey (--features), see the features stage.")
+        from deepfake_analyses.features import join_features, load_features
+        X, y, respondents, videos = join_features(X, y, data, load_features(args.features), args.covariates,
+                                                  respondents=respondents, videos=videos)
+    model = perform_regression(X, y, engine=args.engine, respondents=respondents,
+                               videos=videos if args.video_effects else None, cluster=args.cluster)
+    print(model.summary())
+
+    if args.plot and args.engine == 'ordinal':
+        print("The interaction plots show OLS predictions, run without --engine ordinal to draw them.")
+    elif args.plot and args.covariates:
+        print("The interaction plots show the 2x2 design, run without --covariates to draw them.")
+    elif args.plot:
+        from deepfake_analyses import plots
+        if args.stage == 'regression-confbi':
+            plots.plot_ideology_interaction(model)
+        else:
+            plots.plot_politician_interaction(model)
+    return model
+
+
+def run_features(args):
+    from deepfake_analyses.features import respondent_features
+    from deepfake_analyses.survey import load_and_filter_data
+
+    features = respondent_features(load_and_filter_data(args.input), id_column=args.id_column)
+    features.to_csv(args.output)
+    print(f"Features of {len(features)} respondents saved to {args.output}")
+
+
+def run_regression_cred(args):
+    from deepfake_analyses.join import print_unmatched_report
+    from deepfake_analyses.regression import credibility_sharing_regression
+    from deepfake_analyses.streaming import load_score_files
+
+    fit, aligned, unmatched = credibility_sharing_regression(*load_score_files(args.input, args.share))
+    print_unmatched_report(unmatched)
+    if fit is None:
+        print("No match")
+        return
+    intercept, slope = fit
+    print(f"Sharing intention = {intercept:.4f} + {slope:.4f} * credibility (n={len(aligned['credible'])})")
+
+    if args.plot:
+        from deepfake_analyses.plots import plot_overall_trend
+        from deepfake_analyses.regression import count_matrix
+        plot_overall_trend(count_matrix(aligned['credible'], aligned['share']), intercept, slope, mode=args.plot_mode)
+    return {'intercept': intercept, 'slope': slope, 'n': len(aligned['credible'])}
+
+
+def run_summarize(args):
+    from deepfake_analyses.federation import save_summary, summarize_files, summary_path
+
+    if args.share and len(args.share) != len(args.credible):
+        raise ValueError("Give one --share file for every --credible file, in the same order.")
+    scores = list(zip(args.credible, args.share or [None] * len(args.credible)))
+    paths = [summary_path(args.output_dir, path) for path in args.inputs + args.credible]
+    if len(set(paths)) != len(paths):
+        raise ValueError("Input files must have different file names, their summaries are named after them.")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for summary, path in zip(summarize_files(args.inputs, scores, jobs=args.jobs), paths):
+        save_summary(summary, path)
+        print(f"Summary of {', '.join(summary['files'])} saved to {path}")
+
+
+def run_federate(args):
+    from deepfake_analyses.blocks import print_results
+    from deepfake_analyses.federation import (aggregate_from_summary, compare_biden_trump_from_summary,
+                                              credibility_sharing_from_summary, describe_block_from_summary,
+                                              load_summary, merge_summaries, regression_from_summary,
+                                              stance_tests_from_summary, summary_blocks)
+    from deepfake_analyses.join import print_unmatched_report
+    from deepfake_analyses.stances import print_stance_test
+    from deepfake_analyses.survey import descriptions, stance_titles
+
+    summary = merge_summaries(load_summary(path) for path in args.summaries)
+    print(f"Merged {len(summary['files'])} files")
+
+    if 'histograms' in summary:
+        print(f"{summary['respondents']} finished responses\n")
+        for key, (t_stat, p_val) in stance_tests_from_summary(summary).items():
+            print_stance_test(stance_titles[key], t_stat, p_val)
+            if args.plot:
+                from deepfake_analyses.plots import plot_transitions
+                plot_transitions(summary['stance_tables'][key], stance_titles[key], descriptions[stance_titles[key]])
+        for block in summary_blocks(summary):
+            print(f"\nDescriptive Statistics for {block} (Numerical Values):")
+            print(describe_block_from_summary(summary, block))
+        print("\nDescriptive Statistics for aggregated deepfake videos (Numerical Values):")
+        print(aggregate_from_summary(summary))
+        print()
+        print_results(compare_biden_trump_from_summary(summary))
+
+    if 'regression' in summary:
+        print()
+        print(regression_from_summary(summary).summary())
+
+    if 'credible_share' in summary:
+        print()
+        print_unmatched_report(summary['unmatched'])
+        fit, n = credibility_sharing_from_summary(summary)
+        if fit is None:
+            print("No match")
+        else:
+            intercept, slope = fit
+            print(f"Sharing intention = {intercept:.4f} + {slope:.4f} * credibility (n={n})")
+
+
+def run_watch(args):
+    from deepfake_analyses.cleaning import load_recode_mappings
+    from deepfake_analyses.watch import watch_export
+
+    mappings = load_recode_mappings(args.mappings) if args.mappings else None
+    try:
+        watch_export(args.input, mappings=mappings, interval=args.interval, poll=args.poll, once=args.once)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+
+def run_power(args):
+    import pandas as pd
+
+    from deepfake_analyses.power import interaction_design, power_curves, stance_designs
+
+    if not args.input and not args.credible:
+        raise ValueError("Give the recoded survey (--input) and/or the credibility scores (--credible).")
+    stances = None
+    if args.input:
+        from deepfake_analyses.survey import load_and_filter_data
+        stances = stance_designs(load_and_filter_data(args.input))
+    interaction = None
+    if args.credible:
+        from deepfake_analyses.regression import load_data_from_json
+        interaction = interaction_design(load_data_from_json(args.credible))
+
+    table = power_curves(args.sizes, stances=stances, interaction=interaction, simulations=args.simulations,
+                         alpha=args.alpha, seed=args.seed, jobs=args.jobs)
+    with pd.option_context('display.max_columns', None, 'display.width', None):
+        print(table)
+    if args.output:
+        table.to_csv(args.output)
+        print(f"Power curves saved to {args.output}")
+    if args.plot:
+        from deepfake_analyses.plots import plot_power_curves
+        plot_power_curves(table)
+
+
+def run_multiverse(args):
+    import pandas as pd
+
+    from deepfake_analyses.multiverse import load_masks, run_multiverse, standard_masks
+    from deepfake_analyses.survey import load_survey
+
+    df = load_survey(args.input)
+    masks = {} if args.no_standard_masks else standard_masks(df)
+    if args.masks:
+        masks.update(load_masks(args.masks, len(df)))
+    if not masks:
+        raise ValueError("No specifications to compare, give --masks or leave the standard masks on.")
+
+    table = run_multiverse(df, masks, sort_by=args.sort_by)
+    with pd.option_context('display.max_columns', None, 'display.width', None):
+        print(table)
+    if args.output:
+        table.to_csv(args.output)
+        print(f"Specification curve saved to {args.output}")
+
+
+def run_correlations(args):
+    import pandas as pd
+
+    from deepfake_analyses.correlation import (correlation_matrices, item_total_statistics, reliability_table,
+                                               standard_scales, subgroup_masks)
+    from deepfake_analyses.multiverse import load_masks
+    from deepfake_analyses.survey import load_survey
+
+    df = load_survey(args.input)
+    masks = subgroup_masks(df, args.by)
+    if args.masks:
+        for name, mask in load_masks(args.masks, len(df)).items():
+            masks[name] = masks['all'] & mask
+    for name, mask in masks.items():
+        print(f"{name}: {mask.sum()} responses")
+
+    covariances, correlations = correlation_matrices(df, masks)
+    scales = standard_scales(list(covariances['all'].columns))
+    with pd.option_context('display.max_columns', None, 'display.width', None):
+        print("\nCronbach's alpha:")
+        print(reliability_table(covariances, scales))
+        if args.item_total:
+            for name, covariance in covariances.items():
+                for scale, items in scales.items():
+                    print(f"\nItem-total statistics of {scale} ({name}):")
+                    print(item_total_statistics(covariance.loc[items, items]))
+
+    if args.output:
+        pd.concat(correlations, names=['subgroup', 'item']).to_csv(args.output)
+        print(f"Correlation matrices saved to {args.output}")
+    if args.plot:
+        from deepfake_analyses.plots import plot_clustered_correlations
+        for name, correlation in correlations.items():
+            plot_clustered_correlations(correlation, f"Item correlations ({name})")
+
+
+def run_batch(args):
+    import pandas as pd
+
+    from deepfake_analyses.batch import (analyze_surveys, coefficient_table, comparison_table, load_score_sets, load_surveys,
+                                         regress_score_sets, stance_table)
+
+    tables = {}
+    if args.inputs:
+        results = analyze_surveys(load_surveys(args.inputs), cluster=args.cluster)
+        tables['stances'] = stance_table(results)
+        tables['comparison'] = comparison_table(results)
+    if args.credible:
+        models = regress_score_sets(load_score_sets(args.credible), engine=args.engine, cluster=args.cluster,
+                                    video_effects=args.video_effects)
+        tables['coefficients'] = coefficient_table(models)
+
+    with pd.option_context('display.max_rows', None, 'display.width', None):
+        for name, table in tables.items():
+            print(f"\n{name}:")
+            print(table)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        for name, table in tables.items():
+            table.to_csv(os.path.join(args.output_dir, f'{name}.csv'))
+        print(f"Tables saved to {args.output_dir}")
+
+
+def run_golden(args):
+    import sys
+
+    import pandas as pd
+
+    from deepfake_analyses.golden import (add_cases, check_fixture, generated_cases, run_golden, score_cases, survey_cases,
+                                          timing_table, write_fixture_expected)
+
+    if args.update_fixture:
+        print(f"Expected fixture values written to {write_fixture_expected()}")
+        return
+
+    cases = generated_cases(seed=args.seed, n=args.size)
+    if args.input:
+        from deepfake_analyses.survey import load_and_filter_data
+        add_cases(cases, survey_cases(load_and_filter_data(args.input)), os.path.basename(args.input))
+    if args.credible:
+        from deepfake_analyses.streaming import load_score_files
+        scores = load_score_files(*[path for path in (args.credible, args.share) if path])
+        add_cases(cases, score_cases(*scores), os.path.basename(args.credible))
+
+    comparisons, timings = run_golden(cases, repeat=args.repeat)
+    comparisons = pd.concat([comparisons, check_fixture()], ignore_index=True)
+    failures = comparisons[~comparisons['passed']]
+    with pd.option_context('display.max_rows', None, 'display.width', None, 'display.max_colwidth', 80):
+        print(comparisons.groupby('check')['passed'].agg(['sum', 'size']).rename(columns={'sum': 'passed', 'size': 'compared'}))
+        print("\nSeconds per engine (best of --repeat, summed over the cases):")
+        print(timing_table(timings))
+        if len(failures):
+            print("\nDisagreements with the reference:")
+            print(failures[['check', 'case', 'engine', 'quantity', 'reference', 'fast', 'error', 'tolerance']])
+
+    if args.results:
+        with open(args.results, 'w') as f:
+            f.write(f'{{"comparisons": {comparisons.to_json(orient="records")}, "timings": {timings.to_json(orient="records")}}}')
+        print(f"Results saved to {args.results}")
+    if len(failures):
+        sys.exit(1)
+
+
+# NAME=PATH arguments as {NAME: PATH}; a bare PATH is named after its file
+def named_paths(values):
+    paths = {}
+    for value in values or []:
+        name, _, path = value.rpartition('=')
+        paths[name or os.path.splitext(os.path.basename(path))[0]] = path
+    return paths
+
+
+def run_serve(args):
+    from deepfake_analyses.server import AnalysisState, serve
+
+    state = AnalysisState(named_paths(args.survey), named_paths(args.scores), cache_size=args.cache_size)
+    try:
+        serve(state, port=args.port, socket_path=args.socket)
+    except KeyboardInterrupt:
+        pass
+
+
+def run_results(args):
+    import pandas as pd
+
+    from deepfake_analyses.store import ResultStore
+
+    if not args.store:
+        raise ValueError("Give the results store before the subcommand: deepfake-analyses --store PATH results")
+    store = ResultStore(args.store)
+    with pd.option_context('display.max_rows', None, 'display.width', None, 'display.max_colwidth', 40):
+        if args.diff:
+            print(store.diff(*args.diff))
+        elif args.show is not None:
+            print(store.values(args.show))
+        else:
+            runs = store.runs(analysis=args.analysis, dataset=args.dataset, version=args.version)
+            runs['dataset'] = runs['dataset'].str[:12]
+            runs['code_version'] = runs['code_version'].str[:12]
+            print(runs)
+    store.close()
+
+
+# Answer an analysis stage from the results store, or run it and store what it returns and prints
+def run_stored(args):
+    import contextlib
+    import io
+    import sys
+
+    from deepfake_analyses.store import ResultStore, analysis_spec, dataset_hash, result_rows, stored_analyses
+
+    # A stored report would name a grid file this run does not write
+    if args.stage not in stored_analyses or vars(args).get('grid'):
+        return args.handler(args)
+    paths = [args.input] + ([args.share] if args.stage == 'regression-cred' else [])
+    covariates = vars(args).get('covariates') or []
+    if covariates:
+        paths.append(args.features)
+    store = ResultStore(args.store)
+    dataset, spec = dataset_hash(paths), analysis_spec(args.stage, vars(args))
+    # Plots need the computed results
+    stored = None if args.plot else store.get(dataset, args.stage, spec)
+    if stored is not None:
+        print(stored[0], end='')
+        print(f"(stored result from {args.store})")
+        store.close()
+        return
+
+    report = io.StringIO()
+    with contextlib.redirect_stdout(_Tee(sys.stdout, report)):
+        result = args.handler(args)
+    if result is not None:
+        store.put(dataset, os.path.basename(args.input), args.stage, spec, result_rows(args.stage, result, covariates),
+                  report.getvalue())
+    store.close()
+
+
+# Writes to several streams, so that stored reports are printed as they are written
+class _Tee:
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def write(self, text):
+        for stream in self.streams:
+            stream.write(text)
+        return len(text)
+
+    def flush(self):
+        for stream in self.streams:
+            stream.flush()
+
+
+def run_pipeline(args):
+    from deepfake_analyses.pipeline import build_stages, run_pipeline
+
+    stages = build_stages(args.input, args.mappings, args.output_dir, credible=args.credible, share=args.share, screen=args.screen)
+    status = run_pipeline(stages, args.output_dir, jobs=args.jobs, force=args.force)
+    ran = [name for name, state in status.items() if state == 'ran']
+    print(f"{len(ran)} of {len(status)} stages ran, the others were unchanged.")
+
+
+def run_generate(args):
+    from deepfake_analyses.synthetic import generate_export, generate_scores
+
+    generate_export(args.output, args.respondents, missing_rate=args.missing_rate, unfinished_rate=args.unfinished_rate, seed=args.seed)
+    print(f"Synthetic export with {args.respondents} respondents saved to {args.output}")
+    if args.credible and args.share:
+        generate_scores(args.credible, args.share, args.respondents, missing_rate=args.missing_rate, seed=args.seed)
+        print(f"Synthetic score files saved to {args.credible} and {args.share}")
+
+
+def run_bench(args):
+    import sys
+
+    from deepfake_analyses.bench import check_limits, run_benchmarks, save_records
+
+    records = run_benchmarks(args.sizes, args.workdir, stages=args.stages, missing_rate=args.missing_rate, repeat=args.repeat)
+    if args.results:
+        save_records(records, args.results)
+        print(f"Benchmark results saved to {args.results}")
+    problems = check_limits(records, max_seconds=args.max_seconds, max_mb=args.max_mb)
+    for problem in problems:
+        print(problem)
+    if problems:
+        sys.exit(1)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='deepfake-analyses', description="Run one stage of the survey analysis without file dialogs.")
+    parser.add_argument('--trace', metavar='PATH', help="record timings, CPU time, memory and data sizes as a Chrome trace (JSON)")
+    parser.add_argument('--store', metavar='PATH', help="answer analysis stages from this SQLite results store and add new results to it")
+    subparsers = parser.add_subparsers(dest='stage', required=True)
+
+    stage = subparsers.add_parser('screen', help="0_: flag speeders, straight-liners and out-of-range answers before 1_")
+    stage.add_argument('--input', required=True, help="raw survey export (CSV)")
+    stage.add_argument('--output', required=True, help="where to write the export with its exclusion bitmask")
+    stage.add_argument('--speeder-fraction', type=float, default=1 / 3, help="speeders took less than this fraction of the median duration")
+    stage.add_argument('--min-duration', type=float, help="flag responses faster than this many seconds instead")
+    stage.add_argument('--min-answered', type=int, default=10, help="block items a straight-liner must have answered")
+    stage.add_argument('--mappings', help="recode mappings (JSON) of 2_, applied to the block items before checking their codes")
+    stage.set_defaults(handler=run_screen)
+
+    stage = subparsers.add_parser('delete-metadata', help="1_: drop the Qualtrics metadata columns")
+    stage.add_argument('--input', required=True, help="raw survey export (CSV)")
+    stage.add_argument('--output', required=True, help="where to write the cleaned CSV")
+    stage.set_defaults(handler=run_delete_metadata)
+
+    stage = subparsers.add_parser('recode', help="2_: apply saved recode mappings")
+    stage.add_argument('--input', required=True, help="cleaned survey (CSV)")
+    stage.add_argument('--mappings', required=True, help="recode mappings (JSON)")
+    stage.add_argument('--output', required=True, help="where to write the recoded CSV")
+    stage.set_defaults(handler=run_recode)
+
+    survey_stages = [
+        ('stances', run_stances, "3_: paired t-tests of the pre/post political stances"),
+        ('blocks', run_blocks, "4_: descriptive statistics per question block"),
+        ('aggregate', run_aggregate, "4_: real video vs. aggregated deepfake blocks"),
+        ('comparison', run_comparison, "4_: Biden vs. Trump deepfake comparison"),
+    ]
+    for name, handler, help_text in survey_stages:
+        stage = subparsers.add_parser(name, help=help_text)
+        stage.add_argument('--input', required=True, help="recoded survey (CSV)")
+        stage.add_argument('--plot', action='store_true', help="show the figures")
+        if name == 'comparison':
+            stage.add_argument('--cluster', action='store_true', help="cluster the t-tests by respondent")
+        if name == 'blocks':
+            stage.add_argument('--grid', help="draw all blocks as small multiples into this file (.pdf: one page per --per-page blocks)")
+            stage.add_argument('--per-page', type=int, help="blocks per page of --grid (default: all)")
+            stage.add_argument('--cols', type=int, default=4, help="blocks per row of --grid")
+        stage.set_defaults(handler=handler)
+
+    stage = subparsers.add_parser('analyze', help="3_ and 4_ statistics in parallel workers sharing one copy of the survey")
+    stage.add_argument('--input', required=True, help="recoded survey (CSV)")
+    stage.add_argument('--jobs', type=int, help="worker processes")
+    stage.set_defaults(handler=run_analyze)
+
+    stage = subparsers.add_parser('features', help="per-respondent ideology, stance changes and video alignment for the 5_ regressions")
+    stage.add_argument('--input', required=True, help="recoded survey (CSV)")
+    stage.add_argument('--output', required=True, help="where to write the feature table (CSV)")
+    stage.add_argument('--id-column', help="survey column with the respondent ids of the keyed score files (default: the row index)")
+    stage.set_defaults(handler=run_features)
+
+    for name, help_text in [('regression-confbi', "5_: ideology x stance regression"),
+                            ('regression-aligned', "5_: politician x stance regression")]:
+        stage = subparsers.add_parser(name, help=help_text)
+        stage.add_argument('--input', required=True, help="credibility scores (JSON)")
+        stage.add_argument('--engine', choices=['numpy', 'statsmodels', 'ordinal', 'mixed'], default='numpy',
+                           help="statsmodels prints its full summary table, ordinal fits a cumulative-logit model, "
+                                "mixed adds a random intercept per respondent")
+        stage.add_argument('--video-effects', action='store_true', help="with --engine mixed, also a random intercept per video")
+        stage.add_argument('--cluster', action='store_true', help="OLS standard errors clustered by respondent")
+        stage.add_argument('--features', help="feature table written by the features stage (CSV)")
+        stage.add_argument('--covariates', nargs='+', default=[], metavar='FEATURE',
+                           help="feature columns to add to the design, e.g. ideology; alignment is the rated block's aligned_ column")
+        stage.add_argument('--plot', action='store_true', help="show the figures")
+        stage.set_defaults(handler=run_regression)
+
+    stage = subparsers.add_parser('regression-cred', help="5_: sharing intention on credibility")
+    stage.add_argument('--input', required=True, help="credibility scores (JSON)")
+    stage.add_argument('--share', required=True, help="sharing scores (JSON)")
+    stage.add_argument('--plot', action='store_true', help="show the figure")
+    stage.add_argument('--plot-mode', choices=['bubble', 'heatmap'], default='bubble')
+    stage.set_defaults(handler=run_regression_cred)
+
+    stage = subparsers.add_parser('summarize', help="reduce survey exports and score files to mergeable summaries, in parallel")
+    stage.add_argument('--inputs', nargs='*', default=[], help="recoded surveys (CSV), e.g. one per wave or country")
+    stage.add_argument('--credible', nargs='*', default=[], help="credibility scores (JSON)")
+    stage.add_argument('--share', nargs='*', default=[], help="sharing scores (JSON), one per --credible file")
+    stage.add_argument('--output-dir', required=True, help="directory for the <file name>.summary.json files")
+    stage.add_argument('--jobs', type=int, help="worker processes")
+    stage.set_defaults(handler=run_summarize)
+
+    stage = subparsers.add_parser('federate', help="3_ to 5_ statistics over any combination of summaries")
+    stage.add_argument('--summaries', nargs='+', required=True, help="summaries written by summarize")
+    stage.add_argument('--plot', action='store_true', help="show the 3_ figures of the merged transition tables")
+    stage.set_defaults(handler=run_federate)
+
+    stage = subparsers.add_parser('watch', help="live 3_ stance shifts and 4_ block means of a growing export during fieldwork")
+    stage.add_argument('--input', required=True, help="survey export (CSV) that is being appended to")
+    stage.add_argument('--mappings', help="recode mappings (JSON) to apply to the new rows")
+    stage.add_argument('--interval', type=float, default=10.0, help="seconds between printed summaries at most")
+    stage.add_argument('--poll', type=float, default=1.0, help="seconds between checks for new rows")
+    stage.add_argument('--once', action='store_true', help="summarize the current file and exit")
+    stage.set_defaults(handler=run_watch)
+
+    stage = subparsers.add_parser('power', help="Monte Carlo power of the 3_ stance t-tests and the 5_ interaction per sample size")
+    stage.add_argument('--input', help="recoded survey (CSV) to take the stance effects from")
+    stage.add_argument('--credible', help="credibility scores (JSON) to take the politician x stance effects from")
+    stage.add_argument('--sizes', type=int, nargs='+', default=[100, 200, 400, 800, 1600], help="candidate numbers of respondents")
+    stage.add_argument('--simulations', type=int, default=2000, help="simulated datasets per test and size")
+    stage.add_argument('--alpha', type=float, default=0.05)
+    stage.add_argument('--seed', type=int, default=0)
+    stage.add_argument('--jobs', type=int, help="worker processes")
+    stage.add_argument('--output', help="write the power curves to this CSV")
+    stage.add_argument('--plot', action='store_true', help="show the power curves")
+    stage.set_defaults(handler=run_power)
+
+    stage = subparsers.add_parser('multiverse', help="3_ to 5_ statistics under many exclusion rules at once")
+    stage.add_argument('--input', required=True, help="recoded survey (CSV); a screened export also allows duration rules")
+    stage.add_argument('--masks', help="CSV with one 0/1 column per exclusion rule and one row per response")
+    stage.add_argument('--no-standard-masks', action='store_true', help="only use the rules from --masks")
+    stage.add_argument('--sort-by', help="order the specification curve by this column, e.g. 'politician x stance coef'")
+    stage.add_argument('--output', help="write the specification-curve table to this CSV")
+    stage.set_defaults(handler=run_multiverse)
+
+    stage = subparsers.add_parser('correlations', help="pairwise-complete item correlations and Cronbach's alpha per subgroup")
+    stage.add_argument('--input', required=True, help="recoded survey (CSV)")
+    stage.add_argument('--by', help="also compute them for every value of this column")
+    stage.add_argument('--masks', help="CSV with one 0/1 column per subgroup and one row per response")
+    stage.add_argument('--item-total', action='store_true', help="print item-total statistics of every scale")
+    stage.add_argument('--output', help="write the correlation matrices of all subgroups to this CSV")
+    stage.add_argument('--plot', action='store_true', help="show a clustered heatmap per subgroup")
+    stage.set_defaults(handler=run_correlations)
+
+    stage = subparsers.add_parser('batch', help="3_ to 5_ tests of many surveys and score files, one table per analysis")
+    stage.add_argument('--inputs', nargs='*', default=[], help="recoded surveys (CSV)")
+    stage.add_argument('--credible', nargs='*', default=[], help="credibility scores (JSON)")
+    stage.add_argument('--engine', choices=['numpy', 'ordinal', 'mixed', 'statsmodels'], default='numpy')
+    stage.add_argument('--cluster', action='store_true', help="cluster the comparison t-tests and OLS standard errors by respondent")
+    stage.add_argument('--video-effects', action='store_true', help="with --engine mixed, also a random intercept per video")
+    stage.add_argument('--output-dir', help="write stances.csv, comparison.csv and coefficients.csv here")
+    stage.set_defaults(handler=run_batch)
+
+    stage = subparsers.add_parser('golden', help="check every fast statistics engine against scipy, statsmodels and pandas, and time both")
+    stage.add_argument('--input', help="also check on this recoded survey (CSV)")
+    stage.add_argument('--credible', help="also check on these credibility scores (JSON)")
+    stage.add_argument('--share', help="sharing scores (JSON) matching --credible")
+    stage.add_argument('--size', type=int, default=2000, help="answers per generated case")
+    stage.add_argument('--seed', type=int, default=0)
+    stage.add_argument('--repeat', type=int, default=3, help="timing runs per engine and case")
+    stage.add_argument('--results', help="write every comparison and timing to this JSON file")
+    stage.add_argument('--update-fixture', action='store_true', help="recompute the fixture's expected.json with the reference implementations and exit")
+    stage.set_defaults(handler=run_golden)
+
+    stage = subparsers.add_parser('serve', help="keep surveys and scores in memory and answer analysis queries over local HTTP")
+    stage.add_argument('--survey', action='append', metavar='NAME=PATH', help="recoded survey (CSV) to load, repeatable")
+    stage.add_argument('--scores', action='append', metavar='NAME=PATH', help="credibility or sharing scores (JSON) to load, repeatable")
+    stage.add_argument('--port', type=int, default=8765, help="port on 127.0.0.1")
+    stage.add_argument('--socket', help="listen on this Unix socket instead of a port")
+    stage.add_argument('--cache-size', type=int, default=256, help="query results kept in memory")
+    stage.set_defaults(handler=run_serve)
+
+    stage = subparsers.add_parser('results', help="list, show and diff the runs kept with --store")
+    stage.add_argument('--analysis', help="only runs of this stage, e.g. comparison")
+    stage.add_argument('--dataset', help="only runs on this file name or dataset hash prefix")
+    stage.add_argument('--version', help="only runs with this code version prefix")
+    stage.add_argument('--show', type=int, metavar='RUN', help="print the values of one run")
+    stage.add_argument('--diff', type=int, nargs=2, metavar=('RUN_A', 'RUN_B'), help="values of two runs side by side")
+    stage.set_defaults(handler=run_results)
+
+    stage = subparsers.add_parser('pipeline', help="run stages 1 to 5, rerunning only what changed")
+    stage.add_argument('--input', required=True, help="raw survey export (CSV)")
+    stage.add_argument('--mappings', required=True, help="recode mappings (JSON)")
+    stage.add_argument('--output-dir', required=True, help="directory for the intermediate files and stage reports")
+    stage.add_argument('--credible', help="credibility scores (JSON) for the regression stages")
+    stage.add_argument('--share', help="sharing scores (JSON) for regression-cred")
+    stage.add_argument('--jobs', type=int, help="worker processes for independent stages")
+    stage.add_argument('--screen', action='store_true', help="run the quality screening before 1_")
+    stage.add_argument('--force', action='store_true', help="ignore cached results")
+    stage.set_defaults(handler=run_pipeline)
+
+    stage = subparsers.add_parser('generate', help="write a synthetic Qualtrics export")
+    stage.add_argument('--output', required=True, help="where to write the export (CSV)")
+    stage.add_argument('--respondents', type=int, required=True)
+    stage.add_argument('--missing-rate', type=float, default=0.05, help="share of unanswered items")
+    stage.add_argument('--unfinished-rate', type=float, default=0.1, help="share of respondents with Finished = 0")
+    stage.add_argument('--seed', type=int, default=0)
+    stage.add_argument('--credible', help="also write synthetic credibility scores (JSON)")
+    stage.add_argument('--share', help="also write synthetic sharing scores (JSON)")
+    stage.set_defaults(handler=run_generate)
+
+    stage = subparsers.add_parser('bench', help="time every stage on synthetic exports of several sizes")
+    stage.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help="respondents per export")
+    stage.add_argument('--stages', nargs='+', help="stages to time (default: all)")
+    stage.add_argument('--workdir', default='benchmark_data', help="directory for the generated inputs")
+    stage.add_argument('--missing-rate', type=float, default=0.05)
+    stage.add_argument('--repeat', type=int, default=1)
+    stage.add_argument('--results', help="write the measurements to this JSON file")
+    stage.add_argument('--max-seconds', type=float, help="exit with status 1 when a stage's best run takes longer")
+    stage.add_argument('--max-mb', type=float, help="exit with status 1 when a stage's best run needs more peak memory")
+    stage.set_defaults(handler=run_bench)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    handler = run_stored if args.store else args.handler
+    if not args.trace:
+        handler(args)
+        return
+
+    from deepfake_analyses import trace
+
+    trace.enable()
+    try:
+        with trace.span(args.stage):
+            handler(args)
+    finally:
+        trace.write(args.trace)
+        print(f"Trace saved to {args.trace}")
+
+
+if __name__ == "__main__":
+    main()
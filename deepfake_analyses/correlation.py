@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+from deepfake_analyses import trace
+from deepfake_analyses.blocks import available_blocks, question_types
+from deepfake_analyses.survey import post_influence_cols, pre_influence_cols, valid_responses
+
+# Pairwise-complete moments of every pair of items (i, j) in every subgroup, over the responses
+# of the subgroup that answered both items:
+#   n[i, j]         number of those responses
+#   sums[i, j]      sum of item i
+#   squares[i, j]   sum of squares of item i
+#   products[i, j]  sum of item i x item j
+# Per subgroup they are two matrix products with the 0/1 answered matrix instead of one pass
+# per item pair, and they add up across chunks of rows, files and disjoint subgroups.
+moment_names = ['n', 'sums', 'squares', 'products']
+
+
+# Block items and stance items of the survey, in questionnaire order
+def item_columns(df):
+    columns = [q for questions in available_blocks(df).values() for q in questions]
+    columns += [column for column in list(pre_influence_cols.values()) + list(post_influence_cols.values()) if column in df.columns]
+    return columns
+
+
+# Valid responses of the whole sample and of every value of column, e.g. a demographic question
+def subgroup_masks(df, column=None):
+    valid = valid_responses(df).to_numpy()
+    masks = {'all': valid}
+    if column is not None:
+        for value in sorted(df.loc[valid, column].dropna().unique()):
+            masks[f'{column} = {value}'] = valid & (df[column] == value).to_numpy()
+    return masks
+
+
+# Pairwise-complete moments of the columns under every mask, as (masks x items x items) arrays.
+# Rows are processed in chunks, so memory stays at a few chunk-sized copies of the items.
+@trace.traced
+def pairwise_moments(df, columns, masks, chunk_size=1 << 16):
+    mask_matrix = np.column_stack([np.asarray(mask, dtype=bool) for mask in masks.values()])
+    items = len(columns)
+    moments = {name: np.zeros((mask_matrix.shape[1], items, items)) for name in moment_names}
+
+    for start in range(0, len(df), chunk_size):
+        values = df[columns].iloc[start:start + chunk_size].to_numpy(dtype=float)
+        answered = ~np.isnan(values)
+        filled = np.where(answered, values, 0.0)
+        stacked = np.hstack([answered, filled, filled ** 2])
+        for k, mask in enumerate(mask_matrix[start:start + chunk_size].T):
+            weighted = mask[:, None] * answered
+            n, sums, squares = np.split(stacked.T @ weighted, 3)
+            moments['n'][k] += n
+            moments['sums'][k] += sums
+            moments['squares'][k] += squares
+            moments['products'][k] += filled.T @ (mask[:, None] * filled)
+    return moments
+
+
+# Pairwise-complete covariances and correlations (like DataFrame.cov and DataFrame.corr) from
+# the moments; NaN where fewer than two responses answered both items
+def pairwise_covariance(moments):
+    n, sums, squares, products = (moments[name] for name in moment_names)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n = np.where(n > 1, n, np.nan)
+        covariance = (products - sums * sums.swapaxes(-1, -2) / n) / (n - 1)
+        variance = (squares - sums ** 2 / n) / (n - 1)
+        correlation = covariance / np.sqrt(variance * variance.swapaxes(-1, -2))
+    return covariance, correlation
+
+
+# Cronbach's alpha of the items of a covariance matrix
+def cronbach_alpha(covariance):
+    covariance = np.asarray(covariance)
+    k = len(covariance)
+    return k / (k - 1) * (1 - np.trace(covariance) / covariance.sum())
+
+
+# Corrected item-total correlation (the item against the sum of the other items) and alpha
+# with the item left out, for every item of a covariance matrix
+def item_total_statistics(covariance):
+    values = covariance.to_numpy()
+    total = values.sum()
+    with_item = values.sum(axis=1)
+    variance = np.diag(values)
+    rest_variance = total - 2 * with_item + variance
+    rest_trace = np.trace(values) - variance
+    k = len(values)
+    return pd.DataFrame({
+        'item-total r': (with_item - variance) / np.sqrt(variance * rest_variance),
+        'alpha if deleted': (k - 1) / (k - 2) * (1 - rest_trace / rest_variance) if k > 2 else np.nan,
+    }, index=covariance.index)
+
+
+# Scales whose consistency is reported: every question type over the deepfake videos, and
+# the stance questions before and after them
+def standard_scales(columns, exclude='Trump_Bonus'):
+    scales = {question_type: [column for column in columns if column.endswith(suffix) and not column.startswith(exclude)]
+              for suffix, question_type in question_types.items()}
+    scales['stances before'] = [column for column in pre_influence_cols.values() if column in columns]
+    scales['stances after'] = [column for column in post_influence_cols.values() if column in columns]
+    return {name: items for name, items in scales.items() if len(items) > 1}
+
+
+# Cronbach's alpha of every scale in every subgroup, one column per subgroup
+def reliability_table(covariances, scales):
+    return pd.DataFrame({name: {scale: cronbach_alpha(covariance.loc[items, items]) for scale, items in scales.items()}
+                         for name, covariance in covariances.items()})
+
+
+# Covariance and correlation DataFrames of every subgroup, {subgroup: DataFrame}
+@trace.traced
+def correlation_matrices(df, masks, columns=None):
+    columns = item_columns(df) if columns is None else columns
+    covariance, correlation = pairwise_covariance(pairwise_moments(df, columns, masks))
+    covariances = {name: pd.DataFrame(matrix, index=columns, columns=columns) for name, matrix in zip(masks, covariance)}
+    correlations = {name: pd.DataFrame(matrix, index=columns, columns=columns) for name, matrix in zip(masks, correlation)}
+    return covariances, correlations
+
+
+# Average-linkage clustering of the items on 1 - correlation. Returns the leaf order and the
+# merges as (cluster, cluster, height), clusters numbered like scipy's linkage.
+def cluster_items(correlation):
+    items = len(correlation)
+    size = 2 * items - 1
+    distance = np.full((size, size), np.inf)
+    distance[:items, :items] = 1 - np.nan_to_num(np.asarray(correlation, dtype=float), nan=0.0)
+    np.fill_diagonal(distance, np.inf)
+    counts = np.ones(size)
+    active = list(range(items))
+    merges = []
+    children = {}
+
+    for new in range(items, size):
+        sub = distance[np.ix_(active, active)]
+        i, j = np.unravel_index(np.argmin(sub), sub.shape)
+        a, b = active[i], active[j]
+        merges.append((a, b, sub[i, j]))
+        children[new] = (a, b)
+        counts[new] = counts[a] + counts[b]
+        active = [c for c in active if c not in (a, b)]
+        if active:
+            linked = (counts[a] * distance[a, active] + counts[b] * distance[b, active]) / counts[new]
+            distance[new, active] = linked
+            distance[active, new] = linked
+        active.append(new)
+
+    order = []
+    stack = [size - 1]
+    while stack:
+        node = stack.pop()
+        if node < items:
+            order.append(node)
+        else:
+            stack.extend(reversed(children[node]))
+    return order, merges
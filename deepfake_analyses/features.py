@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from deepfake_analyses import trace
+from deepfake_analyses.regression import rating_respondents
+from deepfake_analyses.survey import block_bases, post_influence_cols, pre_influence_cols
+
+# Per-respondent features for the 5_ regressions, computed from the survey's own stance answers:
+#   ideology           mean pre-video stance from -1 (liberal) to 1 (conservative)
+#   delta_<stance>     post-video minus pre-video answer of every stance
+#   aligned_<block>    ideology times the video's stance lean, positive when the video argues
+#                      the respondent's side
+# Rows are indexed by respondent id, the survey index or an id column as in
+# join.keyed_scores_from_survey, and ratings are joined on the ids of the score file.
+
+# +1 where answer 7 is the conservative end of the scale, -1 where it is the liberal end
+# (gun control: 7 = no one is allowed to own guns). Ukraine: 7 = oppose the intervention.
+stance_directions = {
+    "health": 1,
+    "climate": 1,
+    "immigration": 1,
+    "guns": -1,
+    "abortion": 1,
+    "warukr": 1
+}
+
+
+# Stance lean of every video: -1 for the Left stance ('1X') blocks, 1 for the Right stance
+# ('3X') blocks, NaN for the real Trump_Bonus video
+def video_leans(bases=block_bases):
+    return np.array([-1.0 if '1X' in base else 1.0 if '3X' in base else np.nan for base in bases])
+
+
+# Feature table of the valid responses, one vectorized pass over the stance columns
+@trace.traced
+def respondent_features(df, id_column=None):
+    keys = list(pre_influence_cols)
+    pre = df[[pre_influence_cols[key] for key in keys]].to_numpy(dtype=float)
+    post = df[[post_influence_cols[key] for key in keys]].to_numpy(dtype=float)
+    directions = np.array([stance_directions[key] for key in keys], dtype=float)
+
+    # Unanswered stances are left out of the mean; no answer at all gives NaN
+    signed = (pre - 4) / 3 * directions
+    answered = np.count_nonzero(~np.isnan(signed), axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ideology = np.nansum(signed, axis=1) / answered
+    ideology[answered == 0] = np.nan
+
+    deltas = post - pre
+    alignment = ideology[:, None] * video_leans()[None, :]
+
+    values = np.column_stack((ideology, deltas, alignment))
+    columns = ['ideology'] + [f'delta_{key}' for key in keys] + [f'aligned_{base}' for base in block_bases]
+    ids = df[id_column] if id_column is not None else df.index.to_series()
+    return pd.DataFrame(values, index=pd.Index(ids.astype(str), name='respondent'), columns=columns)
+
+
+def load_features(file_path):
+    return pd.read_csv(file_path, index_col='respondent', dtype={'respondent': str})
+
+
+# Feature values of every rating, in the order of prepare_data and rating_groups, looked up by
+# respondent id; respondents without features get NaN. 'alignment' is the aligned_<block>
+# column of each rating's own block; other names are feature columns.
+def rating_features(data, features, names):
+    respondents, blocks = rating_respondents(data)
+    rows = features.index.get_indexer(respondents)
+    table = np.vstack((features.to_numpy(dtype=float), np.full(features.shape[1], np.nan)))
+    rows[rows < 0] = len(features)
+
+    covariates = np.empty((len(rows), len(names)))
+    for j, name in enumerate(names):
+        if name == 'alignment':
+            block_names, block_codes = np.unique(blocks, return_inverse=True)
+            block_columns = features.columns.get_indexer([f'aligned_{block}' for block in block_names])
+            if np.any(block_columns < 0):
+                raise ValueError(f"No aligned_ feature for blocks {list(block_names[block_columns < 0])}.")
+            covariates[:, j] = table[rows, block_columns[block_codes]]
+        else:
+            covariates[:, j] = table[rows, features.columns.get_loc(name)]
+    return covariates
+
+
+# Add feature columns to a prepare_data design. Ratings with a missing feature are dropped,
+# from the respondents and videos of rating_groups too. Returns X, y, respondents, videos.
+def join_features(X, y, data, features, names, respondents=None, videos=None):
+    covariates = rating_features(data, features, names)
+    complete = ~np.isnan(covariates).any(axis=1)
+    X = np.column_stack((X, covariates))[complete]
+    keep = [None if values is None else np.asarray(values)[complete] for values in (respondents, videos)]
+    return X, np.asarray(y)[complete], keep[0], keep[1]
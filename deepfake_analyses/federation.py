@@ -0,0 +1,227 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from deepfake_analyses import npstats, trace
+from deepfake_analyses.blocks import aggregated_frame, available_blocks, column_descriptors, question_types
+from deepfake_analyses.join import align_scores
+from deepfake_analyses.regression import count_matrix, load_data_from_json, prepare_data
+from deepfake_analyses.streaming import load_score_files
+from deepfake_analyses.survey import blocks, load_and_filter_data, post_influence_cols, pre_influence_cols
+from deepfake_analyses.transitions import (codes, histogram_moments, histogram_quantile, levels, transition_tables,
+                                           transition_test)
+
+# A summary reduces one survey export or one pair of score files to counts and cross-products
+# that add up across files, so that waves and countries can be analysed together without
+# ever loading their raw rows together:
+#   histograms      {column: answers per Likert code}
+#   stance_tables   {stance: levels x levels transition table of (pre, post) answers}
+#   regression      X'X, X'y, y'y and nobs of the 5_ politician x stance design
+#   credible_share  levels x levels table of (credibility, sharing) pairs, with the unmatched counts
+
+# Answers per Likert code of one column, missing answers left out
+def likert_histogram(values, column):
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    answers = values.astype(np.int64)
+    if np.any(answers != values) or np.any((answers < 1) | (answers > levels)):
+        raise ValueError(f"Column {column} has answers outside the codes 1 to {levels}, recode it first.")
+    return np.bincount(answers - 1, minlength=levels)
+
+
+# Summary of one recoded survey export
+def summarize_export(file_path):
+    df = load_and_filter_data(file_path)
+    histograms = {column: likert_histogram(df[column], column)
+                  for questions in available_blocks(df).values() for column in questions}
+    stance_tables = transition_tables(df, pre_influence_cols, post_influence_cols)
+
+    return {'files': [file_path], 'respondents': len(df), 'histograms': histograms, 'stance_tables': stance_tables}
+
+
+# Summary of one credibility score file and, optionally, the matching sharing score file
+def summarize_scores(credible_path, share_path=None):
+    if share_path is None:
+        data_credible, data_share = load_data_from_json(credible_path), None
+    else:
+        data_credible, data_share = load_score_files(credible_path, share_path)
+    X, y = prepare_data(data_credible)
+    summary = {
+        'files': [credible_path],
+        'regression': {'xtx': X.T @ X, 'xty': X.T @ y, 'yty': float(y @ y), 'nobs': len(y)},
+    }
+    if share_path is not None:
+        aligned, unmatched = align_scores(data_credible, data_share)
+        summary['files'].append(share_path)
+        summary['credible_share'] = count_matrix(aligned['credible'], aligned['share'], levels)
+        summary['unmatched'] = unmatched
+    return summary
+
+
+def _summarize_in_worker(function, args, tracing):
+    if tracing:
+        trace.enable()
+    with trace.span(function.__name__, file=str(args[0])):
+        summary = function(*args)
+    return summary, trace.collect()
+
+
+# Summarize every export and every (credible, share) pair in parallel worker processes.
+# Returns the summaries in the order of the files.
+def summarize_files(exports=(), scores=(), jobs=None):
+    tasks = [(summarize_export, (path,)) for path in exports]
+    tasks += [(summarize_scores, (credible, share)) for credible, share in scores]
+    summaries = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_summarize_in_worker, function, args, trace.is_enabled()) for function, args in tasks]
+        for future in futures:
+            summary, events = future.result()
+            trace.add_events(events)
+            summaries.append(summary)
+    return summaries
+
+
+def _merge(a, b):
+    if isinstance(a, dict):
+        return {key: _merge(a[key], b[key]) if key in a and key in b else a.get(key, b.get(key))
+                for key in list(a) + [key for key in b if key not in a]}
+    if isinstance(a, list):
+        return a + b
+    return np.asarray(a) + np.asarray(b)
+
+
+# Add up any number of summaries; parts only some of them have are kept as they are
+def merge_summaries(summaries):
+    merged = {}
+    for summary in summaries:
+        merged = _merge(merged, summary)
+    return merged
+
+
+def _to_json(value):
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    return value
+
+
+def _from_json(value, key=None):
+    if isinstance(value, dict):
+        return {item_key: _from_json(item, item_key) for item_key, item in value.items()}
+    if isinstance(value, list) and key != 'files':
+        return np.array(value)
+    return value
+
+
+def save_summary(summary, file_path):
+    with open(file_path, 'w') as f:
+        json.dump(_to_json(summary), f)
+
+
+def load_summary(file_path):
+    with open(file_path, 'r') as f:
+        return _from_json(json.load(f))
+
+
+# File name of the summary of one input file
+def summary_path(output_dir, file_path):
+    return os.path.join(output_dir, os.path.splitext(os.path.basename(file_path))[0] + '.summary.json')
+
+
+# Paired t-test of every stance from its transition table, like analyze_stances
+def stance_tests_from_summary(summary):
+    t_test_results = {}
+    for key, table in summary.get('stance_tables', {}).items():
+        if table.sum() == 0:
+            continue
+        t_stat, p_val = transition_test(table)
+        t_test_results[key] = (float(t_stat), float(p_val))
+    return t_test_results
+
+
+# Descriptive statistics of one block from its histograms, like describe_block
+def describe_block_from_summary(summary, block):
+    statistics = {}
+    for question in blocks[block]:
+        counts = summary['histograms'][question]
+        n, mean, squares = histogram_moments(counts)
+        answered = codes[counts > 0]
+        statistics[question] = [
+            mean,
+            np.sqrt(squares / (n - 1)) if n > 1 else np.nan,
+            answered.min() if answered.size else np.nan,
+            histogram_quantile(counts, 0.25),
+            histogram_quantile(counts, 0.5),
+            histogram_quantile(counts, 0.75),
+            answered.max() if answered.size else np.nan,
+        ]
+    block_data_described = pd.DataFrame(statistics, index=['mean', 'std', 'min', '25%', '50%', '75%', 'max'], dtype=float)
+    block_data_described.columns = column_descriptors(blocks[block], block)
+    return block_data_described
+
+
+# Blocks all of whose questions are in the summary
+def summary_blocks(summary):
+    histograms = summary.get('histograms', {})
+    return [block for block, questions in blocks.items() if all(q in histograms for q in questions)]
+
+
+# Summed histogram of one question type over the given blocks
+def _pooled_histogram(summary, block_names, suffix):
+    return sum((summary['histograms'][block + suffix] for block in block_names), np.zeros(levels, dtype=np.int64))
+
+
+# Global means and medians per question type over all deepfake blocks, like aggregate_deepfake_blocks
+def aggregate_from_summary(summary, exclude='Trump_Bonus'):
+    deepfake_blocks = [block for block in summary_blocks(summary) if block != exclude]
+    global_means = {}
+    global_medians = {}
+    for suffix, question_type in question_types.items():
+        counts = _pooled_histogram(summary, deepfake_blocks, suffix)
+        global_means[question_type] = histogram_moments(counts)[1]
+        global_medians[question_type] = histogram_quantile(counts, 0.5)
+    return aggregated_frame(global_means, global_medians)
+
+
+# Biden vs. Trump deepfake comparison from the histograms, like calculate_means_and_ttests
+def compare_biden_trump_from_summary(summary):
+    available = summary_blocks(summary)
+    biden_blocks = [block for block in available if 'Biden' in block]
+    trump_blocks = [block for block in available if 'Trump' in block and 'Bonus' not in block]
+
+    results = {}
+    for question in question_types:
+        biden_counts = _pooled_histogram(summary, biden_blocks, question)
+        trump_counts = _pooled_histogram(summary, trump_blocks, question)
+        biden_moments = histogram_moments(biden_counts)
+        trump_moments = histogram_moments(trump_counts)
+        t_stat, p_val = npstats.ttest_ind_from_moments(*biden_moments, *trump_moments)
+        results[question] = {'biden_mean': biden_moments[1], 'trump_mean': trump_moments[1],
+                             'biden_median': histogram_quantile(biden_counts, 0.5), 'trump_median': histogram_quantile(trump_counts, 0.5),
+                             'p_val': float(p_val)}
+    return results
+
+
+# Politician x stance OLS of all summarized credibility files
+def regression_from_summary(summary):
+    moments = summary['regression']
+    return npstats.ols_from_moments(moments['xtx'], moments['xty'], moments['yty'], int(moments['nobs']))
+
+
+# Sharing intention on credibility from the (credibility, sharing) table.
+# Returns (intercept, slope) or None, and the number of matched pairs.
+def credibility_sharing_from_summary(summary):
+    table = summary['credible_share']
+    n = int(table.sum())
+    if n == 0:
+        return None, 0
+    credible = table.sum(axis=1)
+    share = table.sum(axis=0)
+    xtx = [[n, credible @ codes], [credible @ codes, credible @ codes ** 2]]
+    xty = [share @ codes, codes @ table @ codes]
+    intercept, slope = npstats.ols_from_moments(xtx, xty, share @ codes ** 2, n).params
+    return (intercept, slope), n
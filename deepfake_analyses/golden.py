@@ -0,0 +1,733 @@
+import contextlib
+import io
+import json
+import os
+import time
+import warnings
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from deepfake_analyses import npstats, trace
+from deepfake_analyses.blocks import (aggregate_deepfake_blocks, available_blocks, compare_biden_trump,
+                                      filter_and_separate_columns, question_types)
+from deepfake_analyses.correlation import pairwise_covariance, pairwise_moments
+from deepfake_analyses.federation import credibility_sharing_from_summary, describe_block_from_summary
+from deepfake_analyses.multiverse import regression_terms, run_multiverse, standard_masks
+from deepfake_analyses.regression import (contingency_table, count_matrix, credibility_sharing_regression, design_cell,
+                                          perform_regression, prepare_data, rating_groups)
+from deepfake_analyses.stances import analyze_stances
+from deepfake_analyses.survey import (blocks, load_and_filter_data, post_influence_cols, pre_influence_cols,
+                                      stance_titles)
+from deepfake_analyses.synthetic import generate_survey
+from deepfake_analyses.transitions import answer_histograms, histogram_moments, transition_tables, transition_test
+from deepfake_analyses.watch import LiveStatistics
+
+# Every fast path must reproduce the published numbers, which were computed with scipy,
+# statsmodels and pandas. A check runs the reference implementation and every fast engine
+# on the same data, compares each quantity within the tolerance declared for its kind, and
+# times every engine in the same run. Cases are generated (including missing answers, ties
+# and degenerate groups) or taken from stored survey and score files. Both results must be
+# NaN, or the same infinity, or agree within rtol / atol. Fits from cross-products (X'X)
+# lose some digits to cancellation in y'y - b'X'y, hence the looser fit tolerance. The mixed
+# and ordinal references are iterative optimizers that stop within about 1e-6 of the optimum
+# ('optimum'), and their standard errors come from a numerical Hessian (OrderedModel) or the
+# joint Hessian of fixed effects and variances (MixedLM), not the conditional covariance
+# the NumPy engines report ('curvature').
+tolerances = {
+    'descriptive': {'rtol': 1e-12, 'atol': 1e-12},
+    'statistic': {'rtol': 1e-9, 'atol': 1e-12},
+    'pvalue': {'rtol': 1e-7, 'atol': 1e-14},
+    'fit': {'rtol': 1e-7, 'atol': 1e-10},
+    'likelihood': {'rtol': 1e-9, 'atol': 1e-9},
+    'optimum': {'rtol': 1e-4, 'atol': 1e-8},
+    'curvature': {'rtol': 5e-3, 'atol': 1e-8},
+}
+
+# Quantities that are only rounding noise in a degenerate case and are not compared there:
+# with a constant outcome the residuals, and so every standard error, are zero up to rounding
+noise = {('ols', 'constant outcome'): ['bse', 'pvalues', 'rsquared', 'fvalue']}
+
+Comparison = namedtuple('Comparison', ['check', 'case', 'engine', 'quantity', 'reference', 'fast', 'error', 'tolerance', 'passed'])
+Timing = namedtuple('Timing', ['check', 'case', 'engine', 'seconds'])
+
+
+def _reference_modules():
+    try:
+        import scipy.stats
+        import statsmodels.api
+    except ImportError as error:
+        raise ImportError("The golden harness compares against scipy and statsmodels: pip install -e .[reference]") from error
+    return scipy.stats, statsmodels.api
+
+
+# Respondent-level paired t-test of a (responses x items) array of differences, NaN skipped
+def _one_sample_tests(stats, differences):
+    t_stats, p_vals = [], []
+    for column in differences.T:
+        column = column[~np.isnan(column)]
+        if len(column) < 2:
+            t_stats.append(np.nan)
+            p_vals.append(np.nan)
+            continue
+        result = stats.ttest_1samp(column, 0.0)
+        t_stats.append(result.statistic)
+        p_vals.append(result.pvalue)
+    return np.array(t_stats, dtype=float), np.array(p_vals, dtype=float)
+
+
+# Pooled answers of every question type over the deepfake blocks, as flat arrays
+def _pooled_question_types(df, exclude='Trump_Bonus'):
+    deepfake_blocks = [questions for block, questions in available_blocks(df).items() if block != exclude]
+    return [df[[questions[position] for questions in deepfake_blocks]].to_numpy(dtype=float).ravel()
+            for position in range(len(question_types))]
+
+
+# 5_ politician x stance design of the credibility answers of a survey, like prepare_data
+def _survey_design(df, exclude='Trump_Bonus'):
+    rows, answers = [], []
+    for block, questions in available_blocks(df).items():
+        if block == exclude:
+            continue
+        values = df[questions[1]].to_numpy(dtype=float)
+        values = values[~np.isnan(values)]
+        politician, stance = design_cell(block)
+        rows.append(np.tile([1.0, politician, stance, politician * stance], (len(values), 1)))
+        answers.append(values)
+    if not rows:
+        return np.empty((0, len(regression_terms))), np.empty(0)
+    return np.vstack(rows), np.concatenate(answers)
+
+
+# Largest deviation beyond the tolerance, 0 where both values are NaN or the same infinity
+def _deviation(reference, fast, rtol, atol):
+    reference = np.atleast_1d(np.asarray(reference, dtype=float))
+    fast = np.atleast_1d(np.asarray(fast, dtype=float))
+    if reference.shape != fast.shape:
+        return np.inf, False
+    same = (np.isnan(reference) & np.isnan(fast)) | (reference == fast)
+    finite = np.isfinite(reference) & np.isfinite(fast)
+    with np.errstate(invalid='ignore'):
+        error = np.where(finite, np.abs(reference - fast), np.where(same, 0.0, np.inf))
+    passed = bool(np.all(same | (finite & (error <= atol + rtol * np.abs(reference)))))
+    return float(error.max()) if error.size else 0.0, passed
+
+
+# Best of repeat wall times of function(), and its last result
+def _timed(function, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+# Engines of every check: {engine: function(data) -> {quantity: value}}; 'reference' comes
+# first. An engine returns None for a case it does not support, e.g. ols_batch on a
+# rank-deficient design.
+
+def _paired_engines():
+    stats, _ = _reference_modules()
+
+    def reference(data):
+        post, pre = data
+        paired = ~np.isnan(post) & ~np.isnan(pre)
+        result = stats.ttest_rel(post[paired], pre[paired])
+        return {'t': result.statistic, 'p': result.pvalue}
+
+    def numpy(data):
+        t_stat, p_val = npstats.ttest_rel(*data)
+        return {'t': t_stat, 'p': p_val}
+
+    def transitions(data):
+        post, pre = data
+        table = transition_tables(pd.DataFrame({'pre': pre, 'post': post}), {'x': 'pre'}, {'x': 'post'})['x']
+        t_stat, p_val = transition_test(table)
+        return {'t': t_stat, 'p': p_val}
+
+    return {'reference': reference, 'numpy': numpy, 'transitions': transitions}
+
+
+def _independent_engines():
+    stats, _ = _reference_modules()
+
+    def reference(data):
+        result = stats.ttest_ind(*data, nan_policy='omit')
+        return {'t': result.statistic, 'p': result.pvalue}
+
+    def numpy(data):
+        t_stat, p_val = npstats.ttest_ind(*data)
+        return {'t': t_stat, 'p': p_val}
+
+    def histograms(data):
+        moments = [histogram_moments(answer_histograms(values[:, None])[0]) for values in data]
+        t_stat, p_val = npstats.ttest_ind_from_moments(*moments[0], *moments[1])
+        return {'t': t_stat, 'p': p_val}
+
+    return {'reference': reference, 'numpy': numpy, 'histograms': histograms}
+
+
+def _describe_engines():
+    rows = ['mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+    def reference(block_data):
+        described = block_data.describe().loc[rows]
+        return {row: described.loc[row].to_numpy(dtype=float) for row in rows}
+
+    def histograms(block_data):
+        block = block_data.attrs['block']
+        summary = {'histograms': dict(zip(block_data.columns, answer_histograms(block_data.to_numpy(dtype=float))))}
+        described = describe_block_from_summary(summary, block)
+        return {row: described.loc[row].to_numpy(dtype=float) for row in rows}
+
+    return {'reference': reference, 'histograms': histograms}
+
+
+def _ols_engines():
+    _, sm = _reference_modules()
+    quantities = ['params', 'bse', 'pvalues', 'rsquared', 'fvalue']
+
+    def reference(data):
+        model = sm.OLS(data[1], data[0]).fit()
+        return {name: getattr(model, name) for name in quantities}
+
+    def numpy(data):
+        model = npstats.ols(*data)
+        return {name: getattr(model, name) for name in quantities}
+
+    def moments(data):
+        X, y = data
+        model = npstats.ols_from_moments(X.T @ X, X.T @ y, y @ y, len(y))
+        return {name: getattr(model, name) for name in quantities}
+
+    def batch(data):
+        X, y = data
+        if np.linalg.matrix_rank(X) < X.shape[1]:
+            return None
+        model = npstats.ols_batch(X, y)
+        return {name: model[name] for name in ['params', 'bse', 'pvalues']}
+
+    return {'reference': reference, 'numpy': numpy, 'moments': moments, 'batch': batch}
+
+
+def _cluster_engines():
+    _, sm = _reference_modules()
+    quantities = ['params', 'bse', 'pvalues', 'fvalue']
+
+    def reference(data):
+        X, y, groups = data
+        model = sm.OLS(y, X).fit(cov_type='cluster', cov_kwds={'groups': groups}, use_t=True)
+        return {name: np.squeeze(getattr(model, name)) for name in quantities}
+
+    def numpy(data):
+        model = npstats.ols(*data[:2], groups=data[2])
+        return {name: getattr(model, name) for name in quantities}
+
+    return {'reference': reference, 'numpy': numpy}
+
+
+# Biden vs. Trump test clustered by respondent, every row holding the ratings of one respondent
+def _cluster_ttest_engines():
+    _, sm = _reference_modules()
+
+    def reference(data):
+        a, b = data
+        rows = np.repeat(np.arange(len(a)), a.shape[1]), np.repeat(np.arange(len(b)), b.shape[1])
+        values = np.concatenate([a.ravel(), b.ravel()])
+        dummy = np.concatenate([np.ones(a.size), np.zeros(b.size)])
+        groups = np.concatenate(rows)
+        answered = ~np.isnan(values)
+        X = np.column_stack([np.ones(answered.sum()), dummy[answered]])
+        model = sm.OLS(values[answered], X).fit(cov_type='cluster', cov_kwds={'groups': groups[answered]}, use_t=True)
+        return {'t': model.tvalues[1], 'p': model.pvalues[1]}
+
+    def numpy(data):
+        t_stat, p_val = npstats.cluster_ttest_ind(*data)
+        return {'t': t_stat, 'p': p_val}
+
+    return {'reference': reference, 'numpy': numpy}
+
+
+def _simple_engines():
+    _, sm = _reference_modules()
+
+    def reference(data):
+        x, y = data
+        intercept, slope = sm.OLS(y, sm.add_constant(x.astype(float), has_constant='add')).fit().params
+        return {'intercept': intercept, 'slope': slope}
+
+    def numpy(data):
+        intercept, slope = npstats.simple_regression(*data).params
+        return {'intercept': intercept, 'slope': slope}
+
+    def table(data):
+        line, _ = credibility_sharing_from_summary({'credible_share': count_matrix(*data)})
+        return {'intercept': line[0], 'slope': line[1]} if line is not None else None
+
+    return {'reference': reference, 'numpy': numpy, 'table': table}
+
+
+def _mixed_engines():
+    _, sm = _reference_modules()
+
+    def reference(data):
+        X, y, groups = data
+        model = sm.MixedLM(y, X, groups=groups).fit(reml=True)
+        return {'params': model.fe_params, 'bse': model.bse_fe, 'scale': model.scale,
+                'respondent variance': np.asarray(model.cov_re)[0, 0], 'llf': model.llf}
+
+    def numpy(data):
+        model = npstats.mixed_lm(*data)
+        return {'params': model.params, 'bse': model.bse[:len(model.params)], 'scale': model.scale,
+                'respondent variance': model.variances['respondent'], 'llf': model.llf}
+
+    return {'reference': reference, 'numpy': numpy}
+
+
+def _ordinal_engines():
+    from statsmodels.miscmodels.ordinal_model import OrderedModel
+
+    def reference(data):
+        X, y = data
+        model = OrderedModel(y, X[:, 1:], distr='logit').fit(method='bfgs', maxiter=1000, gtol=1e-10, disp=False)
+        q = X.shape[1] - 1
+        return {'params': model.params[:q], 'thresholds': model.model.transform_threshold_params(model.params)[1:-1],
+                'bse': model.bse[:q], 'llf': model.llf}
+
+    def numpy(data):
+        model = npstats.ordinal_logit(*contingency_table(*data))
+        return {'params': model.params, 'thresholds': model.thresholds, 'bse': model.bse[:len(model.params)], 'llf': model.llf}
+
+    return {'reference': reference, 'numpy': numpy}
+
+
+# Pairwise-complete covariances and correlations of the items under every mask
+def _pairwise_engines():
+    def reference(data):
+        df, columns, masks, _ = data
+        subsets = [df.loc[np.asarray(mask, dtype=bool), columns] for mask in masks.values()]
+        return {'cov': np.stack([subset.cov().to_numpy() for subset in subsets]),
+                'corr': np.stack([subset.corr().to_numpy() for subset in subsets])}
+
+    def moments(data):
+        df, columns, masks, chunk_size = data
+        covariance, correlation = pairwise_covariance(pairwise_moments(df, columns, masks, chunk_size=chunk_size))
+        return {'cov': covariance, 'corr': correlation}
+
+    return {'reference': reference, 'moments': moments}
+
+
+# Statistics of every specification of the multiverse, one row per statistic and column per mask
+def _multiverse_engines():
+    stats, sm = _reference_modules()
+    keys = list(pre_influence_cols)
+    labels = list(question_types.values())
+
+    def reference(data):
+        df, masks = data
+        result = {name: [] for name in ['mean change', 't', 'p', 'mean', 'median', 'coef', 'coef p']}
+        for mask in masks.values():
+            subset = df[np.asarray(mask, dtype=bool)]
+            differences = np.column_stack([subset[post_influence_cols[key]].to_numpy(dtype=float)
+                                           - subset[pre_influence_cols[key]].to_numpy(dtype=float) for key in keys])
+            t_stats, p_vals = _one_sample_tests(stats, differences)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                result['mean change'].append(np.nanmean(differences, axis=0))
+                pooled = _pooled_question_types(subset)
+                result['mean'].append([np.nanmean(values) for values in pooled])
+                result['median'].append([np.nanmedian(values) for values in pooled])
+            result['t'].append(t_stats)
+            result['p'].append(p_vals)
+            X, y = _survey_design(subset)
+            if len(y) > len(regression_terms):
+                model = sm.OLS(y, X).fit()
+                result['coef'].append(model.params)
+                result['coef p'].append(model.pvalues)
+            else:
+                result['coef'].append(np.full(len(regression_terms), np.nan))
+                result['coef p'].append(np.full(len(regression_terms), np.nan))
+        return {name: np.array(values, dtype=float).T for name, values in result.items()}
+
+    def matrix(data):
+        table = run_multiverse(*data)
+        columns = {
+            'mean change': [f'{key} mean change' for key in keys], 't': [f'{key} t' for key in keys], 'p': [f'{key} p' for key in keys],
+            'mean': [f'{label} mean' for label in labels], 'median': [f'{label} median' for label in labels],
+            'coef': [f'{term} coef' for term in regression_terms], 'coef p': [f'{term} p' for term in regression_terms],
+        }
+        return {name: table[names].to_numpy(dtype=float).T for name, names in columns.items()}
+
+    return {'reference': reference, 'matrix': matrix}
+
+
+# Live statistics of a growing export, fed batch by batch, against the whole export at once
+def _watch_engines():
+    stats, _ = _reference_modules()
+
+    def reference(data):
+        rows, _ = data
+        df = rows.apply(pd.to_numeric, errors='coerce')
+        df = df[df['Finished'] == 1]
+        differences = df[list(post_influence_cols.values())].to_numpy() - df[list(pre_influence_cols.values())].to_numpy()
+        t_stats, p_vals = _one_sample_tests(stats, differences)
+        item_columns = [q for questions in blocks.values() for q in questions]
+        pooled = _pooled_question_types(df)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            return {'n': (~np.isnan(differences)).sum(axis=0), 'mean change': np.nanmean(differences, axis=0),
+                    't': t_stats, 'p': p_vals, 'block means': df[item_columns].mean().to_numpy(),
+                    'mean': [np.nanmean(values) for values in pooled], 'median': [np.nanmedian(values) for values in pooled]}
+
+    def online(data):
+        rows, batch = data
+        statistics = LiveStatistics()
+        for start in range(0, len(rows), batch):
+            statistics.update(rows.iloc[start:start + batch].copy())
+        shifts = statistics.stance_shifts()
+        aggregate = statistics.aggregate()
+        return {'n': shifts['n'].to_numpy(), 'mean change': shifts['mean change'].to_numpy(), 't': shifts['t'].to_numpy(),
+                'p': shifts['p'].to_numpy(), 'block means': statistics.block_means().to_numpy().ravel(),
+                'mean': aggregate.loc['Mean'].to_numpy(), 'median': aggregate.loc['Median'].to_numpy()}
+
+    return {'reference': reference, 'online': online}
+
+
+# (engines, tolerance kind of every quantity)
+checks = {
+    'ttest_rel': (_paired_engines, {'t': 'statistic', 'p': 'pvalue'}),
+    'ttest_ind': (_independent_engines, {'t': 'statistic', 'p': 'pvalue'}),
+    'describe': (_describe_engines, dict.fromkeys(['mean', 'std', 'min', '25%', '50%', '75%', 'max'], 'descriptive')),
+    'ols': (_ols_engines, {'params': 'fit', 'bse': 'fit', 'pvalues': 'pvalue', 'rsquared': 'fit', 'fvalue': 'fit'}),
+    'cluster_ols': (_cluster_engines, {'params': 'fit', 'bse': 'fit', 'pvalues': 'pvalue', 'fvalue': 'fit'}),
+    'cluster_ttest': (_cluster_ttest_engines, {'t': 'statistic', 'p': 'pvalue'}),
+    'simple_regression': (_simple_engines, {'intercept': 'fit', 'slope': 'fit'}),
+    'mixed_lm': (_mixed_engines, {'params': 'optimum', 'bse': 'curvature', 'scale': 'optimum', 'respondent variance': 'optimum',
+                                  'llf': 'likelihood'}),
+    'ordinal_logit': (_ordinal_engines, {'params': 'optimum', 'thresholds': 'optimum', 'bse': 'curvature', 'llf': 'likelihood'}),
+    'pairwise_moments': (_pairwise_engines, {'cov': 'fit', 'corr': 'fit'}),
+    'multiverse': (_multiverse_engines, {'mean change': 'descriptive', 't': 'statistic', 'p': 'pvalue', 'mean': 'descriptive',
+                                         'median': 'descriptive', 'coef': 'fit', 'coef p': 'pvalue'}),
+    'watch': (_watch_engines, {'n': 'descriptive', 'mean change': 'descriptive', 't': 'statistic', 'p': 'pvalue',
+                               'block means': 'descriptive', 'mean': 'descriptive', 'median': 'descriptive'}),
+}
+
+
+def _likert(rng, shape, missing_rate=0.0):
+    values = rng.integers(1, 8, shape).astype(float)
+    values[rng.random(shape) < missing_rate] = np.nan
+    return values
+
+
+# 2 x 2 politician x stance design with Likert ratings, n ratings per cell
+def _design(rng, cells):
+    rows = [np.tile([1, politician, stance, politician * stance], (n, 1)) for (politician, stance), n in cells.items()]
+    X = np.vstack(rows).astype(float)
+    y = np.clip(np.rint(4 + 0.3 * X[:, 1] - 0.2 * X[:, 2] + 0.4 * X[:, 3] + rng.normal(0, 1.5, len(X))), 1, 7)
+    return X, y
+
+
+# Generated cases of every check, {check: {case: data}}
+def generated_cases(seed=0, n=2000):
+    rng = np.random.default_rng(seed)
+    pre = _likert(rng, n)
+    shifted = np.clip(pre + rng.integers(-1, 2, n), 1, 7)
+    cases = {
+        'ttest_rel': {
+            'likert': (shifted, pre),
+            'missing answers': (_likert(rng, n, 0.3), _likert(rng, n, 0.3)),
+            'mostly ties': (np.where(rng.random(n) < 0.95, pre, shifted), pre),
+            'no change': (pre.copy(), pre),
+            'constant shift': (pre[pre < 7] + 1, pre[pre < 7]),
+            'one pair': (np.array([5.0]), np.array([3.0])),
+            'no pairs': (np.array([np.nan, 4.0]), np.array([2.0, np.nan])),
+        },
+        'ttest_ind': {
+            'likert': (_likert(rng, n), _likert(rng, n)),
+            'missing answers': (_likert(rng, n, 0.3), _likert(rng, 2 * n, 0.1)),
+            'constant groups': (np.full(50, 4.0), np.full(80, 5.0)),
+            'identical constant groups': (np.full(50, 4.0), np.full(80, 4.0)),
+            'one answer in a group': (np.array([6.0, np.nan]), _likert(rng, 100)),
+            'empty group': (np.full(10, np.nan), _likert(rng, 100)),
+        },
+        'describe': {},
+        'ols': {
+            'politician x stance': _design(rng, {(1, 1): n, (0, 1): n, (1, 0): n, (0, 0): n}),
+            'unbalanced cells': _design(rng, {(1, 1): 3, (0, 1): n, (1, 0): 40, (0, 0): 7}),
+            'continuous': (np.column_stack([np.ones(n), rng.normal(size=(n, 3))]), rng.normal(size=n)),
+        },
+        'cluster_ols': {},
+        'cluster_ttest': {
+            'likert': (_likert(rng, (n // 4, 10)), _likert(rng, (n // 4, 10))),
+            'missing answers': (_likert(rng, (n // 4, 10), 0.3), _likert(rng, (n // 4, 10), 0.3)),
+            'unanswered respondents': (np.vstack([_likert(rng, (50, 10)), np.full((20, 10), np.nan)]), _likert(rng, (70, 10), 0.5)),
+        },
+        'simple_regression': {},
+    }
+
+    X, y = cases['ols']['politician x stance']
+    cases['ols']['constant outcome'] = (X, np.full(len(y), 4.0))
+
+    groups = np.tile(np.arange(len(y) // 4), 4)
+    cases['cluster_ols']['politician x stance'] = (X, y, groups)
+    cases['cluster_ols']['few clusters'] = (X, y, groups % 5)
+    cases['cluster_ols']['string respondent ids'] = (X, y, np.char.add('R_', groups.astype(str)))
+
+    credible = _likert(rng, n)
+    share = np.clip(np.rint(1.5 + 0.5 * credible + rng.normal(0, 1.2, n)), 1, 7)
+    cases['simple_regression']['likert'] = (credible, share)
+    cases['simple_regression']['two levels'] = (np.where(credible > 4, 7.0, 1.0), share)
+
+    for name, missing_rate in [('likert', 0.0), ('missing answers', 0.3)]:
+        block_data = pd.DataFrame(_likert(rng, (n, 4), missing_rate), columns=blocks['Biden_1X1'])
+        block_data.attrs['block'] = 'Biden_1X1'
+        cases['describe'][name] = block_data
+    degenerate = pd.DataFrame({blocks['Trump_3X1'][0]: np.full(n, np.nan), blocks['Trump_3X1'][1]: np.full(n, 4.0),
+                               blocks['Trump_3X1'][2]: [5.0] + [np.nan] * (n - 1), blocks['Trump_3X1'][3]: _likert(rng, n, 0.99)})
+    degenerate.attrs['block'] = 'Trump_3X1'
+    cases['describe']['unanswered, constant and single answers'] = degenerate
+
+    # Ratings of n // 5 respondents with a random intercept each, some with a single rating
+    respondents = np.sort(rng.integers(0, n // 5, n))
+    X, _ = _design(rng, {(1, 1): n // 4, (0, 1): n // 4, (1, 0): n // 4, (0, 0): n - 3 * (n // 4)})
+    X = X[rng.permutation(n)]
+    y = np.clip(np.rint(4 + 0.3 * X[:, 1] - 0.2 * X[:, 2] + rng.normal(0, 0.8, n // 5)[respondents] + rng.normal(0, 1.2, n)), 1, 7)
+    cases['mixed_lm'] = {'random intercepts': (X, y, respondents)}
+    cases['ordinal_logit'] = {'politician x stance': cases['ols']['politician x stance'], 'unbalanced cells': cases['ols']['unbalanced cells'],
+                              'random intercepts': (X, y)}
+
+    survey = generate_survey(max(n // 4, 50), missing_rate=0.1, seed=seed)
+    half = rng.random(len(survey)) < 0.5
+    masks = {**standard_masks(survey), 'random half': half, 'nobody': np.zeros(len(survey), dtype=bool)}
+    items = list(pre_influence_cols.values()) + blocks['Biden_1X1'] + blocks['Trump_3X2'] + list(post_influence_cols.values())
+    cases['pairwise_moments'] = {'stances and two blocks': (survey, items, masks, 97)}
+    cases['multiverse'] = {'synthetic survey': (survey, masks)}
+    text = survey.astype(object).where(survey.notna(), '').astype(str)
+    cases['watch'] = {'batches of 37': (text, 37), 'one batch': (text, len(text))}
+    return cases
+
+
+# Cases of every check from a stored recoded survey: every stance, the Biden vs. Trump
+# comparison per question type and the descriptives of every block
+def survey_cases(df):
+    cases = {'ttest_rel': {}, 'ttest_ind': {}, 'cluster_ttest': {}, 'describe': {}}
+    items = [column for column in list(pre_influence_cols.values()) + list(post_influence_cols.values()) if column in df.columns]
+    items += [q for questions in available_blocks(df).values() for q in questions]
+    masks = {'all': np.ones(len(df), dtype=bool), 'even rows': np.arange(len(df)) % 2 == 0}
+    cases['pairwise_moments'] = {'all items': (df, items, masks, 1 << 16)}
+    cases['multiverse'] = {'all and even rows': (df, masks)}
+    for key, pre_col in pre_influence_cols.items():
+        post_col = post_influence_cols[key]
+        if pre_col in df.columns and post_col in df.columns:
+            cases['ttest_rel'][stance_titles[key]] = (df[post_col].to_numpy(dtype=float), df[pre_col].to_numpy(dtype=float))
+
+    df_filtered, biden_columns, trump_columns = filter_and_separate_columns(df)
+    for question in question_types:
+        biden = df_filtered[biden_columns].filter(like=question).to_numpy(dtype=float)
+        trump = df_filtered[trump_columns].filter(like=question).to_numpy(dtype=float)
+        if biden.size and trump.size:
+            cases['ttest_ind'][f'Biden vs. Trump {question}'] = (biden.ravel(), trump.ravel())
+            cases['cluster_ttest'][f'Biden vs. Trump {question}'] = (biden, trump)
+
+    for block, questions in available_blocks(df).items():
+        block_data = df[questions].copy()
+        block_data.attrs['block'] = block
+        cases['describe'][block] = block_data
+    return cases
+
+
+# Cases from stored credibility scores, and from the matching sharing scores when given
+def score_cases(data_credible, data_share=None):
+    X, y = prepare_data(data_credible)
+    cases = {'ols': {'politician x stance': (X, y)}, 'ordinal_logit': {'politician x stance': (X, y)}}
+    # Clusters need respondent ids, which lists with dropped items do not have
+    try:
+        respondents, _ = rating_groups(data_credible)
+        cases['cluster_ols'] = {'politician x stance': (X, y, respondents)}
+        cases['mixed_lm'] = {'politician x stance': (X, y, respondents)}
+    except ValueError:
+        pass
+    if data_share is not None:
+        from deepfake_analyses.join import align_scores
+        aligned, _ = align_scores(data_credible, data_share)
+        cases['simple_regression'] = {'credibility -> sharing': (aligned['credible'].astype(float), aligned['share'].astype(float))}
+    return cases
+
+
+# Add the cases of more to cases, their names prefixed with the file they come from
+def add_cases(cases, more, prefix):
+    for check, check_cases in more.items():
+        cases.setdefault(check, {}).update({f'{prefix}: {case}': data for case, data in check_cases.items()})
+    return cases
+
+
+# Run every engine of every check on every case. Returns the comparisons against the
+# reference and the timings, as DataFrames.
+@trace.traced
+def run_golden(cases, repeat=3):
+    comparisons = []
+    timings = []
+    for check, check_cases in cases.items():
+        engines_of, kinds = checks[check]
+        engines = engines_of()
+        for case, data in check_cases.items():
+            with trace.span('golden', check=check, case=case):
+                expected, seconds = _timed(lambda: engines['reference'](data), repeat)
+                timings.append(Timing(check, case, 'reference', seconds))
+                for engine, function in engines.items():
+                    if engine == 'reference':
+                        continue
+                    try:
+                        result, seconds = _timed(lambda: function(data), repeat)
+                    except Exception as error:
+                        comparisons.append(Comparison(check, case, engine, 'error', None, repr(error), np.inf, None, False))
+                        continue
+                    if result is None:
+                        continue
+                    timings.append(Timing(check, case, engine, seconds))
+                    for quantity, reference in expected.items():
+                        if quantity not in result or quantity in noise.get((check, case), []):
+                            continue
+                        tolerance = tolerances[kinds[quantity]]
+                        error, passed = _deviation(reference, result[quantity], **tolerance)
+                        comparisons.append(Comparison(check, case, engine, quantity, np.asarray(reference, dtype=float).tolist(),
+                                                      np.asarray(result[quantity], dtype=float).tolist(), error, kinds[quantity], passed))
+    return pd.DataFrame(comparisons, columns=Comparison._fields), pd.DataFrame(timings, columns=Timing._fields)
+
+
+# Seconds of every engine per check, summed over the cases, with the speedup over the reference
+def timing_table(timings):
+    table = timings.pivot_table(index='check', columns='engine', values='seconds', aggfunc='sum')
+    engines = [engine for engine in table.columns if engine != 'reference']
+    table = table[['reference'] + engines]
+    for engine in engines:
+        table[f'{engine} speedup'] = table['reference'] / table[engine]
+    return table
+
+
+# Committed fixture: a 200-respondent synthetic survey (generate --seed 2024, metadata deleted)
+# with the keyed credibility and sharing scores of its valid responses, and expected.json with
+# the published numbers of every analysis on it, computed by the reference implementations.
+# A change that moves a reported result fails the fixture check whatever inputs are given.
+fixture_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def _load_fixture(directory):
+    with open(os.path.join(directory, 'credible.json')) as f:
+        data_credible = json.load(f)
+    with open(os.path.join(directory, 'share.json')) as f:
+        data_share = json.load(f)
+    return load_and_filter_data(os.path.join(directory, 'survey.csv')), data_credible, data_share
+
+
+def _add_terms(values, name, kinds, model_values):
+    for quantity, kind, series in zip(['coef', 'std err', 'p'], kinds, model_values):
+        for term, value in zip(regression_terms, series):
+            values[f'{name}: {term} {quantity}'] = (kind, float(value))
+
+
+# Published numbers of the fixture as computed by the package, {quantity: (kind, value)}
+def fixture_values(directory=fixture_dir):
+    df, data_credible, data_share = _load_fixture(directory)
+    values = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        stances = analyze_stances(df, pre_influence_cols, post_influence_cols, stance_titles)
+    for key, (t_stat, p_val) in stances.items():
+        values[f'stances: {stance_titles[key]} t'] = ('statistic', float(t_stat))
+        values[f'stances: {stance_titles[key]} p'] = ('pvalue', float(p_val))
+
+    for cluster in (False, True):
+        for question, result in compare_biden_trump(df, cluster=cluster).items():
+            if not cluster:
+                for statistic in ['biden_mean', 'trump_mean', 'biden_median', 'trump_median']:
+                    values[f'comparison: {question} {statistic}'] = ('descriptive', float(result[statistic]))
+            values[f"comparison: {question} {'clustered p' if cluster else 'p'}"] = ('pvalue', float(result['p_val']))
+
+    for label, column in aggregate_deepfake_blocks(df).items():
+        values[f'aggregate: {label} mean'] = ('descriptive', float(column['Mean']))
+        values[f'aggregate: {label} median'] = ('descriptive', float(column['Median']))
+
+    X, y = prepare_data(data_credible)
+    respondents, _ = rating_groups(data_credible)
+    for name, model in [('regression', perform_regression(X, y)), ('clustered regression', perform_regression(X, y, respondents=respondents, cluster=True))]:
+        _add_terms(values, name, ['fit', 'fit', 'pvalue'], [model.params, model.bse, model.pvalues])
+
+    (intercept, slope), _, _ = credibility_sharing_regression(data_credible, data_share)
+    values['credibility -> sharing: intercept'] = ('fit', float(intercept))
+    values['credibility -> sharing: slope'] = ('fit', float(slope))
+    return values
+
+
+# The same numbers from scipy, statsmodels and pandas, as written to expected.json
+def reference_fixture_values(directory=fixture_dir):
+    stats, sm = _reference_modules()
+    df, data_credible, data_share = _load_fixture(directory)
+    values = {}
+    for key, pre_col in pre_influence_cols.items():
+        post, pre = df[post_influence_cols[key]].to_numpy(dtype=float), df[pre_col].to_numpy(dtype=float)
+        paired = ~np.isnan(post) & ~np.isnan(pre)
+        result = stats.ttest_rel(post[paired], pre[paired])
+        values[f'stances: {stance_titles[key]} t'] = ('statistic', float(result.statistic))
+        values[f'stances: {stance_titles[key]} p'] = ('pvalue', float(result.pvalue))
+
+    df_filtered, biden_columns, trump_columns = filter_and_separate_columns(df)
+    cluster_test = _cluster_ttest_engines()['reference']
+    for question in question_types:
+        biden = df_filtered[biden_columns].filter(like=question).to_numpy(dtype=float)
+        trump = df_filtered[trump_columns].filter(like=question).to_numpy(dtype=float)
+        for side, ratings in [('biden', biden), ('trump', trump)]:
+            values[f'comparison: {question} {side}_mean'] = ('descriptive', float(np.nanmean(ratings)))
+            values[f'comparison: {question} {side}_median'] = ('descriptive', float(np.nanmedian(ratings)))
+        values[f'comparison: {question} p'] = ('pvalue', float(stats.ttest_ind(biden.ravel(), trump.ravel(), nan_policy='omit').pvalue))
+        values[f'comparison: {question} clustered p'] = ('pvalue', float(cluster_test((biden, trump))['p']))
+
+    labels = aggregate_deepfake_blocks(df.iloc[:0]).columns
+    for label, pooled in zip(labels, _pooled_question_types(df)):
+        values[f'aggregate: {label} mean'] = ('descriptive', float(np.nanmean(pooled)))
+        values[f'aggregate: {label} median'] = ('descriptive', float(np.nanmedian(pooled)))
+
+    X, y = prepare_data(data_credible)
+    respondents, _ = rating_groups(data_credible)
+    for name, model in [('regression', sm.OLS(y, X).fit()),
+                        ('clustered regression', sm.OLS(y, X).fit(cov_type='cluster', cov_kwds={'groups': respondents}, use_t=True))]:
+        _add_terms(values, name, ['fit', 'fit', 'pvalue'], [model.params, model.bse, model.pvalues])
+
+    from deepfake_analyses.join import align_scores
+    aligned, _ = align_scores(data_credible, data_share)
+    intercept, slope = sm.OLS(aligned['share'], sm.add_constant(aligned['credible'], has_constant='add')).fit().params
+    values['credibility -> sharing: intercept'] = ('fit', float(intercept))
+    values['credibility -> sharing: slope'] = ('fit', float(slope))
+    return values
+
+
+def write_fixture_expected(directory=fixture_dir):
+    values = reference_fixture_values(directory)
+    expected = {quantity: {'kind': kind, 'value': None if np.isnan(value) else value} for quantity, (kind, value) in values.items()}
+    path = os.path.join(directory, 'expected.json')
+    with open(path, 'w') as f:
+        json.dump(expected, f, indent=1)
+        f.write('\n')
+    return path
+
+
+# Every published number of the fixture against expected.json, as comparisons like run_golden's
+def check_fixture(directory=fixture_dir):
+    with open(os.path.join(directory, 'expected.json')) as f:
+        expected = json.load(f)
+    values = fixture_values(directory)
+    comparisons = []
+    for quantity, entry in expected.items():
+        reference = np.nan if entry['value'] is None else entry['value']
+        if quantity not in values:
+            comparisons.append(Comparison('fixture', 'published numbers', 'package', quantity, reference, None, np.inf, entry['kind'], False))
+            continue
+        fast = values[quantity][1]
+        error, passed = _deviation(reference, fast, **tolerances[entry['kind']])
+        comparisons.append(Comparison('fixture', 'published numbers', 'package', quantity, reference, fast, error, entry['kind'], passed))
+    for quantity in values.keys() - expected.keys():
+        comparisons.append(Comparison('fixture', 'published numbers', 'package', quantity, None, values[quantity][1], np.inf, values[quantity][0], False))
+    return pd.DataFrame(comparisons, columns=Comparison._fields)
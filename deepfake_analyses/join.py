@@ -0,0 +1,133 @@
+import numpy as np
+
+
+# Strip the question suffix so that 'Biden_1X1__2' and 'Biden_1X1_share' name the same block
+def block_name(key):
+    if key.endswith('_share'):
+        return key[:-len('_share')]
+    if '__' in key:
+        return key.rsplit('__', 1)[0]
+    return key
+
+
+# Flatten {key: scores} into parallel (block, respondent, score) arrays.
+# Scores are either {respondent_id: score} dicts or legacy lists, in which case the
+# list position is the respondent and None marks a skipped item. Streamed score files
+# hold the lists as arrays with negative codes for skipped items.
+def to_keyed_arrays(data):
+    blocks = []
+    respondents = []
+    scores = []
+
+    for key, values in data.items():
+        if isinstance(values, np.ndarray):
+            answered = np.flatnonzero(values >= 0)
+            blocks.append(np.full(len(answered), block_name(key), dtype=object))
+            respondents.append(answered.astype(str).astype(object))
+            scores.append(values[answered].astype(float))
+            continue
+        if isinstance(values, dict):
+            items = values.items()
+        else:
+            items = enumerate(values)
+        answered = [(str(respondent), score) for respondent, score in items if score is not None]
+        blocks.append(np.full(len(answered), block_name(key), dtype=object))
+        respondents.append(np.array([respondent for respondent, _ in answered], dtype=object))
+        scores.append(np.array([score for _, score in answered], dtype=float))
+
+    if not blocks:
+        return np.array([], dtype=object), np.array([], dtype=object), np.array([], dtype=float)
+    return np.concatenate(blocks), np.concatenate(respondents), np.concatenate(scores)
+
+
+# Build respondent-keyed score dicts straight from the survey, ready for json.dump
+def keyed_scores_from_survey(df, columns, id_column=None):
+    ids = df[id_column] if id_column is not None else df.index.to_series()
+    keyed = {}
+    for column in columns:
+        if column not in df.columns:
+            continue
+        answered = df[column].notna()
+        keyed[column] = dict(zip(ids[answered].astype(str), df.loc[answered, column].astype(int).tolist()))
+    return keyed
+
+
+# Raise if a respondent answered the same block twice on one side of the join
+def _check_unique(sorted_keys, side):
+    duplicates = np.count_nonzero(sorted_keys[1:] == sorted_keys[:-1])
+    if duplicates:
+        raise ValueError(f"{duplicates} duplicate respondent/block pairs in the {side} scores.")
+
+
+# Raise unless the list positions of a block pair the same respondents on both sides: legacy
+# lists of one block must have equal lengths, and a list cannot be paired with a keyed file
+def _check_positions(data_credible, data_share):
+    share_values = {block_name(key): values for key, values in data_share.items()}
+    for key, credible in data_credible.items():
+        share = share_values.get(block_name(key))
+        if share is None or (isinstance(credible, dict) and isinstance(share, dict)):
+            continue
+        if isinstance(credible, dict) or isinstance(share, dict):
+            raise ValueError(f"Block {block_name(key)} has keyed scores on one side and a score list on the other. "
+                             "Use keyed {respondent: score} files for both, see keyed_scores_from_survey.")
+        if len(credible) != len(share):
+            raise ValueError(f"The credibility and sharing lists of block {block_name(key)} have different lengths "
+                             f"({len(credible)} and {len(share)}), so their positions do not identify respondents. "
+                             "Use keyed {respondent: score} files, see keyed_scores_from_survey.")
+
+
+# Align credibility and sharing scores on (block, respondent) with one sorted-index merge.
+# Returns the matched rows and a per-block report of rows that found no partner.
+def align_scores(data_credible, data_share):
+    _check_positions(data_credible, data_share)
+    blocks_c, respondents_c, scores_c = to_keyed_arrays(data_credible)
+    blocks_s, respondents_s, scores_s = to_keyed_arrays(data_share)
+
+    # Factorize block names and respondent ids over both sides into one integer key
+    block_names, block_codes = np.unique(np.concatenate([blocks_c, blocks_s]).astype(str), return_inverse=True)
+    respondent_ids, respondent_codes = np.unique(np.concatenate([respondents_c, respondents_s]).astype(str), return_inverse=True)
+    keys = block_codes.astype(np.int64) * len(respondent_ids) + respondent_codes
+    n_credible = len(scores_c)
+    keys_c, keys_s = keys[:n_credible], keys[n_credible:]
+    block_codes_c, block_codes_s = block_codes[:n_credible], block_codes[n_credible:]
+
+    order_s = np.argsort(keys_s, kind='stable')
+    sorted_s = keys_s[order_s]
+    _check_unique(np.sort(keys_c), 'credible')
+    _check_unique(sorted_s, 'share')
+
+    positions = np.searchsorted(sorted_s, keys_c)
+    in_range = positions < len(sorted_s)
+    matched_c = np.zeros(len(keys_c), dtype=bool)
+    matched_c[in_range] = sorted_s[positions[in_range]] == keys_c[in_range]
+    partner = order_s[positions[matched_c]]
+
+    matched_s = np.zeros(len(keys_s), dtype=bool)
+    matched_s[partner] = True
+
+    aligned = {
+        'block': block_names[block_codes_c[matched_c]],
+        'respondent': respondent_ids[respondent_codes[:n_credible][matched_c]],
+        'credible': scores_c[matched_c],
+        'share': scores_s[partner],
+    }
+
+    credible_only = np.bincount(block_codes_c[~matched_c], minlength=len(block_names))
+    share_only = np.bincount(block_codes_s[~matched_s], minlength=len(block_names))
+    report = {
+        str(block): {'credible_only': int(c_only), 'share_only': int(s_only)}
+        for block, c_only, s_only in zip(block_names, credible_only, share_only)
+        if c_only or s_only
+    }
+
+    return aligned, report
+
+
+# Print the rows that found no partner, per block
+def print_unmatched_report(report):
+    if not report:
+        print("All credibility and sharing scores were matched by respondent.")
+        return
+    print("Block & Credible only & Share only")
+    for block, counts in report.items():
+        print(f"{block} & {counts['credible_only']} & {counts['share_only']}")
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+from deepfake_analyses import npstats, trace
+from deepfake_analyses.blocks import available_blocks, question_types
+from deepfake_analyses.regression import design_cell
+from deepfake_analyses.screening import duration_column, exclusion_flags
+from deepfake_analyses.survey import post_influence_cols, pre_influence_cols, quality_flags_column
+from deepfake_analyses.transitions import codes, histogram_quantile
+
+# A specification is one exclusion rule, given as a boolean mask of the responses it keeps.
+# All specifications are evaluated together: every statistic is a sum over responses, so
+# one matrix product with the (responses x specifications) mask matrix gives it for all of them.
+
+# Coefficients of the 5_ politician x stance regression
+regression_terms = ['const', 'politician', 'stance', 'politician x stance']
+
+
+# Exclusion rules that can be derived from the export itself: finished only, each screening
+# flag, and duration thresholds when the export still has its duration column
+def standard_masks(df, duration_fractions=(1 / 4, 1 / 3, 1 / 2)):
+    finished = (df['Finished'] == 1).to_numpy()
+    masks = {'finished': finished}
+
+    if quality_flags_column in df.columns:
+        flags = df[quality_flags_column].fillna(0).to_numpy().astype(np.int64)
+        for reason, bit in exclusion_flags.items():
+            masks[f"finished, no {reason.replace('_', '-')}"] = finished & (flags & bit == 0)
+        masks['finished, no quality flags'] = finished & (flags == 0)
+
+    if duration_column in df.columns:
+        duration = df[duration_column].to_numpy(dtype=float)
+        median = np.nanmedian(duration[finished])
+        for fraction in duration_fractions:
+            masks[f'finished, duration >= {fraction:.2f} x median'] = finished & (duration >= fraction * median)
+
+    return masks
+
+
+# Masks from a CSV with one 0/1 column per specification and one row per response, in the
+# order of the survey, e.g. attention checks prepared by hand
+def load_masks(file_path, respondents):
+    masks = pd.read_csv(file_path)
+    if len(masks) != respondents:
+        raise ValueError(f"{file_path} has {len(masks)} rows, the survey has {respondents} responses.")
+    return {column: masks[column].fillna(0).to_numpy().astype(bool) for column in masks.columns}
+
+
+# Count, sum and sum of squares of every column under every mask
+def _masked_moments(values, mask_matrix):
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    return valid.T.astype(float) @ mask_matrix, filled.T @ mask_matrix, (filled ** 2).T @ mask_matrix
+
+
+# 3_: paired t-test of every stance under every mask
+def _stance_columns(df, mask_matrix):
+    keys = [key for key in pre_influence_cols if pre_influence_cols[key] in df.columns and post_influence_cols[key] in df.columns]
+    differences = np.column_stack([df[post_influence_cols[key]].to_numpy(dtype=float) - df[pre_influence_cols[key]].to_numpy(dtype=float)
+                                   for key in keys]) if keys else np.empty((len(df), 0))
+    n, sums, squares = _masked_moments(differences, mask_matrix)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = sums / n
+        t_stat, p_val = npstats.ttest_from_moments(n, mean, squares - sums * mean)
+
+    columns = {}
+    for i, key in enumerate(keys):
+        columns[f'{key} mean change'] = mean[i]
+        columns[f'{key} t'] = t_stat[i]
+        columns[f'{key} p'] = p_val[i]
+    return columns
+
+
+# 4_: mean and median of every question type over the deepfake blocks under every mask
+def _aggregate_columns(df, mask_matrix, exclude='Trump_Bonus'):
+    deepfake_blocks = [questions for block, questions in available_blocks(df).items() if block != exclude]
+    columns = {}
+    if not deepfake_blocks:
+        return columns
+
+    for position, question_type in enumerate(question_types.values()):
+        values = df[[questions[position] for questions in deepfake_blocks]].to_numpy(dtype=float)
+        per_response = np.column_stack([np.where(~np.isnan(values), 1.0, 0.0).sum(axis=1), np.nansum(values, axis=1)])
+        n, sums = (per_response.T @ mask_matrix)
+        histograms = np.column_stack([(values == code).sum(axis=1) for code in codes]).T.astype(float) @ mask_matrix
+        with np.errstate(divide='ignore', invalid='ignore'):
+            columns[f'{question_type} mean'] = sums / n
+        columns[f'{question_type} median'] = np.array([histogram_quantile(histograms[:, k], 0.5) for k in range(mask_matrix.shape[1])])
+    return columns
+
+
+# 5_: politician x stance OLS of the credibility answers under every mask. The design only
+# depends on the block, so X'X and X'y follow from per-cell counts and sums of the answers.
+def _regression_columns(df, mask_matrix, exclude='Trump_Bonus'):
+    cells = {}
+    for block, questions in available_blocks(df).items():
+        if block == exclude:
+            continue
+        cells.setdefault(design_cell(block), []).append(questions[1])
+    if not cells:
+        return {}
+
+    design = np.array([[1, politician, stance, politician * stance] for politician, stance in cells], dtype=float)
+    per_cell = [df[columns].to_numpy(dtype=float) for columns in cells.values()]
+    counts = np.column_stack([(~np.isnan(values)).sum(axis=1) for values in per_cell]).T.astype(float) @ mask_matrix
+    sums = np.column_stack([np.nansum(values, axis=1) for values in per_cell]).T @ mask_matrix
+    squares = np.column_stack([np.nansum(values ** 2, axis=1) for values in per_cell]).T @ mask_matrix
+
+    xtx = np.einsum('ck,ci,cj->kij', counts, design, design)
+    xty = np.einsum('ck,ci->ki', sums, design)
+    yty = squares.sum(axis=0)
+    nobs = counts.sum(axis=0)
+
+    specifications = mask_matrix.shape[1]
+    params = np.full((specifications, len(regression_terms)), np.nan)
+    pvalues = np.full((specifications, len(regression_terms)), np.nan)
+    for k in range(specifications):
+        if nobs[k] > len(regression_terms):
+            model = npstats.ols_from_moments(xtx[k], xty[k], yty[k], int(nobs[k]))
+            params[k], pvalues[k] = model.params, model.pvalues
+
+    columns = {}
+    for i, term in enumerate(regression_terms):
+        columns[f'{term} coef'] = params[:, i]
+        columns[f'{term} p'] = pvalues[:, i]
+    return columns
+
+
+# Specification-curve table: one row per mask with its sample size, the 3_ stance t-tests,
+# the 4_ block aggregates and the 5_ OLS coefficients, sorted by sort_by when given
+@trace.traced
+def run_multiverse(df, masks, sort_by=None):
+    mask_matrix = np.column_stack([np.asarray(mask, dtype=bool) for mask in masks.values()]).astype(float)
+
+    columns = {'n': mask_matrix.sum(axis=0).astype(int)}
+    columns.update(_stance_columns(df, mask_matrix))
+    columns.update(_aggregate_columns(df, mask_matrix))
+    columns.update(_regression_columns(df, mask_matrix))
+    table = pd.DataFrame(columns, index=pd.Index(list(masks), name='specification'))
+
+    if sort_by is not None:
+        table = table.sort_values(sort_by)
+        table.insert(0, 'rank', np.arange(1, len(table) + 1))
+    return table
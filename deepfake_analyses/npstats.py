@@ -0,0 +1,718 @@
+import math
+
+import numpy as np
+
+# NumPy-only replacements for the scipy t-tests, the statsmodels OLS and the sklearn
+# LinearRegression used by the analyses. p-values come from the regularized incomplete
+# beta function below, so importing this module only costs NumPy.
+
+_LANCZOS_G = 7
+_LANCZOS_COEFFICIENTS = np.array([
+    0.99999999999980993, 676.5203681218851, -1259.1392167224028, 771.32342877765313,
+    -176.61502916214059, 12.507343278686905, -0.13857109526572012,
+    9.9843695780195716e-6, 1.5056327351493116e-7
+])
+
+_TINY = 1e-300
+
+
+# Log-gamma via the Lanczos approximation, valid for x >= 0.5
+def _lgamma(x):
+    x = np.asarray(x, dtype=float) - 1.0
+    series = np.full(x.shape, _LANCZOS_COEFFICIENTS[0])
+    for i in range(1, len(_LANCZOS_COEFFICIENTS)):
+        series = series + _LANCZOS_COEFFICIENTS[i] / (x + i)
+    t = x + _LANCZOS_G + 0.5
+    return 0.5 * np.log(2 * np.pi) + (x + 0.5) * np.log(t) - t + np.log(series)
+
+
+# Continued fraction of the incomplete beta function (modified Lentz), elementwise.
+# Converged elements drop out, so a few slow ones do not hold up the rest.
+def _beta_continued_fraction(a, b, x, max_iter=100000, eps=1e-15):
+    qab = a + b
+    qap = a + 1.0
+    qam = a - 1.0
+    c = np.ones_like(x)
+    d = 1.0 - qab * x / qap
+    d = np.where(np.abs(d) < _TINY, _TINY, d)
+    d = 1.0 / d
+    h = d.copy()
+
+    result = h.copy()
+    active = np.arange(len(x))
+    for m in range(1, max_iter + 1):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = np.where(np.abs(d) < _TINY, _TINY, d)
+        c = 1.0 + aa / c
+        c = np.where(np.abs(c) < _TINY, _TINY, c)
+        d = 1.0 / d
+        h *= d * c
+
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = np.where(np.abs(d) < _TINY, _TINY, d)
+        c = 1.0 + aa / c
+        c = np.where(np.abs(c) < _TINY, _TINY, c)
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+
+        converged = np.abs(delta - 1.0) < eps
+        if converged.any():
+            result[active[converged]] = h[converged]
+            keep = ~converged
+            if not keep.any():
+                return result
+            active = active[keep]
+            a, b, x, qab, qap, qam, c, d, h = (v[keep] for v in (a, b, x, qab, qap, qam, c, d, h))
+
+    result[active] = h
+    return result
+
+
+# Stirling series remainder of log-gamma, accurate to ~1e-14 for x >= 10
+def _stirling_correction(x):
+    inverse = 1.0 / x
+    inverse_sq = inverse * inverse
+    return inverse * (1 / 12 - inverse_sq * (1 / 360 - inverse_sq * (1 / 1260 - inverse_sq * (1 / 1680 - inverse_sq / 1188))))
+
+
+# log B(a, b) without subtracting huge log-gamma values when a or b is large
+def _log_beta(a, b):
+    small, large = np.minimum(a, b), np.maximum(a, b)
+    result = np.empty(np.shape(a))
+
+    both_small = large < 10
+    result[both_small] = _lgamma(small[both_small]) + _lgamma(large[both_small]) - _lgamma(small[both_small] + large[both_small])
+
+    # lgamma(large) - lgamma(large + small) from the Stirling series, where the large terms cancel analytically
+    big = ~both_small
+    s, l = small[big], large[big]
+    difference = (-(l - 0.5) * np.log1p(s / l) - s * np.log(l + s) + s
+                  + _stirling_correction(l) - _stirling_correction(l + s))
+    log_gamma_small = np.where(s >= 10,
+                               0.5 * np.log(2 * np.pi) + (s - 0.5) * np.log(s) - s + _stirling_correction(np.maximum(s, 10)),
+                               _lgamma(np.minimum(s, 10)))
+    result[big] = log_gamma_small + difference
+    return result
+
+
+# Regularized incomplete beta function I_x(a, b), broadcast over all arguments.
+# y = 1 - x can be passed when the caller knows it more precisely than 1 - x.
+def betainc(a, b, x, y=None):
+    if y is None:
+        y = 1.0 - np.asarray(x, dtype=float)
+    a, b, x, y = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (a, b, x, y)))
+    result = np.full(x.shape, np.nan)
+    result[x <= 0] = 0.0
+    result[y <= 0] = 1.0
+
+    inside = (x > 0) & (y > 0) & (a > 0) & (b > 0)
+    if not inside.any():
+        return result
+
+    a, b, x, y = a[inside], b[inside], x[inside], y[inside]
+    # np.where evaluates both branches; the one not taken may be log(0)
+    with np.errstate(divide='ignore'):
+        log_x = np.where(x < 0.5, np.log(x), np.log1p(-y))
+        log_y = np.where(y < 0.5, np.log(y), np.log1p(-x))
+    front = np.exp(a * log_x + b * log_y - _log_beta(a, b))
+
+    # The continued fraction converges fast on one side of (a + 1) / (a + b + 2), use symmetry on the other
+    direct = x < (a + 1.0) / (a + b + 2.0)
+    values = np.empty(x.shape)
+    if direct.any():
+        values[direct] = front[direct] * _beta_continued_fraction(a[direct], b[direct], x[direct]) / a[direct]
+    if (~direct).any():
+        swapped = ~direct
+        values[swapped] = 1.0 - front[swapped] * _beta_continued_fraction(b[swapped], a[swapped], y[swapped]) / b[swapped]
+
+    result[inside] = values
+    return result
+
+
+# Two-sided p-value of a t statistic with df degrees of freedom
+def t_pvalue(t, df):
+    t = np.asarray(t, dtype=float)
+    df = np.asarray(df, dtype=float)
+    t_sq = np.where(np.isinf(t), 1.0, t * t)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = np.where(np.isinf(t), 0.0, df / (df + t_sq))
+        y = np.where(np.isinf(t), 1.0, t_sq / (df + t_sq))
+    p = betainc(df / 2.0, 0.5, x, y)
+    return np.where(np.isnan(t) | ~(df > 0), np.nan, p)
+
+
+# Upper tail probability of an F statistic
+def f_pvalue(f, df_num, df_den):
+    f = np.asarray(f, dtype=float)
+    scaled = np.where(np.isinf(f), 1.0, df_num * f)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = np.where(np.isinf(f), 0.0, df_den / (df_den + scaled))
+        y = np.where(np.isinf(f), 1.0, scaled / (df_den + scaled))
+    p = betainc(df_den / 2.0, df_num / 2.0, x, y)
+    return np.where(np.isnan(f), np.nan, p)
+
+
+def _as_columns(values):
+    values = np.asarray(values, dtype=float)
+    return values.reshape(len(values), -1), values.ndim == 1
+
+
+def _unwrap(statistic, pvalue, was_1d):
+    if was_1d:
+        return float(statistic[0]), float(pvalue[0])
+    return statistic, pvalue
+
+
+# Count, mean and sum of squared deviations per column, ignoring NaN
+def _nan_moments(values):
+    valid = ~np.isnan(values)
+    n = valid.sum(axis=0)
+    filled = np.where(valid, values, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = filled.sum(axis=0) / n
+    squares = (np.where(valid, values - mean, 0.0) ** 2).sum(axis=0)
+    return n, mean, squares
+
+
+# One-sample t-test of mean against 0 from count, mean and sum of squared deviations
+def ttest_from_moments(n, mean, squares):
+    n = np.asarray(n, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = squares / (n - 1)
+        statistic = mean / np.sqrt(variance / n)
+    return statistic, t_pvalue(statistic, n - 1)
+
+
+# Paired t-test of a - b per column, pairs with a missing value are dropped (scipy ttest_rel)
+def ttest_rel(a, b):
+    a, was_1d = _as_columns(a)
+    b, _ = _as_columns(b)
+    statistic, pvalue = ttest_from_moments(*_nan_moments(a - b))
+    return _unwrap(statistic, pvalue, was_1d)
+
+
+# Independent two-sample t-test per column, NaN omitted (scipy ttest_ind with nan_policy='omit').
+# equal_var=False gives Welch's test.
+def ttest_ind(a, b, equal_var=True):
+    a, was_1d = _as_columns(a)
+    b, _ = _as_columns(b)
+    statistic, pvalue = ttest_ind_from_moments(*_nan_moments(a), *_nan_moments(b), equal_var=equal_var)
+    return _unwrap(statistic, pvalue, was_1d)
+
+
+# Two-sample test of all values of a against all values of b (NaN omitted) when every row
+# holds the values of one respondent: the difference in means as the slope of the pooled
+# values on a dummy for a, with the respondents as clusters. Only per-row counts and sums
+# are needed, so the cost is one pass over the values. t-test with clusters - 1 df.
+def cluster_ttest_ind(a, b):
+    a = np.asarray(a, dtype=float).reshape(len(a), -1)
+    b = np.asarray(b, dtype=float).reshape(len(b), -1)
+    count_a, count_b = (~np.isnan(a)).sum(axis=1), (~np.isnan(b)).sum(axis=1)
+    sum_a, sum_b = np.nansum(a, axis=1), np.nansum(b, axis=1)
+    n_a, n_b = count_a.sum(), count_b.sum()
+    mean_a, mean_b = sum_a.sum() / n_a, sum_b.sum() / n_b
+
+    # Per-respondent sums of the scores of the constant and of the dummy
+    residual_a = sum_a - count_a * mean_a
+    residual_b = sum_b - count_b * mean_b
+    scores = np.column_stack([residual_a + residual_b, residual_a])
+    clusters = int(np.count_nonzero(count_a + count_b))
+    nobs = n_a + n_b
+    bread = np.linalg.inv([[nobs, n_a], [n_a, n_a]])
+    correction = clusters / (clusters - 1) * (nobs - 1) / (nobs - 2)
+    cov = correction * bread @ (scores.T @ scores) @ bread
+    statistic = (mean_a - mean_b) / np.sqrt(cov[1, 1])
+    return float(statistic), float(t_pvalue(statistic, clusters - 1))
+
+
+# ttest_ind from the count, mean and sum of squared deviations of both samples
+def ttest_ind_from_moments(n_a, mean_a, squares_a, n_b, mean_b, squares_b, equal_var=True):
+    n_a = np.asarray(n_a, dtype=float)
+    n_b = np.asarray(n_b, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if equal_var:
+            df = n_a + n_b - 2.0
+            pooled = (squares_a + squares_b) / df
+            standard_error = np.sqrt(pooled * (1.0 / n_a + 1.0 / n_b))
+        else:
+            var_a = squares_a / (n_a - 1) / n_a
+            var_b = squares_b / (n_b - 1) / n_b
+            standard_error = np.sqrt(var_a + var_b)
+            df = (var_a + var_b) ** 2 / (var_a ** 2 / (n_a - 1) + var_b ** 2 / (n_b - 1))
+        statistic = (mean_a - mean_b) / standard_error
+    return statistic, t_pvalue(statistic, df)
+
+
+# Results of one OLS fit, named like the statsmodels attributes the analyses use. With the
+# cluster-robust covariance cov of clusters groups, the t and F tests use clusters - 1
+# denominator degrees of freedom, as statsmodels' cov_type='cluster' with use_t=True does.
+class OLSResults:
+    def __init__(self, params, bse, df_resid, df_model, nobs, ssr, centered_tss, cov=None, clusters=None):
+        self.params = params
+        self.bse = bse
+        self.df_resid = df_resid
+        self.df_model = df_model
+        self.nobs = nobs
+        # NumPy scalars, so that a constant outcome or a constant-only design gives NaN, not an error
+        ssr, centered_tss = np.float64(ssr), np.float64(centered_tss)
+        self.ssr = ssr
+        self.clusters = clusters
+        self.cov_type = 'nonrobust' if clusters is None else 'cluster'
+        df_tests = df_resid if clusters is None else clusters - 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.tvalues = params / bse
+            self.rsquared = 1.0 - ssr / centered_tss
+            if clusters is None:
+                self.fvalue = ((centered_tss - ssr) / df_model) / (ssr / df_resid)
+            else:
+                slopes = params[1:]
+                self.fvalue = float(slopes @ np.linalg.pinv(cov[1:, 1:]) @ slopes) / df_model
+        self.pvalues = t_pvalue(self.tvalues, df_tests)
+        self.f_pvalue = float(f_pvalue(self.fvalue, df_model, df_tests))
+
+    def summary(self):
+        lines = [
+            "OLS Regression Results (NumPy engine)",
+            f"No. Observations: {self.nobs:>10d}    R-squared:    {self.rsquared:10.4f}",
+            f"Df Residuals:     {self.df_resid:>10d}    F-statistic:  {self.fvalue:10.4g}",
+            f"Df Model:         {self.df_model:>10d}    Prob (F):     {self.f_pvalue:10.4g}",
+        ]
+        if self.clusters is not None:
+            lines.append(f"Covariance Type:     cluster    Clusters:     {self.clusters:10d}")
+        lines += [
+            "",
+            f"{'':>8} {'coef':>10} {'std err':>10} {'t':>10} {'P>|t|':>10}",
+        ]
+        names = ['const'] + [f'x{i}' for i in range(1, len(self.params))]
+        for name, coef, se, t, p in zip(names, self.params, self.bse, self.tvalues, self.pvalues):
+            lines.append(f"{name:>8} {coef:10.4f} {se:10.4f} {t:10.3f} {p:10.4f}")
+        return "\n".join(lines)
+
+
+# Column sums of values for every group code, as a (groups, columns) array
+def _group_sums(values, codes, groups):
+    values = np.asarray(values, dtype=float).reshape(len(codes), -1)
+    return np.column_stack([np.bincount(codes, weights=values[:, j], minlength=groups) for j in range(values.shape[1])])
+
+
+# Integer codes 0..G-1 of group labels, sorted once. Labels that already are small
+# non-negative integers, like respondent positions, are used as they are without sorting.
+def _group_codes(groups):
+    groups = np.asarray(groups)
+    if groups.dtype.kind in 'iu' and groups.size and groups.min() >= 0 and groups.max() < 2 * groups.size:
+        return groups.astype(np.int64), int(groups.max()) + 1
+    _, codes = np.unique(groups, return_inverse=True)
+    return codes.ravel(), int(codes.max()) + 1 if codes.size else 0
+
+
+# Cluster-robust (sandwich) covariance: bread normalized_cov = (X'X)^-1, meat the outer
+# products of the per-cluster sums of the scores x_i * residual_i, each score column summed
+# over the group codes in one bincount pass. Small-sample factor
+# G / (G - 1) * (n - 1) / (n - k) as in statsmodels. Returns cov and the number of clusters G.
+def cluster_robust_cov(X, residuals, groups, normalized_cov):
+    codes, size = _group_codes(groups)
+    scores = _group_sums(X * residuals[:, None], codes, size)
+    clusters = int(np.count_nonzero(np.bincount(codes, minlength=size)))
+    nobs, k = len(X), np.linalg.matrix_rank(normalized_cov)
+    correction = clusters / (clusters - 1) * (nobs - 1) / (nobs - k)
+    return correction * normalized_cov @ (scores.T @ scores) @ normalized_cov, clusters
+
+
+# Ordinary least squares with the constant included in X, solved by pseudo-inverse like statsmodels.
+# With groups (e.g. the respondent of every rating) the standard errors are cluster-robust.
+def ols(X, y, groups=None):
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    pinv_X = np.linalg.pinv(X)
+    params = pinv_X @ y
+    normalized_cov = pinv_X @ pinv_X.T
+
+    rank = np.linalg.matrix_rank(X)
+    nobs = len(y)
+    df_resid = nobs - rank
+    residuals = y - X @ params
+    ssr = float(residuals @ residuals)
+    centered_tss = float(((y - y.mean()) ** 2).sum())
+    if groups is None:
+        bse = np.sqrt(np.diag(normalized_cov) * ssr / df_resid)
+        return OLSResults(params, bse, int(df_resid), int(rank - 1), nobs, ssr, centered_tss)
+
+    cov, clusters = cluster_robust_cov(X, residuals, groups, normalized_cov)
+    return OLSResults(params, np.sqrt(np.diag(cov)), int(df_resid), int(rank - 1), nobs, ssr, centered_tss,
+                      cov=cov, clusters=clusters)
+
+
+# OLS from the cross-products X'X, X'y and y'y of nobs rows, with the constant as the first
+# column of X. Cross-products of several data sets add up, so they can be fitted together.
+def ols_from_moments(xtx, xty, yty, nobs):
+    xtx = np.asarray(xtx, dtype=float)
+    xty = np.asarray(xty, dtype=float)
+    normalized_cov = np.linalg.pinv(xtx)
+    params = normalized_cov @ xty
+
+    rank = np.linalg.matrix_rank(xtx)
+    df_resid = nobs - rank
+    ssr = float(yty - params @ xty)
+    centered_tss = float(yty - xty[0] ** 2 / nobs)
+    bse = np.sqrt(np.diag(normalized_cov) * ssr / df_resid)
+
+    return OLSResults(params, bse, int(df_resid), int(rank - 1), int(nobs), ssr, centered_tss)
+
+
+# Intercept and slope of one predictor (the sklearn LinearRegression fit), with standard errors
+def simple_regression(x, y):
+    x = np.asarray(x, dtype=float).ravel()
+    return ols(np.column_stack((np.ones(len(x)), x)), y)
+
+
+# Many OLS fits at once from the normal equations.
+# X is (n, p) shared by all outcomes or (batch, n, p); Y is (n,), (n, k) or (batch, n).
+# Every design must have full column rank.
+def ols_batch(X, Y):
+    X = np.asarray(X, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+
+    if X.ndim == 2:
+        Y2 = Y.reshape(len(Y), -1)
+        xtx_inv = np.linalg.inv(X.T @ X)
+        params = xtx_inv @ (X.T @ Y2)
+        residuals = Y2 - X @ params
+        df_resid = X.shape[0] - X.shape[1]
+        scale = (residuals ** 2).sum(axis=0) / df_resid
+        bse = np.sqrt(np.outer(np.diag(xtx_inv), scale))
+        params, bse = params.T, bse.T
+        if Y.ndim == 1:
+            params, bse = params[0], bse[0]
+    else:
+        xtx_inv = np.linalg.inv(np.einsum('bnp,bnq->bpq', X, X))
+        params = np.einsum('bpq,bq->bp', xtx_inv, np.einsum('bnp,bn->bp', X, Y))
+        residuals = Y - np.einsum('bnp,bp->bn', X, params)
+        df_resid = X.shape[1] - X.shape[2]
+        scale = (residuals ** 2).sum(axis=1) / df_resid
+        bse = np.sqrt(np.diagonal(xtx_inv, axis1=1, axis2=2) * scale[:, None])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tvalues = params / bse
+    return {
+        'params': params,
+        'bse': bse,
+        'tvalues': tvalues,
+        'pvalues': t_pvalue(tvalues, df_resid),
+        'df_resid': df_resid,
+    }
+
+
+# ols_batch from cross-products: xtx is (p, p) shared by all fits or (batch, p, p), xty is
+# (batch, p), yty and nobs are (batch,) or scalars. Every design must have full column rank.
+def ols_batch_from_moments(xtx, xty, yty, nobs):
+    xtx_inv = np.linalg.inv(np.asarray(xtx, dtype=float))
+    xty = np.asarray(xty, dtype=float)
+    params = np.einsum('...pq,...q->...p', xtx_inv, xty)
+    df_resid = np.asarray(nobs) - xty.shape[-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = (yty - (params * xty).sum(axis=-1)) / df_resid
+        bse = np.sqrt(np.diagonal(xtx_inv, axis1=-2, axis2=-1) * np.asarray(scale)[..., None])
+        tvalues = params / bse
+    return {
+        'params': params,
+        'bse': bse,
+        'tvalues': tvalues,
+        'pvalues': t_pvalue(tvalues, np.asarray(df_resid)[..., None]),
+        'df_resid': df_resid,
+    }
+
+
+# Two-sided p-value of a standard normal z statistic
+def normal_pvalue(z):
+    z = np.asarray(z, dtype=float)
+    return np.vectorize(lambda value: math.erfc(abs(value) / math.sqrt(2.0)), otypes=[float])(z)
+
+
+# Results of a proportional-odds fit: params are the covariate coefficients, thresholds the
+# cut points between consecutive answer levels (statsmodels OrderedModel convention,
+# P(y <= j) = F(threshold_j - x'params))
+class OrdinalResults:
+    def __init__(self, params, thresholds, cov, llf, nobs, cells, levels, iterations):
+        self.params = params
+        self.thresholds = thresholds
+        self.cov = cov
+        self.llf = llf
+        self.nobs = nobs
+        self.cells = cells
+        self.levels = levels
+        self.iterations = iterations
+        self.bse = np.sqrt(np.diag(cov))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.tvalues = np.concatenate([params, thresholds]) / self.bse
+        self.pvalues = normal_pvalue(self.tvalues)
+
+    def summary(self):
+        lines = [
+            "Ordinal Regression Results, cumulative logit (NumPy engine)",
+            f"No. Observations: {self.nobs:>10d}    Log-Likelihood: {self.llf:12.4f}",
+            f"Covariate cells:  {self.cells:>10d}    Iterations:     {self.iterations:12d}",
+            "",
+            f"{'':>8} {'coef':>10} {'std err':>10} {'z':>10} {'P>|z|':>10}",
+        ]
+        names = [f'x{i}' for i in range(1, len(self.params) + 1)]
+        names += [f'{lower}/{upper}' for lower, upper in zip(self.levels[:-1], self.levels[1:])]
+        for name, coef, se, z, p in zip(names, np.concatenate([self.params, self.thresholds]), self.bse, self.tvalues, self.pvalues):
+            lines.append(f"{name:>8} {coef:10.4f} {se:10.4f} {z:10.3f} {p:10.4f}")
+        return "\n".join(lines)
+
+
+def _logistic(z):
+    with np.errstate(over='ignore'):
+        return 1.0 / (1.0 + np.exp(-z))
+
+
+# Proportional-odds (cumulative logit) model fitted by Newton-Raphson on a count table:
+# covariates is (cells, q) without a constant, counts is (cells, levels) with how often each
+# answer level occurs in each cell. Every step costs O(cells x levels), not O(ratings).
+def ordinal_logit(covariates, counts, level_labels=None, max_iter=100, tol=1e-10):
+    covariates = np.asarray(covariates, dtype=float)
+    counts = np.asarray(counts, dtype=float)
+    level_labels = np.arange(1, counts.shape[1] + 1) if level_labels is None else np.asarray(level_labels)
+    observed = counts.sum(axis=0) > 0
+    counts, level_labels = counts[:, observed], level_labels[observed]
+    q = covariates.shape[1]
+    k = counts.shape[1] - 1
+    if k < 1:
+        raise ValueError("The outcome needs at least two observed levels.")
+
+    # One likelihood term per non-empty (cell, level) entry, between an upper and a lower cut
+    # point; upper and lower hold the derivatives of (threshold - x'params) by every parameter
+    cell_index, level_index = np.nonzero(counts)
+    weights = counts[cell_index, level_index]
+    x = covariates[cell_index]
+    has_upper = level_index < k
+    has_lower = level_index > 0
+    upper = np.zeros((len(weights), q + k))
+    lower = np.zeros((len(weights), q + k))
+    upper[:, :q] = -x
+    lower[:, :q] = -x
+    upper[np.flatnonzero(has_upper), q + level_index[has_upper]] = 1.0
+    lower[np.flatnonzero(has_lower), q + level_index[has_lower] - 1] = 1.0
+
+    def evaluate(params):
+        eta = x @ params[:q]
+        thresholds = params[q:]
+        upper_cdf = np.where(has_upper, _logistic(thresholds[np.minimum(level_index, k - 1)] - eta), 1.0)
+        lower_cdf = np.where(has_lower, _logistic(thresholds[np.maximum(level_index - 1, 0)] - eta), 0.0)
+        probability = upper_cdf - lower_cdf
+        if np.any(probability <= 0):
+            return -np.inf, upper_cdf, lower_cdf, probability
+        return float(weights @ np.log(probability)), upper_cdf, lower_cdf, probability
+
+    def derivatives(upper_cdf, lower_cdf, probability):
+        upper_density = upper_cdf * (1.0 - upper_cdf)
+        lower_density = lower_cdf * (1.0 - lower_cdf)
+        gradients = (upper_density[:, None] * upper - lower_density[:, None] * lower) / probability[:, None]
+        hessian = (np.einsum('e,ei,ej->ij', weights * upper_density * (1.0 - 2.0 * upper_cdf) / probability, upper, upper)
+                   - np.einsum('e,ei,ej->ij', weights * lower_density * (1.0 - 2.0 * lower_cdf) / probability, lower, lower)
+                   - np.einsum('e,ei,ej->ij', weights, gradients, gradients))
+        return weights @ gradients, hessian
+
+    # Start from the marginal cumulative logits and no covariate effect
+    cumulative = np.cumsum(counts.sum(axis=0))[:-1] / counts.sum()
+    params = np.concatenate([np.zeros(q), np.log(cumulative / (1.0 - cumulative))])
+    llf, *state = evaluate(params)
+    for iteration in range(1, max_iter + 1):
+        gradient, hessian = derivatives(*state)
+        step = np.linalg.solve(-hessian, gradient)
+        # Halve the step until the likelihood improves and the thresholds stay ordered
+        for _ in range(60):
+            new_llf, *new_state = evaluate(params + step)
+            if new_llf >= llf:
+                break
+            step = step / 2.0
+        params, llf, state = params + step, new_llf, new_state
+        if np.max(np.abs(step)) < tol:
+            break
+
+    _, hessian = derivatives(*state)
+    cov = np.linalg.inv(-hessian)
+    return OrdinalResults(params[:q], params[q:], cov, llf, int(counts.sum()), len(covariates), level_labels, iteration)
+
+
+# Results of a linear mixed model with random intercepts: params are the fixed effects,
+# scale the residual variance and variances the variance of every random intercept
+class MixedResults:
+    def __init__(self, params, cov, scale, variances, llf, nobs, groups, reml, evaluations):
+        self.params = params
+        self.cov = cov
+        self.scale = scale
+        self.variances = variances
+        self.llf = llf
+        self.nobs = nobs
+        self.groups = groups
+        self.reml = reml
+        self.evaluations = evaluations
+        self.bse = np.sqrt(np.diag(cov))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.tvalues = params / self.bse
+        self.pvalues = normal_pvalue(self.tvalues)
+
+    def summary(self):
+        method = 'REML' if self.reml else 'ML'
+        lines = [
+            f"Mixed Linear Model Results, random intercepts, {method} (NumPy engine)",
+            f"No. Observations: {self.nobs:>10d}    Log-Likelihood: {self.llf:12.4f}",
+        ]
+        for name, count in self.groups.items():
+            lines.append(f"{name.capitalize() + 's:':<17} {count:>10d}    Variance:       {self.variances[name]:12.4f}")
+        lines += [
+            f"{'Residuals:':<17} {self.nobs:>10d}    Variance:       {self.scale:12.4f}",
+            "",
+            f"{'':>8} {'coef':>10} {'std err':>10} {'z':>10} {'P>|z|':>10}",
+        ]
+        names = ['const'] + [f'x{i}' for i in range(1, len(self.params))]
+        for name, coef, se, z, p in zip(names, self.params, self.bse, self.tvalues, self.pvalues):
+            lines.append(f"{name:>8} {coef:10.4f} {se:10.4f} {z:10.3f} {p:10.4f}")
+        return "\n".join(lines)
+
+
+# Minimize f over a few parameters with the Nelder-Mead simplex; ftol is relative to f
+def _nelder_mead(f, x0, step=0.5, max_iter=1000, xtol=1e-8, ftol=1e-10):
+    simplex = [np.asarray(x0, dtype=float)]
+    for i in range(len(x0)):
+        vertex = simplex[0].copy()
+        vertex[i] += step
+        simplex.append(vertex)
+    values = [f(vertex) for vertex in simplex]
+    evaluations = len(values)
+
+    for _ in range(max_iter):
+        order = np.argsort(values)
+        simplex = [simplex[i] for i in order]
+        values = [values[i] for i in order]
+        size = max(np.max(np.abs(vertex - simplex[0])) for vertex in simplex[1:])
+        if size < xtol and values[-1] - values[0] < ftol * (1.0 + abs(values[0])):
+            break
+
+        centroid = np.mean(simplex[:-1], axis=0)
+        reflected = centroid + (centroid - simplex[-1])
+        f_reflected = f(reflected)
+        evaluations += 1
+        if f_reflected < values[0]:
+            expanded = centroid + 2.0 * (centroid - simplex[-1])
+            f_expanded = f(expanded)
+            evaluations += 1
+            simplex[-1], values[-1] = (expanded, f_expanded) if f_expanded < f_reflected else (reflected, f_reflected)
+        elif f_reflected < values[-2]:
+            simplex[-1], values[-1] = reflected, f_reflected
+        else:
+            contracted = centroid + 0.5 * (simplex[-1] - centroid)
+            f_contracted = f(contracted)
+            evaluations += 1
+            if f_contracted < values[-1]:
+                simplex[-1], values[-1] = contracted, f_contracted
+            else:
+                # Shrink towards the best vertex
+                simplex = [simplex[0]] + [simplex[0] + 0.5 * (vertex - simplex[0]) for vertex in simplex[1:]]
+                values = [values[0]] + [f(vertex) for vertex in simplex[1:]]
+                evaluations += len(simplex) - 1
+
+    best = int(np.argmin(values))
+    return simplex[best], values[best], evaluations
+
+
+# Linear mixed model y = X b + u[respondent] (+ v[video]) + e with normal random intercepts,
+# fitted by maximizing the profiled (RE)ML likelihood over the relative standard deviations
+# theta of the intercepts, as lme4 does. The mixed-model equations are solved with the
+# respondent block eliminated first: it is diagonal, so the only dense factorization is of
+# the (videos + p) square Schur complement. That complement only depends on theta through
+# the number of ratings of each respondent, so it is accumulated once per distinct number of
+# ratings from per-respondent sums; after one linear pass over the ratings, each likelihood
+# evaluation costs O(distinct counts x (videos + p)^2), whatever the number of respondents.
+def mixed_lm(X, y, respondents, videos=None, reml=True):
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    nobs, p = X.shape
+    _, respondent_codes = np.unique(np.asarray(respondents), return_inverse=True)
+    respondent_codes = respondent_codes.ravel()
+    respondent_count = int(respondent_codes.max()) + 1
+
+    # Per-respondent sufficient statistics: ratings, X sums, y sums (and ratings per video)
+    ratings = np.bincount(respondent_codes, minlength=respondent_count)
+    per_respondent = [_group_sums(X, respondent_codes, respondent_count)]
+    fixed_block = X.T @ X
+    fixed_rhs = X.T @ y
+    video_count = 0
+    if videos is not None:
+        _, video_codes = np.unique(np.asarray(videos), return_inverse=True)
+        video_codes = video_codes.ravel()
+        video_count = int(video_codes.max()) + 1
+        cross = np.bincount(respondent_codes * video_count + video_codes, minlength=respondent_count * video_count)
+        per_respondent.insert(0, cross.reshape(respondent_count, video_count).astype(float))
+        video_ratings = np.bincount(video_codes, minlength=video_count)
+        video_x = _group_sums(X, video_codes, video_count)
+        video_y = np.bincount(video_codes, weights=y, minlength=video_count)
+    z = np.hstack(per_respondent)
+    respondent_y = np.bincount(respondent_codes, weights=y, minlength=respondent_count)
+    yty = float(y @ y)
+
+    # Respondents with the same number of ratings are eliminated with the same pivot
+    counts, count_class = np.unique(ratings, return_inverse=True)
+    gram = np.zeros((len(counts), z.shape[1], z.shape[1]))
+    cross_y = np.zeros((len(counts), z.shape[1]))
+    y_squares = np.bincount(count_class, weights=respondent_y ** 2, minlength=len(counts))
+    for k in range(len(counts)):
+        members = count_class == k
+        gram[k] = z[members].T @ z[members]
+        cross_y[k] = z[members].T @ respondent_y[members]
+    degrees = nobs - p if reml else nobs
+
+    def solve(theta):
+        theta_r = theta[0]
+        pivots = theta_r ** 2 * counts + 1.0
+        if video_count:
+            theta_v = theta[1]
+            scaling = np.concatenate([np.full(video_count, theta_r * theta_v), np.full(p, theta_r)])
+            block = np.zeros((video_count + p, video_count + p))
+            block[:video_count, :video_count] = np.diag(theta_v ** 2 * video_ratings + 1.0)
+            block[:video_count, video_count:] = theta_v * video_x
+            block[video_count:, :video_count] = theta_v * video_x.T
+            block[video_count:, video_count:] = fixed_block
+            rhs = np.concatenate([theta_v * video_y, fixed_rhs])
+        else:
+            scaling = np.full(p, theta_r)
+            block = fixed_block.copy()
+            rhs = fixed_rhs.copy()
+
+        schur = block - scaling[:, None] * np.einsum('k,kij->ij', 1.0 / pivots, gram) * scaling[None, :]
+        rhs = rhs - scaling * theta_r * (cross_y.T @ (1.0 / pivots))
+        factor = np.linalg.cholesky(schur)
+        solution = np.linalg.solve(schur, rhs)
+        prss = yty - theta_r ** 2 * float(y_squares @ (1.0 / pivots)) - float(rhs @ solution)
+
+        log_pivots = float(np.log(pivots) @ np.bincount(count_class, minlength=len(counts)))
+        log_diagonal = 2.0 * np.log(np.diag(factor))
+        log_random = log_pivots + log_diagonal[:video_count].sum()
+        deviance = log_random + degrees * (1.0 + np.log(2.0 * np.pi * prss / degrees))
+        if reml:
+            deviance += log_diagonal[video_count:].sum()
+        return deviance, schur, solution, prss
+
+    def objective(theta):
+        try:
+            return solve(np.abs(theta))[0]
+        except np.linalg.LinAlgError:
+            return np.inf
+
+    theta, deviance, evaluations = _nelder_mead(objective, np.ones(2 if video_count else 1))
+    theta = np.abs(theta)
+    deviance, schur, solution, prss = solve(theta)
+
+    scale = prss / degrees
+    cov = scale * np.linalg.inv(schur)[video_count:, video_count:]
+    variances = {'respondent': scale * theta[0] ** 2}
+    groups = {'respondent': respondent_count}
+    if video_count:
+        variances['video'] = scale * theta[1] ** 2
+        groups['video'] = video_count
+    return MixedResults(solution[video_count:], cov, float(scale), variances, float(-deviance / 2.0), nobs, groups, reml, evaluations)
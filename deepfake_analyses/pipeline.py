@@ -0,0 +1,182 @@
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from deepfake_analyses import cli, trace
+
+# A stage runs one CLI handler on input and output file paths; a stage depends on the stages
+# that write its inputs. columns restricts the input hash to the survey columns the stage
+# reads, so that recoding one column only reruns the analyses that use it.
+Stage = namedtuple('Stage', ['name', 'handler', 'inputs', 'outputs', 'columns', 'options'])
+
+CACHE_FILE = 'pipeline_cache.json'
+
+
+# Survey columns read by each analysis stage
+def _stance_columns():
+    from deepfake_analyses.survey import post_influence_cols, pre_influence_cols
+    from deepfake_analyses.survey import quality_flags_column
+    return ['Finished', quality_flags_column] + list(pre_influence_cols.values()) + list(post_influence_cols.values())
+
+
+def _block_columns():
+    from deepfake_analyses.survey import blocks, quality_flags_column
+    return ['Finished', quality_flags_column] + [q for questions in blocks.values() for q in questions]
+
+
+# Stages 1 to 5 as a DAG; regression stages are only added when their score files are given,
+# the quality screening only when screen is set
+def build_stages(raw_csv, mappings, output_dir, credible=None, share=None, screen=False):
+    cleaned = os.path.join(output_dir, 'cleaned.csv')
+    recoded = os.path.join(output_dir, 'recoded.csv')
+    features = os.path.join(output_dir, 'features.csv')
+
+    stages = []
+    if screen:
+        screened = os.path.join(output_dir, 'screened.csv')
+        stages.append(Stage('screen', 'run_screen', {'input': raw_csv, 'mappings': mappings}, {'output': screened}, None,
+                            {'speeder_fraction': 1 / 3, 'min_duration': None, 'min_answered': 10}))
+        raw_csv = screened
+
+    stages += [
+        Stage('delete-metadata', 'run_delete_metadata', {'input': raw_csv}, {'output': cleaned}, None, {}),
+        Stage('recode', 'run_recode', {'input': cleaned, 'mappings': mappings}, {'output': recoded}, None, {}),
+        Stage('stances', 'run_stances', {'input': recoded}, {}, _stance_columns(), {'plot': False}),
+        Stage('features', 'run_features', {'input': recoded}, {'output': features}, _stance_columns(), {'id_column': None}),
+        Stage('blocks', 'run_blocks', {'input': recoded}, {}, _block_columns(), {'plot': False, 'grid': None}),
+        Stage('aggregate', 'run_aggregate', {'input': recoded}, {}, _block_columns(), {'plot': False}),
+        Stage('comparison', 'run_comparison', {'input': recoded}, {}, _block_columns(), {'plot': False, 'cluster': False}),
+    ]
+    if credible is not None:
+        for name in ['regression-confbi', 'regression-aligned']:
+            stages.append(Stage(name, 'run_regression', {'input': credible}, {}, None,
+                                {'plot': False, 'engine': 'numpy', 'video_effects': False, 'cluster': False, 'stage': name,
+                                 'features': None, 'covariates': []}))
+        if share is not None:
+            stages.append(Stage('regression-cred', 'run_regression_cred', {'input': credible, 'share': share}, {}, None, {'plot': False, 'plot_mode': 'bubble'}))
+    return stages
+
+
+# Stages whose inputs are produced by other stages
+def stage_dependencies(stages):
+    producers = {path: stage.name for stage in stages for path in stage.outputs.values()}
+    return {stage.name: {producers[path] for path in stage.inputs.values() if path in producers} for stage in stages}
+
+
+def hash_file(digest, path):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+
+
+# Only the listed columns of a survey CSV enter the hash
+def _hash_columns(digest, path, columns):
+    import pandas as pd
+
+    wanted = set(columns)
+    df = pd.read_csv(path, usecols=lambda c: c in wanted, dtype=str, keep_default_na=False)
+    df = df[sorted(df.columns)]
+    digest.update(json.dumps(list(df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+
+
+# Source of the package, so that changed analysis code invalidates the cache
+def code_version():
+    digest = hashlib.sha256()
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(package_dir)):
+        if name.endswith('.py'):
+            hash_file(digest, os.path.join(package_dir, name))
+    return digest.hexdigest()
+
+
+def stage_key(stage, code_version):
+    digest = hashlib.sha256()
+    digest.update(json.dumps([stage.name, stage.handler, stage.options, code_version], sort_keys=True).encode())
+    for role, path in sorted(stage.inputs.items()):
+        digest.update(role.encode())
+        if stage.columns is not None and role == 'input':
+            _hash_columns(digest, path, stage.columns)
+        else:
+            hash_file(digest, path)
+    return digest.hexdigest()
+
+
+# Run one stage in a worker process and keep its printed results as the stage report.
+# Returns the report path and, when tracing, the worker's trace events.
+def _run_stage(name, handler, arguments, report_path, tracing):
+    if tracing:
+        trace.enable()
+    with open(report_path, 'w') as report, contextlib.redirect_stdout(report):
+        with trace.span(name):
+            getattr(cli, handler)(argparse.Namespace(**arguments))
+    return report_path, trace.collect()
+
+
+def _load_cache(output_dir):
+    path = os.path.join(output_dir, CACHE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _save_cache(output_dir, cache):
+    with open(os.path.join(output_dir, CACHE_FILE), 'w') as f:
+        json.dump(cache, f, indent=2)
+
+
+# Run the DAG, independent stages concurrently, skipping stages whose input hash is unchanged.
+# Returns {stage name: 'ran' or 'cached'}.
+def run_pipeline(stages, output_dir, jobs=None, force=False):
+    os.makedirs(output_dir, exist_ok=True)
+    dependencies = stage_dependencies(stages)
+    cache = {} if force else _load_cache(output_dir)
+    version = code_version()
+
+    status = {}
+    running = {}
+    pending_keys = {}
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        while len(status) < len(stages):
+            progressed = False
+            for stage in stages:
+                name = stage.name
+                if name in status or name in pending_keys or not dependencies[name] <= status.keys():
+                    continue
+
+                with trace.span('hash inputs', stage=name):
+                    key = stage_key(stage, version)
+                report_path = os.path.join(output_dir, f'{name}.txt')
+                outputs = list(stage.outputs.values()) + [report_path]
+                if cache.get(name) == key and all(os.path.exists(path) for path in outputs):
+                    status[name] = 'cached'
+                    progressed = True
+                    trace.instant('cache hit', stage=name)
+                    print(f"{name}: unchanged, using cached results")
+                    continue
+
+                arguments = {**stage.options, **stage.inputs, **stage.outputs}
+                running[executor.submit(_run_stage, name, stage.handler, arguments, report_path, trace.is_enabled())] = name
+                pending_keys[name] = key
+
+            if not running:
+                if not progressed:
+                    raise ValueError(f"Stages {sorted(set(dependencies) - status.keys())} can never run, check for a dependency cycle.")
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                report_path, events = future.result()
+                trace.add_events(events)
+                cache[name] = pending_keys.pop(name)
+                status[name] = 'ran'
+                print(f"{name}: done, results in {report_path}")
+            _save_cache(output_dir, cache)
+
+    return status
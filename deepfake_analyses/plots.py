@@ -0,0 +1,604 @@
+import math
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from deepfake_analyses import trace
+from deepfake_analyses.blocks import available_blocks
+from deepfake_analyses.correlation import cluster_items
+from deepfake_analyses.regression import interaction_predictions
+from deepfake_analyses.survey import mapping_questions, mapping_share
+from deepfake_analyses.transitions import answer_histograms, boxplot_stats, codes, post_histogram, pre_histogram, sign_counts
+
+# Shortened neutral labels for the wide comparison plot
+mapping_questions_short = {**mapping_questions, 4: "Neither [...]"}
+mapping_share_short = {**mapping_share, 4: "Neither [...]"}
+
+
+# Transition table of one stance question as a heatmap, pre answers along the rows and post
+# answers along the columns; respondents who kept their answer are on the diagonal
+def draw_transition_heatmap(ax, table):
+    image = ax.imshow(table, cmap='Blues', origin='lower', extent=(0.5, 7.5, 0.5, 7.5))
+    for pre in codes:
+        for post in codes:
+            count = table[pre - 1, post - 1]
+            if count:
+                ax.text(post, pre, count, ha='center', va='center', fontsize=8,
+                        color='white' if count > table.max() / 2 else 'black')
+    ax.plot([0.5, 7.5], [0.5, 7.5], color='r', linestyle='dashed', linewidth=1)
+    signs = sign_counts(table)
+    ax.set_title(f"Transitions ({signs['decreased']} lower, {signs['unchanged']} same, {signs['increased']} higher)", fontsize=12)
+    ax.set_xlabel('Post', fontsize=12)
+    ax.set_ylabel('Pre', fontsize=12)
+    ax.set_xticks(codes)
+    ax.set_yticks(codes)
+    return image
+
+
+# Histogram, boxplot and transition heatmap of one stance question, all drawn from its
+# transition table: the histograms are weighted by its answer counts and the boxplot statistics
+# are computed from the same counts, so no answers need to be kept
+@trace.traced
+def plot_transitions(table, title, descriptions):
+    subplot_size = 4
+    fig, axes = plt.subplots(nrows=1, ncols=3, figsize=(3*subplot_size + 2, subplot_size + 2))
+    pre_counts = pre_histogram(table)
+    post_counts = post_histogram(table)
+
+    # Histogram
+    axes[0].hist(codes, bins=7, range=(1, 7), weights=pre_counts, alpha=0.4, color='turquoise', label='Pre')
+    axes[0].hist(codes, bins=7, range=(1, 7), weights=post_counts, alpha=0.4, color='darkblue', label='Post')
+    axes[0].axvline(4, color='r', linestyle='dashed', linewidth=1)
+    axes[0].set_title('Histogram', fontsize=15)
+    axes[0].set_xticks(range(1, 8))
+    axes[0].set_xticklabels(range(1, 8), fontsize=12)
+    axes[0].tick_params(axis='y', labelsize=12)
+    axes[0].legend()
+
+    # Boxplot
+    axes[1].bxp([boxplot_stats(post_counts, 'Post'), boxplot_stats(pre_counts, 'Pre')], vert=False)
+    axes[1].axvline(4, color='r', linestyle='dashed', linewidth=1)
+    axes[1].set_title('Boxplot', fontsize=15)
+    axes[1].set_xticks(range(1, 8))
+    axes[1].set_xticklabels(range(1, 8), fontsize=12)
+    axes[1].tick_params(axis='y', labelsize=15)
+
+    draw_transition_heatmap(axes[2], table)
+
+    fig.subplots_adjust(left=0.05, right=0.95, bottom=0.25, wspace=0.3)
+    create_legend_box(fig, descriptions)
+
+    plt.suptitle(title, fontsize=18)
+    plt.show()
+
+
+# Histogram and boxplot of one stance question as two separate figures with the answer
+# descriptions as tick labels, the layout of 3_analysis_politicalblock.py
+@trace.traced
+def plot_stance_figures(table, title, descriptions):
+    pre_counts = pre_histogram(table)
+    post_counts = post_histogram(table)
+
+    # Histogram, the pre and post bars drawn over a light base like the original figure
+    plt.figure(figsize=(8, 9))
+    for counts in (pre_counts, post_counts):
+        plt.hist(codes, bins=7, range=(1, 7), weights=counts, alpha=0.5, color='lightblue')
+    plt.hist(codes, bins=7, range=(1, 7), weights=pre_counts, alpha=0.5, color='turquoise', label='Pre')
+    plt.hist(codes, bins=7, range=(1, 7), weights=post_counts, alpha=0.5, color='darkblue', label='Post')
+    plt.axvline(4, color='r', linestyle='dashed', linewidth=1)
+    plt.xlabel(' ')
+    plt.ylabel('Frequency')
+    plt.xticks(range(1, 8), descriptions, rotation=45, ha='right')
+    plt.title(f'Histogram of {title}')
+    plt.legend()
+    plt.subplots_adjust(left=0.2, bottom=0.3)
+    plt.show()
+
+    # Boxplot
+    fig, ax = plt.subplots(figsize=(9, 8))
+    ax.bxp([boxplot_stats(post_counts, 'Post'), boxplot_stats(pre_counts, 'Pre')], vert=False)
+    ax.axvline(4, color='r', linestyle='dashed', linewidth=1)
+    ax.set_xlabel(' ')
+    ax.set_xticks(range(1, 8))
+    ax.set_xticklabels(descriptions, rotation=45, ha='right')
+    ax.set_title(f'Boxplot of {title}')
+    fig.subplots_adjust(left=0.2, bottom=0.3)
+    plt.show()
+
+
+# Box at the bottom of the figure explaining the x-axis answer codes
+def create_legend_box(fig, descriptions):
+    # Fixed box position parameters
+    left = 0.05  # Start of the box, relative to figure width
+    right = 0.95  # End of the box, relative to figure width
+    base_box_height = 0.1  # Base box height relative to figure height
+    box_y_position = 0.02  # Y-position for the bottom of the box, relative to figure height
+
+    # Combine the descriptions into a single formatted string
+    text = "  ".join([f"{i+1} = {desc}" for i, desc in enumerate(descriptions)])
+
+    # Check the length of the text and decide how many rows are needed
+    max_characters_per_line = 90  # Set a threshold for text length
+    text_rows = []  # Will hold multiple rows of text
+
+    if len(text) <= max_characters_per_line:
+        text_rows = [text]  # Single row
+        box_height = base_box_height  # Standard box height for one row
+    else:
+        # Split into multiple rows
+        third_row_needed = len(text) > max_characters_per_line * 2
+        if third_row_needed:
+            third_len = len(descriptions) // 3
+            text_rows = [
+                "  ".join([f"{i+1} = {desc}" for i, desc in enumerate(descriptions[:third_len])]),
+                "  ".join([f"{i+1} = {desc}" for i, desc in enumerate(descriptions[third_len:2*third_len], start=third_len)]),
+                "  ".join([f"{i+1} = {desc}" for i, desc in enumerate(descriptions[2*third_len:], start=2*third_len)])
+            ]
+            box_height = base_box_height * 1.5  # Increase box height for three rows
+        else:
+            half_len = len(descriptions) // 2
+            text_rows = [
+                "  ".join([f"{i+1} = {desc}" for i, desc in enumerate(descriptions[:half_len])]),
+                "  ".join([f"{i+1} = {desc}" for i, desc in enumerate(descriptions[half_len:], start=half_len)])
+            ]
+            box_height = base_box_height * 1.25  # Increase box height for two rows
+
+    # Position and draw the "X-Axis:" label above the box with increased distance
+    plt.figtext((left + right) / 2, box_y_position + box_height + 0.03, "X-Axis:", ha="center", va="center", fontsize=15)
+
+    # Add the text inside the legend box, aligned to the top-left
+    for i, row in enumerate(text_rows):
+        plt.figtext(left + 0.01, box_y_position + box_height - 0.04 * (i + 1), row, ha="left", va="top", fontsize=12)
+
+    # Draw the black outline box at the bottom of the figure with dynamic height
+    rect = plt.Rectangle((left, box_y_position), right - left, box_height, linewidth=1.5, edgecolor='black', facecolor='none', transform=fig.transFigure)
+    fig.add_artist(rect)
+
+
+# Plot boxplot
+@trace.traced
+def plot_custom_boxplot(data, block, x_labels=None, fontsize=None):
+    fig, ax1 = plt.subplots(figsize=(10, 6))
+
+    meanprops = dict(color='red', linewidth=1, linestyle='-')
+    boxplot = data.boxplot(ax=ax1, patch_artist=True, return_type='dict', showmeans=True, meanline=True, meanprops=meanprops)
+
+    for box in boxplot['boxes']:
+        box.set(color='lightblue', linewidth=2)
+        box.set(facecolor='lightblue')
+    for median in boxplot['medians']:
+        median.set(color='orange', linewidth=2)
+    for whisker in boxplot['whiskers']:
+        whisker.set(color='black', linewidth=1)
+    for cap in boxplot['caps']:
+        cap.set(color='black', linewidth=1)
+    for flier in boxplot['fliers']:
+        flier.set(marker='o', color='lightblue', alpha=0.5)
+
+    ax1.set_title(f'Boxplot of Question Block for {block}', fontsize=fontsize + 1 if fontsize else None)
+
+    if x_labels is None:
+        x_labels = [f'{block}__real?', f'{block}__credible?', f'{block}__deepfake?', f'{block}__sharing intention']
+    ax1.set_xticklabels(x_labels, rotation=45, ha='right', fontsize=fontsize)
+
+    for tick in ax1.get_xticklabels():
+        if 'sharing intention' in tick.get_text():
+            tick.set_color('darkblue')
+
+    # Settings left y-axis labels 
+    ax1.set_yticks(range(1, 8))
+    ax1.set_yticklabels([f'{mapping_questions[i]}: {i}' for i in range(1, 8)], color='black', fontsize=fontsize)
+
+    # Settings right y-axis labels
+    ax2 = ax1.twinx()
+    ax2.set_ylim(ax1.get_ylim())
+    ax2.set_yticks(range(1, 8))
+    ax2.set_yticklabels([f'{i}: {mapping_share[i]}' for i in range(1, 8)], color='darkblue', fontsize=fontsize)
+
+    # Custom plot options
+    ax1.axvline(x=3.5, color='darkblue', linestyle='--')
+    ax1.grid(True, axis='y')
+    ax1.grid(False, axis='x')
+
+    # legend
+    handles = [
+        plt.Line2D([0], [0], color='orange', linewidth=2, label='Median'),
+        plt.Line2D([0], [0], color='red', linewidth=2, label='Mean'),
+        plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='lightblue', markersize=8, label='Outliers')
+    ]
+    ax1.legend(handles=handles, loc='upper left')
+
+    plt.tight_layout()
+    plt.show()
+
+
+# Boxplot statistics of every question of a block, read from its answer histograms
+def block_boxplot_stats(block_data):
+    histograms = answer_histograms(block_data.to_numpy(dtype=float), list(block_data.columns))
+    return [boxplot_stats(counts, column) for counts, column in zip(histograms, block_data.columns)]
+
+
+# One figure of rows x cols block boxplots styled like plot_custom_boxplot. Axes, ticks, labels
+# and the legend are set up once and every box is drawn once with placeholder statistics;
+# show() then only moves the existing artists to the statistics of a block, so drawing
+# another block or page creates nothing new.
+class BlockGrid:
+    question_labels = ['real?', 'credible?', 'deepfake?', 'sharing intention']
+
+    def __init__(self, rows, cols, fontsize=8):
+        self.fontsize = fontsize
+        self.fig, axes = plt.subplots(rows, cols, figsize=(3.4 * cols + 1, 2.8 * rows + 1), squeeze=False)
+        self.axes = axes.ravel()
+        placeholder = [{'med': 0, 'q1': 0, 'q3': 0, 'whislo': 0, 'whishi': 0, 'mean': 0, 'fliers': []}] * len(self.question_labels)
+        self.artists = []
+        self.twins = {}
+        for i, ax in enumerate(self.axes):
+            self.artists.append(ax.bxp(placeholder, patch_artist=True, showmeans=True, meanline=True,
+                                       boxprops=dict(facecolor='lightblue', edgecolor='lightblue', linewidth=2),
+                                       medianprops=dict(color='orange', linewidth=2),
+                                       meanprops=dict(color='red', linewidth=1, linestyle='-'),
+                                       whiskerprops=dict(color='black', linewidth=1), capprops=dict(color='black', linewidth=1),
+                                       flierprops=dict(marker='o', markerfacecolor='lightblue', markeredgecolor='lightblue', alpha=0.5)))
+            ax.axvline(x=3.5, color='darkblue', linestyle='--')
+            ax.grid(True, axis='y')
+            ax.set_xticks(range(1, len(self.question_labels) + 1))
+            ax.set_xticklabels(self.question_labels, rotation=45, ha='right', fontsize=fontsize)[-1].set_color('darkblue')
+            ax.set_ylim(0.5, 7.5)
+            ax.set_yticks(range(1, 8))
+            ax.set_yticklabels([f'{mapping_questions_short[code]}: {code}' for code in range(1, 8)], fontsize=fontsize)
+
+            # Credibility labels on the left of the first column and sharing intention labels
+            # on the right of the last column only
+            ax.tick_params(axis='y', labelleft=i % cols == 0)
+            if i % cols == cols - 1:
+                twin = self.twins[i] = ax.twinx()
+                twin.set_ylim(0.5, 7.5)
+                twin.set_yticks(range(1, 8))
+                twin.set_yticklabels([f'{code}: {mapping_share_short[code]}' for code in range(1, 8)], color='darkblue', fontsize=fontsize)
+
+        handles = [
+            plt.Line2D([0], [0], color='orange', linewidth=2, label='Median'),
+            plt.Line2D([0], [0], color='red', linewidth=2, label='Mean'),
+            plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='lightblue', markersize=8, label='Outliers')
+        ]
+        # The legend sits in a 0.5 inch strip above the panels
+        height = self.fig.get_figheight()
+        self.fig.legend(handles=handles, loc='upper right', ncol=3)
+        self.fig.tight_layout(rect=(0, 0, 1, 1 - 0.5 / height))
+
+    # Draw the boxes of one block on panel i
+    def show(self, i, block, stats):
+        artists = self.artists[i]
+        for k, box in enumerate(stats):
+            position = k + 1
+            vertices = artists['boxes'][k].get_path().vertices
+            vertices[:, 1] = [box['q1'], box['q1'], box['q3'], box['q3']] + [box['q1']] * (len(vertices) - 4)
+            artists['boxes'][k].stale = True
+            artists['medians'][k].set_ydata([box['med'], box['med']])
+            artists['means'][k].set_ydata([box['mean'], box['mean']])
+            artists['whiskers'][2 * k].set_ydata([box['q1'], box['whislo']])
+            artists['whiskers'][2 * k + 1].set_ydata([box['q3'], box['whishi']])
+            artists['caps'][2 * k].set_ydata([box['whislo'], box['whislo']])
+            artists['caps'][2 * k + 1].set_ydata([box['whishi'], box['whishi']])
+            artists['fliers'][k].set_data(np.full(len(box['fliers']), position), box['fliers'])
+        self.axes[i].set_title(block, fontsize=self.fontsize + 2)
+        self.axes[i].set_visible(True)
+        if i in self.twins:
+            self.twins[i].set_visible(True)
+
+    # Hide the panels from i on, for a last page with fewer blocks
+    def hide_from(self, i):
+        for j in range(i, len(self.axes)):
+            self.axes[j].set_visible(False)
+            if j in self.twins:
+                self.twins[j].set_visible(False)
+
+
+# Boxplots of all question blocks as small multiples, cols panels per row and per_page
+# panels per page. Without output all blocks are shown on one page; a .pdf output gets one
+# page per per_page blocks, any other image format one file per page (name-1.png, ...).
+@trace.traced
+def plot_block_grid(df, output=None, cols=4, per_page=None, fontsize=8):
+    stats = {block: block_boxplot_stats(df[questions]) for block, questions in available_blocks(df).items()}
+    names = list(stats)
+    if not names:
+        return
+    per_page = len(names) if output is None or per_page is None else per_page
+    pages = [names[start:start + per_page] for start in range(0, len(names), per_page)]
+    grid = BlockGrid(math.ceil(min(per_page, len(names)) / cols), min(cols, len(names)), fontsize)
+
+    def fill(page):
+        for i, block in enumerate(page):
+            grid.show(i, block, stats[block])
+        grid.hide_from(len(page))
+
+    if output is None:
+        fill(pages[0])
+        plt.show()
+        return
+    if output.lower().endswith('.pdf'):
+        from matplotlib.backends.backend_pdf import PdfPages
+        with PdfPages(output) as pdf:
+            for page in pages:
+                fill(page)
+                pdf.savefig(grid.fig)
+    else:
+        root, extension = os.path.splitext(output)
+        for number, page in enumerate(pages, start=1):
+            fill(page)
+            grid.fig.savefig(output if len(pages) == 1 else f'{root}-{number}{extension}')
+    plt.close(grid.fig)
+
+
+# Plot combined boxplots for both Biden and Trump
+@trace.traced
+def plot_combined_boxplots(df, biden_columns, trump_columns, results):
+    fig, ax1 = plt.subplots(figsize=(14, 7))
+
+    # Prepare data for each boxplot
+    all_data = []
+    labels = [
+        'Biden\n__real?', 'Trump\n__real?',
+        'Biden\n__credible?', 'Trump\n__credible?',
+        'Biden\n__deepfake?', 'Trump\n__deepfake?',
+        'Biden\n_sharing\nintention', 'Trump\n_sharing\nintention'
+    ]
+    for question in ['__1', '__2', '__3', '_share']:
+        biden_data = df[biden_columns].filter(like=question).values.flatten()
+        trump_data = df[trump_columns].filter(like=question).values.flatten()
+        all_data.extend([biden_data, trump_data])
+        #question_label = label_map.get(question, question)
+        #labels.extend([f'Biden{question_label}', f'Trump{question_label}'])
+
+    # Custom boxplot
+    meanprops = dict(color='red', linewidth=1, linestyle='-')
+    boxplot = ax1.boxplot(all_data, patch_artist=True, showmeans=True, meanline=True, meanprops=meanprops)
+
+    # Custom styling
+    for box in boxplot['boxes']:
+        box.set(color='lightblue', linewidth=2)
+        box.set(facecolor='lightblue')
+    for median in boxplot['medians']:
+        median.set(color='orange', linewidth=2)
+    for whisker in boxplot['whiskers']:
+        whisker.set(color='black', linewidth=1)
+    for cap in boxplot['caps']:
+        cap.set(color='black', linewidth=1)
+    for flier in boxplot['fliers']:
+        flier.set(marker='o', color='lightblue', alpha=0.5)
+
+    # Set x-axis labels and rotate them for clarity
+    ax1.set_xticklabels(labels, rotation=0, ha='center', fontsize=14)
+
+    # Highlight "sharing intention" blocks
+    for i, tick in enumerate(ax1.get_xticklabels()):
+        if 'sharing intention' in tick.get_text():
+            tick.set_color('darkblue')
+
+    # Settings for y-axis labels
+    ax1.set_yticks(range(1, 8))
+    question_labels = {i: mapping_questions_short[i].replace(" ", "\n") for i in range(1, 8)}
+    ax1.set_yticklabels([f'{question_labels[i]}: {i}' for i in range(1, 8)], color='black', fontsize=14)
+
+    # Settings for secondary y-axis labels
+    ax2 = ax1.twinx()
+    ax2.set_ylim(ax1.get_ylim())
+    ax2.set_yticks(range(1, 8))
+    share_labels = {i: mapping_share_short[i].replace(" ", "\n") for i in range(1, 8)}
+    ax2.set_yticklabels([f'{i}: {share_labels[i]}' for i in range(1, 8)], color='darkblue', fontsize=14)
+
+    # Add vertical lines between question types
+    ax1.axvline(x=2.5, color='black', linestyle='-', linewidth=0.5)
+    ax1.axvline(x=4.5, color='black', linestyle='-', linewidth=0.5) 
+
+    # Add a vertical dashed line to separate "sharing intention"
+    ax1.axvline(x=6.5, color='darkblue', linestyle='--')
+
+    # Add grid lines for every y-tick
+    ax1.yaxis.grid(True)
+
+    # Add legend for median, mean, and outliers
+    handles = [
+        plt.Line2D([0], [0], color='orange', linewidth=2, label='Median'),
+        plt.Line2D([0], [0], color='red', linewidth=2, label='Mean'),
+        plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='lightblue', markersize=8, label='Outliers')
+    ]
+    ax1.legend(handles=handles, loc='upper left')
+
+    y_position = [5.5, 5.5, 6.5, 6.5]  # Adjust y-positions for significance
+    for i, (question, ypos) in enumerate(zip(['__1', '__2', '__3', '_share'], y_position)):
+        p_val = results[question]['p_val']
+        significance = '*' if p_val < 0.05 else 'ns'
+        ax1.text(1.5 + 2*i, ypos, f'p={p_val:.4f} ({significance})', ha='center', va='bottom', fontsize=12)
+
+    plt.tight_layout()
+    plt.show()
+
+
+# Interaction plot and grouped bar plot of the politician x stance regression
+@trace.traced
+def plot_politician_interaction(model):
+    stances = ['Left', 'Right']
+    politicians = ['Biden', 'Trump']
+
+    # Predicted values ordered Left-Biden, Left-Trump, Right-Biden, Right-Trump
+    predictions = interaction_predictions(model.params).ravel()
+
+    # Create the figure with two subplots
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
+
+    # Interaction Plot
+    for i, politician in enumerate(politicians):
+        ax1.plot(stances, predictions[i*2:(i+1)*2], marker='o', label=politician, color='lightblue' if politician == 'Biden' else 'orange')
+    ax1.set_xlabel('Stance', fontsize=14)
+    ax1.set_ylabel('Predicted Credibility', fontsize=14)
+    ax1.set_title('Interaction Plot', fontsize=16)
+    ax1.legend(fontsize=15)
+    ax1.set_ylim(1, 7)
+    ax1.grid(True, axis='y', linestyle='-', linewidth=0.5)
+    ax1.tick_params(axis='y', labelsize=14)  # Set y-tick label size
+
+    # Facet Grid (Grouped Bar Plot)
+    index = np.arange(len(stances))
+    bar_width = 0.35
+    ax2.bar(index, predictions[:2], bar_width, label='Biden', color='lightblue')
+    ax2.bar(index + bar_width, predictions[2:], bar_width, label='Trump', color='orange')
+    ax2.set_xlabel('Stance', fontsize=14)
+    ax2.set_title('Facet Grid (Grouped Bar Plot)', fontsize=16)
+    ax2.set_xticks(index + bar_width / 2)
+    ax2.set_xticklabels(stances, fontsize=14)
+    ax2.set_ylim(1, 7)
+    ax2.legend(fontsize=15)
+    ax2.grid(True, axis='y', linestyle='-', linewidth=0.5)
+    ax2.tick_params(axis='y', labelsize=14)  # Set y-tick label size
+    ax2.yaxis.label.set_visible(False)  # Hide y-axis label
+
+    # Adjust layout to prevent overlap
+    plt.tight_layout()
+    plt.show()
+
+
+# Interaction plot and grouped bar plot of the ideology x stance regression
+@trace.traced
+def plot_ideology_interaction(model):
+    stances = ['Left', 'Right']
+    ideologies = ['Left-Leaning', 'Neutral', 'Right-Leaning']
+
+    # 1 for Left-Leaning, 0 for Neutral, -1 for Right-Leaning; rows are Left/Right stance
+    predictions = interaction_predictions(model.params, politician_values=(1, 0, -1))
+
+    # Create the figure with two subplots
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
+
+    # Interaction Plot
+    for i, ideology in enumerate(ideologies):
+        linestyle = 'dashed' if ideology == 'Neutral' else 'solid'
+        color = 'red' if ideology == 'Neutral' else 'lightblue' if ideology == 'Left-Leaning' else 'orange'
+        ax1.plot(stances, predictions[:, i], marker='o', label=ideology, linestyle=linestyle, color=color)
+
+    ax1.set_xlabel('Video Stance', fontsize=14)
+    ax1.set_ylabel('Predicted Credibility', fontsize=14)
+    ax1.set_title('Interaction Plot', fontsize=16)
+    ax1.legend(fontsize=15)
+    ax1.set_ylim(1, 7)
+    ax1.grid(True, axis='y', linestyle='-', linewidth=0.5)
+    ax1.tick_params(axis='y', labelsize=14)
+
+    # Facet Grid (Grouped Bar Plot)
+    index = np.arange(len(stances))
+    bar_width = 0.2
+
+    ax2.bar(index - bar_width, predictions[:, 0], bar_width, label='Left-Leaning', color='lightblue')
+    ax2.bar(index, predictions[:, 1], bar_width, label='Neutral', color='red', hatch='//', linestyle='dashed')
+    ax2.bar(index + bar_width, predictions[:, 2], bar_width, label='Right-Leaning', color='orange')
+
+    ax2.set_xlabel('Video Stance', fontsize=14)
+    ax2.set_title('Grouped Bar Plot', fontsize=16)
+    ax2.set_xticks(index)
+    ax2.set_xticklabels(stances, fontsize=14)
+    ax2.set_ylim(1, 7)
+    ax2.legend(fontsize=15)
+    ax2.grid(True, axis='y', linestyle='-', linewidth=0.5)
+    ax2.tick_params(axis='y', labelsize=14)
+    ax2.yaxis.label.set_visible(False)  # Hide y-axis label
+
+    # Adjust layout to prevent overlap
+    plt.tight_layout()
+    plt.show()
+
+
+# Draw the joint distribution from the count matrix, one artist per cell at most
+def plot_joint_distribution(counts, mode='bubble', max_marker_size=1500):
+    levels = counts.shape[0]
+    ticks = np.arange(1, levels + 1)
+
+    if mode == 'heatmap':
+        # counts is indexed [credibility, sharing], imshow wants [row=y, col=x]
+        image = plt.imshow(counts.T, origin='lower', cmap='Blues',
+                           extent=(0.5, levels + 0.5, 0.5, levels + 0.5), aspect='auto')
+        plt.colorbar(image, label='Number of ratings')
+        for (x_val, y_val), count in np.ndenumerate(counts):
+            if count > 0:
+                plt.text(x_val + 1, y_val + 1, str(count), ha='center', va='center', fontsize=9)
+    else:
+        grid_x, grid_y = np.meshgrid(ticks, ticks, indexing='ij')
+        occupied = counts > 0
+        sizes = counts[occupied] / counts.max() * max_marker_size
+        plt.scatter(grid_x[occupied], grid_y[occupied], s=sizes, color='lightblue', alpha=0.7,
+                    edgecolors='darkblue', linewidths=0.5, label='Ratings (size = count)')
+
+
+# Joint distribution of credibility and sharing with the overall regression line
+@trace.traced
+def plot_overall_trend(counts, intercept, slope, mode='bubble'):
+    levels = counts.shape[0]
+    plt.figure()
+    plot_joint_distribution(counts, mode)
+
+    x_line = np.array([1, levels])
+    plt.plot(x_line, intercept + slope * x_line, color='orange', label='Overall regression line')
+
+    plt.xlabel('Credibility Ratings', fontsize=14, fontstyle='italic')
+    plt.ylabel('Sharing Intention', fontsize=14, fontstyle='italic')
+    plt.title('Overall Trend', fontsize=16)
+    plt.xlim(0.5, levels + 0.5)
+    plt.ylim(0.5, levels + 0.5)
+    plt.xticks(np.arange(1, levels + 1, 1), fontsize=12)
+    plt.yticks(np.arange(1, levels + 1, 1), fontsize=12)
+    plt.legend(fontsize=14)
+    plt.grid(True)
+    plt.show()
+
+
+# Power of every test against the number of respondents, with the usual 80% target
+@trace.traced
+def plot_power_curves(table, target=0.8):
+    plt.figure(figsize=(10, 6))
+    for test in table.columns:
+        plt.plot(table.index, table[test], marker='o', label=test)
+    plt.axhline(target, color='gray', linestyle='--', label=f'{target:.0%} power')
+
+    plt.xlabel('Respondents', fontsize=14, fontstyle='italic')
+    plt.ylabel('Power', fontsize=14, fontstyle='italic')
+    plt.title('Power Curves', fontsize=16)
+    plt.ylim(0, 1.02)
+    plt.legend(fontsize=10)
+    plt.grid(True)
+    plt.show()
+
+
+# Correlation matrix with the items reordered by average-linkage clustering and the
+# dendrogram of the clustering above it
+@trace.traced
+def plot_clustered_correlations(correlation, title='Item correlations'):
+    order, merges = cluster_items(correlation.to_numpy())
+    fig, (tree_ax, heat_ax) = plt.subplots(nrows=2, figsize=(12, 13), gridspec_kw={'height_ratios': [1, 6]})
+
+    # Dendrogram: every merge joins its two clusters at its height
+    position = {leaf: x for x, leaf in enumerate(order)}
+    height = {leaf: 0.0 for leaf in order}
+    for new, (a, b, distance) in enumerate(merges, start=len(order)):
+        for child in (a, b):
+            tree_ax.plot([position[child], position[child]], [height[child], distance], color='black', linewidth=0.7)
+        tree_ax.plot([position[a], position[b]], [distance, distance], color='black', linewidth=0.7)
+        position[new] = (position[a] + position[b]) / 2
+        height[new] = distance
+    tree_ax.set_xlim(-0.5, len(order) - 0.5)
+    tree_ax.set_ylabel('1 - r', fontsize=12)
+    tree_ax.set_xticks([])
+    tree_ax.spines[['top', 'right', 'bottom']].set_visible(False)
+
+    labels = correlation.index[order]
+    image = heat_ax.imshow(correlation.to_numpy()[np.ix_(order, order)], cmap='RdBu_r', vmin=-1, vmax=1, aspect='auto')
+    fontsize = 10 if len(order) <= 30 else 5
+    heat_ax.set_xticks(range(len(order)))
+    heat_ax.set_xticklabels(labels, rotation=90, fontsize=fontsize)
+    heat_ax.set_yticks(range(len(order)))
+    heat_ax.set_yticklabels(labels, fontsize=fontsize)
+    # One colorbar for both axes keeps the dendrogram aligned with the heatmap columns
+    fig.subplots_adjust(left=0.15, bottom=0.15, top=0.93, hspace=0.02)
+    fig.colorbar(image, ax=[tree_ax, heat_ax], fraction=0.03, pad=0.02, label='Pairwise-complete correlation')
+
+    plt.suptitle(title, fontsize=16)
+    plt.show()
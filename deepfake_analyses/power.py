@@ -0,0 +1,88 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from deepfake_analyses import npstats, trace
+from deepfake_analyses.join import to_keyed_arrays
+from deepfake_analyses.regression import design_cell
+from deepfake_analyses.survey import post_influence_cols, pre_influence_cols, stance_titles
+from deepfake_analyses.transitions import codes, levels, transition_tables
+
+# Simulated datasets are drawn from the answer distributions observed in the current data, so
+# they carry its effect sizes. A sample of n independent Likert answers only enters the t-tests
+# and the OLS through its answer counts, so every simulated dataset is drawn as one multinomial
+# count vector and analysed from its moments: the cost per dataset does not grow with n.
+
+# Rows of the 5_ design matrix for the four politician x stance cells
+_cells = [(1, 1), (0, 1), (1, 0), (0, 0)]
+_design = np.array([[1, politician, stance, politician * stance] for politician, stance in _cells], dtype=float)
+
+
+# Per stance: probability of every (pre, post) answer pair, and answered pairs per respondent
+def stance_designs(df):
+    designs = {}
+    for key, table in transition_tables(df, pre_influence_cols, post_influence_cols).items():
+        if table.sum() > 1:
+            designs[key] = (table.ravel() / table.sum(), table.sum() / len(df))
+    return designs
+
+
+# Probability of every credibility answer per politician x stance cell, and ratings per
+# respondent in each cell, from the 5_ credibility scores
+def interaction_design(data):
+    blocks, respondents, scores = to_keyed_arrays(data)
+    respondent_count = len(np.unique(respondents.astype(str)))
+    cell_of_row = np.array([_cells.index(design_cell(block)) for block in blocks], dtype=np.int64)
+    counts = np.zeros((len(_cells), levels))
+    valid = (scores >= 1) & (scores <= levels)
+    np.add.at(counts, (cell_of_row[valid], scores[valid].astype(np.int64) - 1), 1)
+    if np.any(counts.sum(axis=1) == 0):
+        raise ValueError("The credibility scores must cover all four politician x stance cells.")
+    return counts / counts.sum(axis=1, keepdims=True), counts.sum(axis=1) / respondent_count
+
+
+# Share of simulated paired t-tests with p < alpha for n pairs
+def _simulate_paired(probabilities, pairs, simulations, alpha, seed):
+    rng = np.random.default_rng(seed)
+    differences = (codes[None, :] - codes[:, None]).ravel()
+    counts = rng.multinomial(pairs, probabilities, size=simulations)
+    mean = counts @ differences / pairs
+    squares = (counts * (differences[None, :] - mean[:, None]) ** 2).sum(axis=1)
+    _, p_val = npstats.ttest_from_moments(pairs, mean, squares)
+    return np.count_nonzero(p_val < alpha) / simulations
+
+
+# Share of simulated politician x stance regressions whose interaction has p < alpha,
+# with the given number of ratings per cell
+def _simulate_interaction(probabilities, ratings, simulations, alpha, seed):
+    rng = np.random.default_rng(seed)
+    counts = np.stack([rng.multinomial(n, p, size=simulations) for n, p in zip(ratings, probabilities)], axis=1)
+    sums = counts @ codes
+    xtx = np.einsum('c,ci,cj->ij', ratings, _design, _design)
+    xty = sums @ _design
+    yty = (counts @ codes ** 2).sum(axis=1)
+    pvalues = npstats.ols_batch_from_moments(xtx, xty, yty, ratings.sum())['pvalues']
+    return np.count_nonzero(pvalues[:, 3] < alpha) / simulations
+
+
+# Power of the 3_ paired stance t-tests and the 5_ interaction test for every candidate number
+# of respondents, one column per test. Every (test, size) point runs in a worker process.
+@trace.traced
+def power_curves(sizes, stances=None, interaction=None, simulations=2000, alpha=0.05, seed=0, jobs=None):
+    tasks = {}
+    seeds = iter(np.random.SeedSequence(seed).spawn(len(sizes) * (len(stances or {}) + 1)))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for size in sizes:
+            for key, (probabilities, pairs_per_respondent) in (stances or {}).items():
+                pairs = max(int(round(size * pairs_per_respondent)), 2)
+                tasks[(stance_titles[key], size)] = executor.submit(_simulate_paired, probabilities, pairs, simulations, alpha, next(seeds))
+            if interaction is not None:
+                probabilities, ratings_per_respondent = interaction
+                ratings = np.maximum(np.round(size * ratings_per_respondent).astype(np.int64), 2)
+                tasks[('politician x stance', size)] = executor.submit(_simulate_interaction, probabilities, ratings, simulations, alpha, next(seeds))
+        power = {task: future.result() for task, future in tasks.items()}
+
+    table = pd.Series(power).unstack(0)
+    table.index.name = 'respondents'
+    return table[list(dict.fromkeys(test for test, _ in power))]
@@ -0,0 +1,163 @@
+import numpy as np
+
+from deepfake_analyses import npstats, trace
+from deepfake_analyses.join import align_scores, to_keyed_arrays
+from deepfake_analyses.streaming import load_scores
+
+
+# Function to load JSON data from a file path; score lists come back as int8 arrays
+def load_data_from_json(file_path):
+    return load_scores(file_path)
+
+
+# Politician and stance of a score key or block: 1 for Biden, 0 for Trump; 1 for Left stance, 0 for Right stance
+def design_cell(key):
+    return (1 if 'Biden' in key else 0), (1 if '1X' in key else 0)
+
+
+# Prepare data for regression using NumPy arrays
+@trace.traced
+def prepare_data(data):
+    credibility_data = []
+    politician_data = []
+    stance_data = []
+
+    for key, values in data.items():
+        politician, stance = design_cell(key)
+
+        # Enforce integer type; streamed score arrays mark skipped items with a negative code,
+        # keyed {respondent: score} files and legacy lists with None
+        if isinstance(values, np.ndarray):
+            scores = np.asarray(values[values >= 0], dtype=int)
+        else:
+            if isinstance(values, dict):
+                values = values.values()
+            scores = np.array([score for score in values if score is not None], dtype=int)
+        credibility_data.append(scores)
+        politician_data.append(np.full(len(scores), politician))
+        stance_data.append(np.full(len(scores), stance))
+
+    # Concatenate the per-key arrays
+    credibility_array = np.concatenate(credibility_data) if credibility_data else np.array([], dtype=int)
+    politician_array = np.concatenate(politician_data) if politician_data else np.array([], dtype=int)
+    stance_array = np.concatenate(stance_data) if stance_data else np.array([], dtype=int)
+
+    # Create interaction term
+    interaction_array = politician_array * stance_array
+
+    # Stack a constant and the independent variables into a 2D array for regression
+    X = np.column_stack((np.ones(len(credibility_array)), politician_array, stance_array, interaction_array))
+
+    # The dependent variable
+    y = credibility_array
+
+    return X, y
+
+
+# Respondent id and block of every rating, in the order of prepare_data. Keyed
+# {respondent: score} files name their respondents; score lists only do when every list keeps
+# one entry per respondent, skipped items included, so that the position is the respondent.
+# Lists of different lengths had skipped items dropped and are rejected.
+def rating_respondents(data):
+    lengths = {len(values) for values in data.values() if not isinstance(values, dict)}
+    if len(lengths) > 1:
+        raise ValueError("The score lists have different lengths, so their positions do not identify respondents. "
+                         "Use a keyed {respondent: score} file, see join.keyed_scores_from_survey.")
+    blocks, respondents, _ = to_keyed_arrays(data)
+    return respondents.astype(str), blocks.astype(str)
+
+
+# Respondent and video of every rating as integer codes, in the order of prepare_data
+def rating_groups(data):
+    respondent_ids, blocks = rating_respondents(data)
+    if not len(respondent_ids):
+        return np.array([], dtype=int), np.array([], dtype=int)
+    _, respondents = np.unique(respondent_ids, return_inverse=True)
+    _, videos = np.unique(blocks, return_inverse=True)
+    return respondents, videos
+
+
+# Ratings compressed into a (covariate cell x answer level) count table: the distinct rows of X
+# without its constant column, and how often each Likert level occurs in each of them
+def contingency_table(X, y, levels=7):
+    y = np.asarray(y, dtype=np.int64)
+    if np.any((y < 1) | (y > levels)):
+        raise ValueError(f"The ordinal model needs answers coded 1 to {levels}.")
+    covariates = np.asarray(X, dtype=float)[:, 1:]
+
+    # Dummy-coded designs like the 2x2 one are numbered in one pass instead of sorting the rows
+    small = covariates.astype(np.int64)
+    if np.all(small == covariates) and np.all(small >= 0) and np.prod(small.max(axis=0, initial=0) + 1.0) <= 1 << 16:
+        radix = small.max(axis=0, initial=0) + 1
+        # Same cell order as np.unique: the first column varies slowest
+        places = np.cumprod(np.concatenate((radix[1:], [1]))[::-1])[::-1]
+        counts = np.bincount((small @ places) * levels + y - 1, minlength=int(np.prod(radix)) * levels).reshape(-1, levels)
+        occupied = np.flatnonzero(counts.sum(axis=1))
+        cells = (occupied[:, None] // places) % radix
+        return cells.astype(float), counts[occupied]
+
+    cells, cell_index = np.unique(covariates, axis=0, return_inverse=True)
+    counts = np.bincount(cell_index.ravel() * levels + y - 1, minlength=len(cells) * levels)
+    return cells, counts.reshape(len(cells), levels)
+
+
+# Perform regression analysis with the NumPy kernel, or with statsmodels for its full summary table.
+# engine='ordinal' fits a proportional-odds model on the compressed table instead of OLS;
+# engine='mixed' adds a random intercept per respondent, and per video when videos are given.
+# cluster=True gives OLS standard errors clustered by respondent.
+@trace.traced
+def perform_regression(X, y, engine='numpy', respondents=None, videos=None, cluster=False):
+    if cluster and (respondents is None or engine not in ('numpy', 'statsmodels')):
+        raise ValueError("Clustered standard errors need the OLS engines and the respondent of every rating.")
+    if engine == 'numpy':
+        return npstats.ols(X, y, groups=respondents if cluster else None)
+    if engine == 'ordinal':
+        return npstats.ordinal_logit(*contingency_table(X, y))
+    if engine == 'mixed':
+        if respondents is None:
+            raise ValueError("The mixed model needs the respondent of every rating, see rating_groups.")
+        return npstats.mixed_lm(X, y, respondents, videos)
+    if engine != 'statsmodels':
+        raise ValueError(f"Unknown regression engine '{engine}'.")
+
+    # Imported here so that only the reference engine pays for statsmodels
+    from statsmodels.regression.linear_model import OLS
+
+    # Fit the regression model
+    if cluster:
+        return OLS(y, X).fit(cov_type='cluster', cov_kwds={'groups': respondents}, use_t=True)
+    model = OLS(y, X).fit()
+    return model
+
+
+# Predicted credibility for every (stance, politician) combination of the 2x2 design
+def interaction_predictions(params, politician_values=(1, 0), stance_values=(1, 0)):
+    beta_0, beta_1, beta_2, beta_3 = params
+    predictions = []
+    for stance_val in stance_values:
+        stance_predictions = []
+        for politician_val in politician_values:
+            stance_predictions.append(beta_0 + beta_1 * politician_val + beta_2 * stance_val + beta_3 * politician_val * stance_val)
+        predictions.append(stance_predictions)
+    return np.array(predictions)
+
+
+# Count every (x, y) pair of Likert codes in a single 2D bincount; row x - 1, column y - 1
+def count_matrix(x, y, levels=7):
+    x = np.asarray(x).astype(np.int64).ravel()
+    y = np.asarray(y).astype(np.int64).ravel()
+    valid = (x >= 1) & (x <= levels) & (y >= 1) & (y <= levels)
+    cells = (x[valid] - 1) * levels + (y[valid] - 1)
+    return np.bincount(cells, minlength=levels * levels).reshape(levels, levels)
+
+
+# Overall linear trend of sharing intention on credibility, paired by respondent
+@trace.traced
+def credibility_sharing_regression(data_credible, data_share):
+    aligned, unmatched = align_scores(data_credible, data_share)
+    x = aligned['credible']
+    y = aligned['share']
+    if len(x) == 0:
+        return None, aligned, unmatched
+    intercept, slope = npstats.simple_regression(x, y).params
+    return (intercept, slope), aligned, unmatched
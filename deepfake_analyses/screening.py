@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from deepfake_analyses import trace
+from deepfake_analyses.survey import blocks, quality_flags_column, read_csv
+
+# Bits of the exclusion bitmask; a response is excluded when any bit is set
+exclusion_flags = {
+    'speeder': 1,
+    'straight_liner': 2,
+    'out_of_range': 4,
+    'unparsable': 8,
+}
+
+duration_column = 'Duration (in seconds)'
+
+
+# Answers of one column as floats; the second array marks answers that are not numbers at all
+def _parse_answers(raw):
+    values = pd.to_numeric(raw, errors='coerce').to_numpy(dtype=float)
+    unparsable = np.isnan(values) & (raw.to_numpy() != '')
+    return values, unparsable
+
+
+# Exclusion bitmask of every response in a raw export (header rows already removed, read as text).
+# Speeders took less than speeder_fraction of the median duration of the finished responses
+# (or less than min_duration seconds, when given). Straight-liners gave the same answer to all
+# of the at least min_answered block items they answered. Out-of-range responses contain a
+# number that is not one of the Likert codes 1 to levels, unparsable responses an answer that is
+# not a number at all. Exports with text answers need the recode mappings of 2_ (mappings), which
+# are applied to the block items first.
+# The block items are processed column by column with running per-response accumulators,
+# so memory stays at a few arrays of one value per response.
+@trace.traced
+def screen_responses(responses, speeder_fraction=1 / 3, min_duration=None, min_answered=10, levels=7, mappings=None):
+    n = len(responses)
+    flags = np.zeros(n, dtype=np.uint8)
+
+    if duration_column in responses.columns:
+        duration, _ = _parse_answers(responses[duration_column])
+        if min_duration is None:
+            finished = (pd.to_numeric(responses['Finished'], errors='coerce') == 1).to_numpy() if 'Finished' in responses.columns else np.ones(n, dtype=bool)
+            reference = duration[finished & ~np.isnan(duration)]
+            min_duration = speeder_fraction * np.median(reference) if reference.size else 0.0
+        flags[duration < min_duration] |= exclusion_flags['speeder']
+
+    answered = np.zeros(n, dtype=np.int64)
+    lowest = np.full(n, np.inf)
+    highest = np.full(n, -np.inf)
+    out_of_range = np.zeros(n, dtype=bool)
+    unparsable = np.zeros(n, dtype=bool)
+    for column in [q for questions in blocks.values() for q in questions if q in responses.columns]:
+        raw = responses[column]
+        if mappings and column in mappings:
+            raw = raw.replace(mappings[column])
+        values, column_unparsable = _parse_answers(raw)
+        valid = ~np.isnan(values)
+        unparsable |= column_unparsable
+        out_of_range |= valid & ((values < 1) | (values > levels) | (values != np.floor(values)))
+        answered += valid
+        np.fmin(lowest, values, out=lowest)
+        np.fmax(highest, values, out=highest)
+
+    flags[(answered >= min_answered) & (lowest == highest)] |= exclusion_flags['straight_liner']
+    flags[out_of_range] |= exclusion_flags['out_of_range']
+    flags[unparsable] |= exclusion_flags['unparsable']
+    return flags
+
+
+# Number of responses with each exclusion reason
+def count_exclusions(flags):
+    counts = {reason: int(np.count_nonzero(flags & bit)) for reason, bit in exclusion_flags.items()}
+    counts['excluded'] = int(np.count_nonzero(flags))
+    return counts
+
+
+# Screen a raw export and save it with the bitmask as an extra column, which survives metadata
+# deletion and recoding and makes load_and_filter_data drop the flagged responses.
+def screen_export(file_path, output_path, **options):
+    df = read_csv(file_path, dtype=str, keep_default_na=False)
+    flags = screen_responses(df.iloc[2:], **options)
+
+    df[quality_flags_column] = ['Quality flags', '{"ImportId":"QualityFlags"}'] + flags.tolist()
+    df.to_csv(output_path, index=False)
+    return flags
@@ -0,0 +1,246 @@
+import fnmatch
+import json
+import math
+import os
+import socketserver
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from deepfake_analyses import trace
+from deepfake_analyses.blocks import aggregate_deepfake_blocks, available_blocks, compare_biden_trump, describe_block
+from deepfake_analyses.multiverse import regression_terms
+from deepfake_analyses.regression import load_data_from_json, perform_regression, prepare_data, rating_groups
+from deepfake_analyses.survey import load_survey, post_influence_cols, pre_influence_cols, stance_titles, valid_responses
+from deepfake_analyses.transitions import sign_counts, transition_tables, transition_test
+
+# A long-running process that loads every survey and score file once and answers analysis
+# queries over HTTP as JSON, e.g. GET /blocks?dataset=wave4&blocks=Trump_3X*. Query results
+# are kept in an LRU cache; requests are served on one thread each.
+
+
+# Thread-safe LRU cache of query results with hit and miss counts
+class ResultCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return self._results[key]
+            self.misses += 1
+        # Computed outside the lock so that other queries are not held up
+        result = compute()
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._results), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+# Raised for queries that cannot be answered; reported to the client as HTTP 400
+class QueryError(Exception):
+    pass
+
+
+# NumPy and pandas results as plain JSON values, NaN as null
+def json_ready(value):
+    if isinstance(value, pd.DataFrame):
+        return {str(column): json_ready(value[column].to_dict()) for column in value.columns}
+    if isinstance(value, pd.Series):
+        return json_ready(value.to_dict())
+    if isinstance(value, (np.ndarray, np.generic)):
+        value = value.tolist()
+    if isinstance(value, dict):
+        return {str(key): json_ready(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_ready(item) for item in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+# Surveys and score files held in memory, with the analyses that run on them
+class AnalysisState:
+    def __init__(self, surveys=None, scores=None, cache_size=256):
+        self.surveys = {}
+        self.valid = {}
+        for name, path in (surveys or {}).items():
+            with trace.span('load survey', dataset=name):
+                df = load_survey(path)
+            self.surveys[name] = df
+            self.valid[name] = valid_responses(df).to_numpy()
+        self.scores = {}
+        for name, path in (scores or {}).items():
+            data = load_data_from_json(path)
+            X, y = prepare_data(data)
+            # Lists that do not identify respondents still serve the unclustered regressions
+            try:
+                respondents, videos = rating_groups(data)
+            except ValueError:
+                respondents, videos = None, None
+            self.scores[name] = {'X': X, 'y': y, 'respondents': respondents, 'videos': videos}
+        self.cache = ResultCache(cache_size)
+
+    def datasets(self):
+        return {
+            'surveys': {name: {'responses': len(df), 'valid': int(self.valid[name].sum())} for name, df in self.surveys.items()},
+            'scores': {name: {'ratings': len(data['y'])} for name, data in self.scores.items()},
+        }
+
+    # Responses of one survey: the valid ones (finished, not flagged) unless subset=all, and
+    # only those matching every column=value condition of where
+    def responses(self, dataset, subset='valid', where=()):
+        if dataset not in self.surveys:
+            raise QueryError(f"Unknown survey '{dataset}', loaded: {', '.join(self.surveys)}.")
+        df = self.surveys[dataset]
+        if subset not in ('valid', 'all'):
+            raise QueryError("subset must be 'valid' or 'all'.")
+        mask = self.valid[dataset].copy() if subset == 'valid' else np.ones(len(df), dtype=bool)
+        for condition in where:
+            column, equals, value = condition.partition('=')
+            if not equals:
+                raise QueryError(f"where must be column=value, got '{condition}'.")
+            if column not in df.columns:
+                raise QueryError(f"Unknown column '{column}' in where.")
+            # Answers are read as floats, so where=stance_health=3 compares numbers, not text
+            if pd.api.types.is_numeric_dtype(df[column]):
+                try:
+                    value = float(value)
+                except ValueError:
+                    raise QueryError(f"Column '{column}' is numeric, cannot compare it with '{value}'.") from None
+                mask &= (df[column] == value).to_numpy()
+            else:
+                mask &= (df[column].astype(str) == value).to_numpy()
+        return df[mask]
+
+    def stances(self, df):
+        results = {}
+        for key, table in transition_tables(df, pre_influence_cols, post_influence_cols).items():
+            if table.sum() == 0:
+                continue
+            t_stat, p_val = transition_test(table)
+            results[key] = {'title': stance_titles[key], 'n': int(table.sum()), 't': t_stat, 'p': p_val, **sign_counts(table)}
+        return results
+
+    def blocks(self, df, pattern='*'):
+        selected = {block: questions for block, questions in available_blocks(df).items() if fnmatch.fnmatch(block, pattern)}
+        if not selected:
+            raise QueryError(f"No question block matches '{pattern}'.")
+        return {block: describe_block(df[questions], block) for block, questions in selected.items()}
+
+    def regression(self, dataset, engine='numpy', cluster=False, video_effects=False):
+        if dataset not in self.scores:
+            raise QueryError(f"Unknown score file '{dataset}', loaded: {', '.join(self.scores)}.")
+        data = self.scores[dataset]
+        if engine not in ('numpy', 'ordinal', 'mixed'):
+            raise QueryError("engine must be 'numpy', 'ordinal' or 'mixed'.")
+        model = perform_regression(data['X'], data['y'], engine=engine, respondents=data['respondents'],
+                                   videos=data['videos'] if video_effects else None, cluster=cluster)
+        # The ordinal model has thresholds instead of a constant
+        terms = regression_terms[-len(model.params):]
+        result = {'engine': engine, 'nobs': int(model.nobs)}
+        for name in ('params', 'bse', 'pvalues'):
+            result[name] = dict(zip(terms, getattr(model, name)[:len(terms)]))
+        if engine == 'ordinal':
+            result['thresholds'] = model.thresholds
+        if engine == 'mixed':
+            result['variances'] = {**model.variances, 'residual': model.scale}
+        return result
+
+    # Answer one query: path is the analysis, params the decoded query string
+    def query(self, path, params):
+        def single(name, default=None):
+            return params.get(name, [default])[-1]
+
+        def flag(name):
+            return single(name, '0').lower() in ('1', 'true', 'yes')
+
+        key = (path, tuple(sorted((name, tuple(values)) for name, values in params.items())))
+        if path == '/datasets':
+            return self.datasets()
+        if path == '/cache':
+            return self.cache.stats()
+        if path in ('/stances', '/blocks', '/aggregate', '/comparison'):
+            # Only a cache miss selects the responses, a hit does not touch the survey
+            def df():
+                return self.responses(single('dataset', next(iter(self.surveys), None)), single('subset', 'valid'),
+                                      params.get('where', []))
+
+            if path == '/stances':
+                return self.cache.get(key, lambda: json_ready(self.stances(df())))
+            if path == '/blocks':
+                return self.cache.get(key, lambda: json_ready(self.blocks(df(), single('blocks', '*'))))
+            if path == '/aggregate':
+                return self.cache.get(key, lambda: json_ready(aggregate_deepfake_blocks(df())))
+            return self.cache.get(key, lambda: json_ready(compare_biden_trump(df(), cluster=flag('cluster'))))
+        if path == '/regression':
+            dataset = single('dataset', next(iter(self.scores), None))
+            return self.cache.get(key, lambda: json_ready(self.regression(dataset, single('engine', 'numpy'), flag('cluster'), flag('video_effects'))))
+        raise LookupError(path)
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'deepfake-analyses'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            with trace.span('query', path=url.path):
+                body, status = self.server.state.query(url.path, parse_qs(url.query)), 200
+        except LookupError:
+            body, status = {'error': f"Unknown analysis '{url.path}'."}, 404
+        except (QueryError, ValueError) as error:
+            body, status = {'error': str(error)}, 400
+        except Exception as error:
+            self.log_error("%s failed: %r", url.path, error)
+            body, status = {'error': f"{type(error).__name__}: {error}"}, 500
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    # Unix socket peers have no address
+    def address_string(self):
+        return self.client_address[0] if self.client_address else 'unix'
+
+
+class UnixAnalysisServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+# Serve the loaded state until interrupted, on localhost:port or on a Unix socket
+def serve(state, port=8765, socket_path=None):
+    if socket_path is not None:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = UnixAnalysisServer(socket_path, AnalysisRequestHandler)
+        address = socket_path
+    else:
+        server = ThreadingHTTPServer(('127.0.0.1', port), AnalysisRequestHandler)
+        address = f"http://127.0.0.1:{server.server_address[1]}"
+    server.state = state
+    print(f"Serving {', '.join(list(state.surveys) + list(state.scores))} on {address}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if socket_path is not None and os.path.exists(socket_path):
+            os.remove(socket_path)
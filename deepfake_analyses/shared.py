@@ -0,0 +1,86 @@
+import contextlib
+import io
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from deepfake_analyses import trace
+
+# Everything a worker needs to find the published survey; small enough to pickle with every task
+SurveyHandle = namedtuple('SurveyHandle', ['name', 'shape', 'dtype', 'columns'])
+
+# The survey attached by this worker process, set once by the pool initializer
+_worker_survey = None
+
+
+def _open_shared_memory(name):
+    # Python 3.13+ can skip the resource tracker for segments this process does not own
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+# Copy the numeric survey columns once into one column-major shared memory block.
+# Returns the owning SharedMemory and the handle workers attach with.
+def publish_survey(df, dtype=np.float64):
+    numeric = df.select_dtypes('number')
+    shape = numeric.shape
+    size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    values = np.ndarray(shape, dtype=dtype, buffer=shm.buf, order='F')
+    values[:] = numeric.to_numpy(dtype=dtype)
+    return shm, SurveyHandle(shm.name, shape, np.dtype(dtype).str, list(numeric.columns))
+
+
+# Publish for the duration of a with block and free the memory afterwards
+@contextlib.contextmanager
+def published_survey(df, dtype=np.float64):
+    shm, handle = publish_survey(df, dtype)
+    try:
+        yield handle
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+# Read-only DataFrame over the shared block; every column is a view, nothing is copied
+def attach_survey(handle):
+    shm = _open_shared_memory(handle.name)
+    values = np.ndarray(handle.shape, dtype=np.dtype(handle.dtype), buffer=shm.buf, order='F')
+    values.flags.writeable = False
+    frame = pd.DataFrame({column: values[:, i] for i, column in enumerate(handle.columns)}, copy=False)
+    return shm, frame
+
+
+def _attach_worker(handle):
+    global _worker_survey
+    _worker_survey = attach_survey(handle)
+
+
+# Call function(survey, *args) on the shared survey, keeping what it prints and, when
+# tracing, the worker's trace events
+def _run_task(name, function, args, tracing):
+    if tracing:
+        trace.enable()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), trace.span(name):
+        result = function(_worker_survey[1], *args)
+    return result, output.getvalue(), trace.collect()
+
+
+# Run {name: (function, args)} in worker processes that all read the same published survey.
+# Returns {name: (result, printed output)} in the order of tasks.
+def run_on_shared_survey(df, tasks, jobs=None):
+    with published_survey(df) as handle:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_attach_worker, initargs=(handle,)) as executor:
+            futures = {name: executor.submit(_run_task, name, function, args, trace.is_enabled()) for name, (function, args) in tasks.items()}
+            results = {}
+            for name, future in futures.items():
+                result, output, events = future.result()
+                trace.add_events(events)
+                results[name] = (result, output)
+            return results
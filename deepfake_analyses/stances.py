@@ -0,0 +1,30 @@
+from deepfake_analyses import trace
+from deepfake_analyses.transitions import transition_tables, transition_test
+
+
+def print_stance_test(stance_title, t_stat, p_val):
+    significance = "Significant difference" if p_val < 0.05 else "No significant difference"
+    print(f"T-test for {stance_title}: t-statistic={t_stat:.2f}, p-value={p_val:.4f}")
+    print(f"{significance} in {stance_title} before and after the video.")
+
+
+# Paired t-test for each pair of pre and post influence question, from its transition table.
+# plot is called with (table, key) for every tested stance.
+@trace.traced
+def analyze_stances(df, pre_influence_cols, post_influence_cols, stance_titles, plot=None):
+    tables = transition_tables(df, pre_influence_cols, post_influence_cols)
+    t_test_results = {}
+    for key in pre_influence_cols:
+        table = tables.get(key)
+        if table is None or table.sum() == 0:
+            print(f"No data available for {pre_influence_cols[key]} and {post_influence_cols[key]}. Skipping...")
+            continue
+
+        t_stat, p_val = transition_test(table)
+        t_test_results[key] = (t_stat, p_val)
+        print_stance_test(stance_titles[key], t_stat, p_val)
+
+        if plot is not None:
+            plot(table, key)
+
+    return t_test_results
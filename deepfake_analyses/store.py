@@ -0,0 +1,163 @@
+import hashlib
+import json
+import math
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from deepfake_analyses.pipeline import code_version, hash_file
+
+# Results of the analysis stages in a local SQLite file. A run is keyed by the hash of its
+# input files, the analysis with the options that change its result, and the package source,
+# so a repeated request is answered from the store. Every number of a run is a row
+# (name, quantity, value) that can be queried and diffed across datasets and code versions;
+# the printed report is kept next to it.
+
+STORE_FILE = 'results.sqlite'
+
+# Options that change the result of each stored analysis; plotting options do not
+stored_analyses = {
+    'stances': [],
+    'blocks': [],
+    'aggregate': [],
+    'comparison': ['cluster'],
+    'regression-confbi': ['engine', 'cluster', 'video_effects', 'covariates'],
+    'regression-aligned': ['engine', 'cluster', 'video_effects', 'covariates'],
+    'regression-cred': [],
+}
+
+_schema = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    dataset TEXT NOT NULL,
+    label TEXT NOT NULL,
+    analysis TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    code_version TEXT NOT NULL,
+    report TEXT NOT NULL,
+    created TEXT NOT NULL,
+    UNIQUE (dataset, analysis, spec, code_version)
+);
+CREATE TABLE IF NOT EXISTS results (
+    run INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    quantity TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run, name, quantity)
+);
+"""
+
+
+# Hash of the input files of a run, in the given order
+def dataset_hash(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        hash_file(digest, path)
+    return digest.hexdigest()
+
+
+# Options of an analysis as canonical JSON, e.g. '{"cluster": true}'
+def analysis_spec(analysis, options):
+    return json.dumps({name: options[name] for name in stored_analyses[analysis]}, sort_keys=True)
+
+
+def _number(value):
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+# Rows of a describe() table, one per column and statistic
+def _frame_rows(frame, prefix=''):
+    return [(f'{prefix}{column}', str(statistic), _number(value))
+            for column in frame.columns for statistic, value in frame[column].items()]
+
+
+# (name, quantity, value) rows of what a CLI handler returns for each analysis; covariates are
+# the feature columns added to a regression design
+def result_rows(analysis, result, covariates=()):
+    if analysis == 'stances':
+        from deepfake_analyses.survey import stance_titles
+        return [(stance_titles[key], quantity, _number(value))
+                for key, (t_stat, p_val) in result.items() for quantity, value in [('t', t_stat), ('p', p_val)]]
+    if analysis in ('blocks', 'aggregate'):
+        return [row for block, frame in result.items() for row in _frame_rows(frame, f'{block}: ')]
+    if analysis == 'comparison':
+        return [(question, quantity, _number(value)) for question, values in result.items() for quantity, value in values.items()]
+    if analysis == 'regression-cred':
+        return [('fit', quantity, _number(value)) for quantity, value in result.items()]
+    from deepfake_analyses.multiverse import regression_terms
+    terms = (regression_terms + list(covariates))[-len(result.params):]
+    rows = []
+    for i, term in enumerate(terms):
+        rows += [(term, 'coef', _number(result.params[i])), (term, 'std err', _number(result.bse[i])),
+                 (term, 'p', _number(result.pvalues[i]))]
+    return rows + [('model', 'nobs', _number(result.nobs))]
+
+
+class ResultStore:
+    def __init__(self, path=STORE_FILE):
+        self.path = path
+        self.version = code_version()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        self._connection.executescript(_schema)
+
+    def close(self):
+        self._connection.close()
+
+    # Stored report and values of a run with the current code, or None
+    def get(self, dataset, analysis, spec):
+        with self._lock:
+            run = self._connection.execute(
+                'SELECT id, report FROM runs WHERE dataset = ? AND analysis = ? AND spec = ? AND code_version = ?',
+                (dataset, analysis, spec, self.version)).fetchone()
+        if run is None:
+            return None
+        return run[1], self.values(run[0])
+
+    # Store a run with the current code, replacing an earlier one with the same key; returns its id
+    def put(self, dataset, label, analysis, spec, rows, report=''):
+        created = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM runs WHERE dataset = ? AND analysis = ? AND spec = ? AND code_version = ?',
+                                     (dataset, analysis, spec, self.version))
+            run = self._connection.execute(
+                'INSERT INTO runs (dataset, label, analysis, spec, code_version, report, created) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (dataset, label, analysis, spec, self.version, report, created)).lastrowid
+            self._connection.executemany('INSERT OR REPLACE INTO results (run, name, quantity, value) VALUES (?, ?, ?, ?)',
+                                         [(run, name, quantity, value) for name, quantity, value in rows])
+        return run
+
+    # Stored runs, optionally only those of one analysis, of datasets whose label or hash starts
+    # with dataset, or of code versions starting with version
+    def runs(self, analysis=None, dataset=None, version=None):
+        conditions, parameters = [], []
+        if analysis is not None:
+            conditions.append('analysis = ?')
+            parameters.append(analysis)
+        if dataset is not None:
+            conditions.append('(label = ? OR dataset LIKE ?)')
+            parameters += [dataset, f'{dataset}%']
+        if version is not None:
+            conditions.append('code_version LIKE ?')
+            parameters.append(f'{version}%')
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        with self._lock:
+            return pd.read_sql_query(f'SELECT id, label, dataset, analysis, spec, code_version, created FROM runs{where} ORDER BY id',
+                                     self._connection, params=parameters, index_col='id')
+
+    # Values of one run, indexed by name and quantity
+    def values(self, run):
+        with self._lock:
+            values = pd.read_sql_query('SELECT name, quantity, value FROM results WHERE run = ? ORDER BY rowid',
+                                       self._connection, params=[int(run)])
+        return values.set_index(['name', 'quantity'])['value']
+
+    # Values of two runs side by side with their difference; names only one run has show NaN
+    def diff(self, run_a, run_b):
+        table = pd.concat({run_a: self.values(run_a), run_b: self.values(run_b)}, axis=1)
+        table['difference'] = table[run_b] - table[run_a]
+        return table
@@ -0,0 +1,127 @@
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from deepfake_analyses import trace
+
+# A score file is one JSON object of {key: [score, ...]}. Instead of building a Python list of
+# ints per key, the file is read in chunks and every chunk of scores is parsed with NumPy
+# straight into one preallocated int8 buffer, so a score costs one byte instead of a list slot
+# and an int object. null (a skipped item) is stored as missing_score.
+missing_score = -1
+
+_key_pattern = re.compile(rb'"((?:[^"\\]|\\.)*)"\s*:\s*([\[{])')
+_whitespace = b' \t\r\n'
+_max_digits = 3
+
+
+# Raised for content the streaming parser does not handle, e.g. {respondent: score} dicts
+class _UnsupportedFormat(Exception):
+    pass
+
+
+# Parse a run of complete comma-separated scores into out, returns how many were parsed
+def _parse_scores(segment, out):
+    characters = np.frombuffer(segment.translate(None, _whitespace), dtype=np.uint8)
+    if characters.size == 0:
+        return 0
+
+    # Fast path for the usual single-digit Likert codes: digits and commas alternate
+    digits = characters - ord('0')
+    if characters.size % 2 == 1 and np.all(digits[::2] < 10) and np.all(characters[1::2] == ord(',')):
+        out[:characters.size // 2 + 1] = digits[::2]
+        return characters.size // 2 + 1
+
+    commas = np.flatnonzero(characters == ord(','))
+    starts = np.concatenate(([0], commas + 1))
+    lengths = np.concatenate((commas, [characters.size])) - starts
+    null = (lengths == 4) & (characters[np.minimum(starts, characters.size - 1)] == ord('n'))
+    number = ~null
+
+    is_digit = digits[characters != ord(',')] < 10
+    if not np.all(is_digit | np.repeat(null, lengths)) or np.any(lengths[number] < 1) or np.any(lengths[number] > _max_digits):
+        raise _UnsupportedFormat
+
+    values = np.zeros(len(starts), dtype=np.int16)
+    for offset in range(_max_digits):
+        has_digit = number & (lengths > offset)
+        values[has_digit] = values[has_digit] * 10 + digits[starts[has_digit] + offset]
+    if np.any(values > np.iinfo(np.int8).max):
+        raise _UnsupportedFormat
+    values[null] = missing_score
+
+    out[:len(values)] = values
+    return len(values)
+
+
+def _stream_score_lists(file_path, chunk_size):
+    # Every score takes at least one digit and one separator
+    buffer = np.empty(os.path.getsize(file_path) // 2 + 1, dtype=np.int8)
+    used = 0
+    spans = {}
+
+    with open(file_path, 'rb') as f:
+        text = f.read(chunk_size)
+        if not text.lstrip().startswith(b'{'):
+            raise _UnsupportedFormat
+        eof = False
+        key = None
+        while True:
+            if key is None:
+                match = _key_pattern.search(text)
+                if match is None:
+                    if eof:
+                        break
+                    chunk = f.read(chunk_size)
+                    eof = not chunk
+                    text += chunk
+                    continue
+                if match.group(2) == b'{':
+                    raise _UnsupportedFormat
+                key = json.loads(b'"' + match.group(1) + b'"')
+                start = used
+                text = text[match.end():]
+                continue
+
+            # Parse up to the end of the list or, mid-list, up to the last complete score
+            end = text.find(b']')
+            cut = end if end >= 0 else text.rfind(b',')
+            if cut >= 0:
+                used += _parse_scores(text[:cut], buffer[used:])
+                text = text[cut + 1:]
+            if end >= 0:
+                spans[key] = (start, used)
+                key = None
+                continue
+            if eof:
+                raise _UnsupportedFormat
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            text += chunk
+
+    # Give the unused tail of the buffer back; the arrays are views of what is left
+    buffer.resize(used, refcheck=False)
+    return {key: buffer[start:end] for key, (start, end) in spans.items()}
+
+
+# Load a score file as {key: int8 array}, missing_score marking skipped items. Files the
+# streaming parser does not handle ({respondent: score} dicts, non-integer scores) are
+# loaded with json.load as before.
+@trace.traced
+def load_scores(file_path, chunk_size=1 << 20):
+    try:
+        return _stream_score_lists(file_path, chunk_size)
+    except _UnsupportedFormat:
+        with open(file_path, 'r') as f:
+            return json.load(f)
+
+
+# Load several score files concurrently, e.g. the credible and the share file. Threads are
+# enough because reading and the NumPy parsing release the GIL, and the arrays need no copying
+# back from a worker process.
+def load_score_files(*file_paths):
+    with ThreadPoolExecutor(max_workers=max(len(file_paths), 1)) as executor:
+        return list(executor.map(load_scores, file_paths))
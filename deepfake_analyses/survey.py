@@ -0,0 +1,161 @@
+import pandas as pd
+
+from deepfake_analyses import trace
+
+# Metadata columns removed in the first cleaning step
+initial_columns_to_delete = ["StartDate", "EndDate", "Status", "IPAddress", "Progress", "Duration (in seconds)"]
+
+additional_columns_to_delete = ["RecordedDate", "ResponseId", "RecipientLastName", "RecipientFirstName",
+                                "RecipientEmail", "ExternalReference", "LocationLatitude", "LocationLongitude",
+                                "DistributionChannel", "UserLanguage"]
+
+# Political stance questions before and after the videos
+pre_influence_cols = {
+    "health": "stance_health",
+    "climate": "stance_climate",
+    "immigration": "stance_immigration",
+    "guns": "stance_guns",
+    "abortion": "stance_abortion",
+    "warukr": "stance_warukr"
+}
+
+post_influence_cols = {
+    "health": "2stance_health",
+    "climate": "2stance_climate",
+    "immigration": "2stance_immigration",
+    "guns": "2stance_guns",
+    "abortion": "2stance_abortion",
+    "warukr": "2stance_warukr"
+}
+
+stance_titles = {
+    "health": "healthcare policy",
+    "climate": "climate-change mitigation policy",
+    "immigration": "immigration policy",
+    "guns": "gun control policy",
+    "abortion": "abortion policy",
+    "warukr": "ukraine war policy"
+}
+
+descriptions = {
+    "healthcare policy": [
+        "Completely publicly funded",
+        "Moderately publicly funded",
+        "Somewhat publicly funded",
+        "Neutral",
+        "Somewhat privatized",
+        "Moderately privatized",
+        "Completely privatized"
+    ],
+    "climate-change mitigation policy": [
+        "Completely in favor",
+        "Moderately in favor",
+        "Somewhat in favor",
+        "Neutral",
+        "Somewhat against",
+        "Moderately against",
+        "Completely against"
+    ],
+    "immigration policy": [
+        "Completely open borders, [...]",
+        "Moderately open borders [...]",
+        "Somewhat open borders [...]",
+        "Neutral",
+        "Somewhat strict [...]",
+        "Moderately strict [...]",
+        "Completely closing borders [...]"
+    ],
+    "gun control policy": [
+        "Everybody is allowed [...]",
+        "Widespread ownership, [...]",
+        "Controlled ownership [...]",
+        "Neutral",
+        "Significant restrictions, [...]",
+        "Highly restricted, [...]",
+        "No one is allowed [...]"
+    ],
+    "abortion policy": [
+        "Unrestricted access [...]",
+        "Few restrictions, [...]",
+        "Moderate restrictions, [...]",
+        "Neutral",
+        "Restricted access, [...]",
+        "Very restricted access, [...]",
+        "Complete ban on abortion"
+    ],
+    "ukraine war policy": [
+        "Fully support [...] intervention, [...]",
+        "Support intervention [...] significant aid [...]",
+        "Support intervention [...] some [aid]",
+        "Neutral",
+        "Oppose intervention, [...]",
+        "Strongly oppose intervention, [...]",
+        "Completely oppose [intervention]"
+    ]
+}
+
+# Answer labels of the question blocks
+mapping_questions = {
+    1: "Strongly disagree",
+    2: "Disagree",
+    3: "Somewhat disagree",
+    4: "Neither agree nor disagree",
+    5: "Somewhat agree",
+    6: "Agree",
+    7: "Strongly agree"
+}
+
+mapping_share = {
+    1: "Extremely unlikely",
+    2: "Moderately unlikely",
+    3: "Slightly unlikely",
+    4: "Neither likely nor unlikely",
+    5: "Slightly likely",
+    6: "Moderately likely",
+    7: "Extremely likely"
+}
+
+# Question blocks, one per video; Trump_Bonus is the real video
+block_bases = [
+    'Biden_1X1', 'Biden_1X2', 'Biden_1X3', 'Biden_1X4', 'Biden_1X5', 'Biden_3X1', 'Biden_3X2', 'Biden_3X3', 'Biden_3X4', 'Biden_3X5',
+    'Trump_1X1', 'Trump_1X2', 'Trump_1X3', 'Trump_1X4', 'Trump_1X5', 'Trump_3X1', 'Trump_3X2', 'Trump_3X3', 'Trump_3X4', 'Trump_3X5',
+    'Trump_Bonus'
+]
+
+question_suffixes = ['__1', '__2', '__3', '_share']
+
+blocks = {base: [f"{base}{suffix}" for suffix in question_suffixes] for base in block_bases}
+
+
+# Exclusion bitmask written by the quality screening, see screening.py
+quality_flags_column = 'QualityFlags'
+
+
+# pd.read_csv, recorded in the trace with the size of what was read
+def read_csv(file_path, **kwargs):
+    with trace.span('pd.read_csv', file=str(file_path)) as event_args:
+        df = pd.read_csv(file_path, **kwargs)
+        event_args.update(rows=df.shape[0], columns=df.shape[1])
+    return df
+
+
+# Load the recoded CSV file, skip descriptor and JSON rows
+def load_survey(file_path):
+    return read_csv(file_path, skiprows=[1, 2])
+
+
+# Only take valid answers into account: finished and, for screened exports, not flagged
+def valid_responses(df):
+    valid = df['Finished'] == 1
+    if quality_flags_column in df.columns:
+        valid &= df[quality_flags_column] == 0
+    return valid
+
+
+@trace.traced
+def filter_finished(df):
+    return df[valid_responses(df)]
+
+
+def load_and_filter_data(file_path):
+    return filter_finished(load_survey(file_path))
@@ -0,0 +1,105 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from deepfake_analyses.survey import block_bases, blocks, post_influence_cols, pre_influence_cols
+
+# Column order of a Qualtrics export: metadata, stances before the videos, blocks, stances after
+metadata_columns = ["StartDate", "EndDate", "Status", "IPAddress", "Progress", "Duration (in seconds)", "Finished",
+                    "RecordedDate", "ResponseId", "RecipientLastName", "RecipientFirstName", "RecipientEmail",
+                    "ExternalReference", "LocationLatitude", "LocationLongitude", "DistributionChannel", "UserLanguage"]
+
+export_columns = (metadata_columns + list(pre_influence_cols.values())
+                  + [q for questions in blocks.values() for q in questions] + list(post_influence_cols.values()))
+
+_START = np.datetime64('2024-05-01T08:00:00')
+
+
+# The two Qualtrics header rows below the column names: question text and import ids
+def _header_rows():
+    question_text = [column.replace('_', ' ') for column in export_columns]
+    import_ids = [json.dumps({"ImportId": f"QID{i}"}) for i in range(len(export_columns))]
+    return pd.DataFrame([question_text, import_ids], columns=export_columns)
+
+
+# One chunk of respondents. Answers are already numeric codes, so recoding is a no-op.
+def _generate_chunk(rng, first_id, n, missing_rate, unfinished_rate):
+    finished = (rng.random(n) >= unfinished_rate).astype(np.int8)
+    duration = rng.lognormal(np.log(600), 0.6, n).astype(np.int64) + 30
+    start = _START + rng.integers(0, 30 * 24 * 3600, n).astype('timedelta64[s]')
+    end = start + duration.astype('timedelta64[s]')
+    ids = np.char.add('R_', np.char.zfill((first_id + np.arange(n)).astype(str), 15))
+
+    columns = {
+        "StartDate": start.astype(str),
+        "EndDate": end.astype(str),
+        "Status": np.zeros(n, dtype=np.int8),
+        "IPAddress": np.char.add('10.0.', (np.arange(n) % 65536).astype(str)),
+        "Progress": np.where(finished == 1, 100, rng.integers(5, 99, n)),
+        "Duration (in seconds)": duration,
+        "Finished": finished,
+        "RecordedDate": end.astype(str),
+        "ResponseId": ids,
+        "RecipientLastName": np.full(n, ''),
+        "RecipientFirstName": np.full(n, ''),
+        "RecipientEmail": np.full(n, ''),
+        "ExternalReference": np.full(n, ''),
+        "LocationLatitude": np.round(rng.uniform(25, 49, n), 4),
+        "LocationLongitude": np.round(rng.uniform(-124, -67, n), 4),
+        "DistributionChannel": np.full(n, 'anonymous'),
+        "UserLanguage": np.full(n, 'EN'),
+    }
+
+    # Stances before and after, the videos shift a few respondents by one step
+    pre = rng.integers(1, 8, (n, len(pre_influence_cols)))
+    post = np.clip(pre + rng.choice([-1, 0, 0, 0, 1], size=pre.shape), 1, 7)
+
+    # Block answers share a per-respondent credulity so that items correlate like real ratings
+    credulity = rng.normal(0, 1, (n, 1))
+    items = np.clip(np.rint(4 + 1.2 * credulity + rng.normal(0, 1.3, (n, 4 * len(block_bases)))), 1, 7)
+
+    answers = np.hstack([pre, items, post]).astype(np.int8)
+    missing = rng.random(answers.shape) < missing_rate
+    answer_columns = list(pre_influence_cols.values()) + [q for questions in blocks.values() for q in questions] + list(post_influence_cols.values())
+    for i, column in enumerate(answer_columns):
+        columns[column] = pd.arrays.IntegerArray(answers[:, i].copy(), missing[:, i].copy())
+
+    return pd.DataFrame(columns, columns=export_columns)
+
+
+# Synthetic survey in memory, as load_survey reads an export: answers as floats, NaN if missing
+def generate_survey(respondents, missing_rate=0.05, unfinished_rate=0.1, seed=0):
+    df = _generate_chunk(np.random.default_rng([seed, 0]), 0, respondents, missing_rate, unfinished_rate)
+    answer_columns = list(pre_influence_cols.values()) + [q for questions in blocks.values() for q in questions] + list(post_influence_cols.values())
+    return df.astype(dict.fromkeys(answer_columns, float))
+
+
+# Write a synthetic raw export with the given number of respondents, written in chunks so
+# that 10M respondents never have to fit in memory at once
+def generate_export(file_path, respondents, missing_rate=0.05, unfinished_rate=0.1, seed=0, chunk_size=100_000):
+    _header_rows().to_csv(file_path, index=False)
+    for chunk_index, first_id in enumerate(range(0, respondents, chunk_size)):
+        rng = np.random.default_rng([seed, chunk_index])
+        n = min(chunk_size, respondents - first_id)
+        chunk = _generate_chunk(rng, first_id, n, missing_rate, unfinished_rate)
+        chunk.to_csv(file_path, mode='a', header=False, index=False)
+
+
+# Credibility (__2) and sharing (_share) score files for the 5_ regressions, one list per
+# deepfake block like the hand-prepared files, streamed key by key
+def generate_scores(credible_path, share_path, respondents, missing_rate=0.05, seed=0):
+    rng = np.random.default_rng([seed, 1])
+    deepfake_bases = [base for base in block_bases if base != 'Trump_Bonus']
+    with open(credible_path, 'w') as credible_file, open(share_path, 'w') as share_file:
+        credible_file.write('{')
+        share_file.write('{')
+        for i, base in enumerate(deepfake_bases):
+            credible = rng.integers(1, 8, respondents)
+            share = np.clip(np.rint(1.5 + 0.5 * credible + rng.normal(0, 1.2, respondents)), 1, 7).astype(int)
+            answered = rng.random(respondents) >= missing_rate
+            separator = ', ' if i else ''
+            credible_file.write(f'{separator}"{base}__2": [' + ', '.join(map(str, credible[answered])) + ']')
+            share_file.write(f'{separator}"{base}_share": [' + ', '.join(map(str, share[answered])) + ']')
+        credible_file.write('}')
+        share_file.write('}')
@@ -0,0 +1,104 @@
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows has no resource module, peak memory is then not recorded
+    resource = None
+
+# Recorded events in Chrome trace format, or None while tracing is off. Every instrumented
+# function only checks this one global when tracing is off.
+_events = None
+
+
+def enable():
+    global _events
+    _events = []
+
+
+def is_enabled():
+    return _events is not None
+
+
+def collect():
+    return list(_events or [])
+
+
+# Merge events recorded by worker processes
+def add_events(events):
+    if _events is not None:
+        _events.extend(events)
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _shape_args(prefix, value):
+    shape = getattr(value, 'shape', None)
+    if isinstance(shape, tuple) and shape:
+        return {f'{prefix}_rows': int(shape[0]), f'{prefix}_columns': int(shape[1]) if len(shape) > 1 else 1}
+    return {}
+
+
+# Time a block of work. The yielded dict can be filled with extra arguments for the event.
+@contextlib.contextmanager
+def span(name, **args):
+    if _events is None:
+        yield args
+        return
+
+    start_us = time.time_ns() // 1000
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    start_peak = _peak_rss_mb()
+    try:
+        yield args
+    finally:
+        end_peak = _peak_rss_mb()
+        args['cpu_ms'] = (time.process_time() - start_cpu) * 1000
+        if end_peak is not None:
+            args['peak_rss_mb'] = end_peak
+            args['peak_rss_growth_mb'] = end_peak - start_peak
+        _events.append({
+            'name': name, 'ph': 'X', 'ts': start_us, 'dur': (time.perf_counter() - start_wall) * 1e6,
+            'pid': os.getpid(), 'tid': threading.get_ident(), 'args': args,
+        })
+
+
+# Point event, e.g. a cache hit
+def instant(name, **args):
+    if _events is not None:
+        _events.append({'name': name, 'ph': 'i', 's': 'p', 'ts': time.time_ns() // 1000,
+                        'pid': os.getpid(), 'tid': threading.get_ident(), 'args': args})
+
+
+# Record every call of the decorated function, with the shape of its first array/DataFrame
+# argument and of its result
+def traced(function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if _events is None:
+            return function(*args, **kwargs)
+
+        shapes = next((_shape_args('input', arg) for arg in args if _shape_args('input', arg)), {})
+        with span(function.__name__, **shapes) as event_args:
+            result = function(*args, **kwargs)
+            event_args.update(_shape_args('output', result))
+        return result
+    return wrapper
+
+
+def write(file_path):
+    cache_hits = sum(1 for event in _events or [] if event['name'] == 'cache hit')
+    with open(file_path, 'w') as f:
+        json.dump({'traceEvents': _events or [], 'otherData': {'cache_hits': cache_hits}}, f)
@@ -0,0 +1,124 @@
+import numpy as np
+
+from deepfake_analyses import npstats, trace
+
+# Every 3_ statistic of a stance item is a function of how its answers moved between the pre
+# and the post question, so each item is stored as one levels x levels table of (pre, post)
+# answer counts, pre answers along the rows. The 49 numbers of a table add up across files
+# and subsets of respondents, and the t-test, histograms and boxplots are all read from them.
+
+# Answer codes of every Likert item are 1 to levels
+levels = 7
+codes = np.arange(1, levels + 1)
+
+
+# Count, mean and sum of squared deviations of the values counted in a histogram
+def histogram_moments(counts, values=codes):
+    n = counts.sum()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = (counts * values).sum() / n
+    squares = (counts * (values - mean) ** 2).sum()
+    return n, mean, squares
+
+
+# Quantile of the answers counted in a Likert histogram, interpolated linearly like pandas
+def histogram_quantile(counts, q):
+    n = counts.sum()
+    if n == 0:
+        return np.nan
+    position = (n - 1) * q
+    cumulative = np.cumsum(counts)
+    lower = codes[np.searchsorted(cumulative, np.floor(position), side='right')]
+    upper = codes[np.searchsorted(cumulative, np.ceil(position), side='right')]
+    return lower + (position - np.floor(position)) * (upper - lower)
+
+
+# Answers per code of every column of a (responses x columns) array in one bincount, as a
+# (columns x levels) array; missing answers are left out
+def answer_histograms(values, columns=None):
+    values = np.asarray(values, dtype=float)
+    answered = ~np.isnan(values)
+    invalid = answered & ((values < 1) | (values > levels) | (values != np.floor(values)))
+    if np.any(invalid):
+        column = np.flatnonzero(invalid.any(axis=0))[0]
+        raise ValueError(f"Column {column if columns is None else columns[column]} has answers outside the codes 1 to {levels}, recode it first.")
+    item = np.broadcast_to(np.arange(values.shape[1]), values.shape)[answered]
+    cells = item * levels + values[answered].astype(np.int64) - 1
+    return np.bincount(cells, minlength=values.shape[1] * levels).reshape(values.shape[1], levels)
+
+
+# Transition table of every stance whose pre and post columns are both in df, counted in one
+# bincount over all stance columns. Respondents missing either answer are left out of that stance.
+@trace.traced
+def transition_tables(df, pre_influence_cols, post_influence_cols):
+    keys = [key for key, pre_col in pre_influence_cols.items()
+            if pre_col in df.columns and post_influence_cols[key] in df.columns]
+    pre = df[[pre_influence_cols[key] for key in keys]].to_numpy(dtype=float)
+    post = df[[post_influence_cols[key] for key in keys]].to_numpy(dtype=float)
+
+    paired = ~np.isnan(pre) & ~np.isnan(post)
+    for answers, columns in [(pre, pre_influence_cols), (post, post_influence_cols)]:
+        invalid = paired & ((answers < 1) | (answers > levels) | (answers != np.floor(answers)))
+        if np.any(invalid):
+            column = columns[keys[np.flatnonzero(invalid.any(axis=0))[0]]]
+            raise ValueError(f"Column {column} has answers outside the codes 1 to {levels}, recode it first.")
+
+    item = np.broadcast_to(np.arange(len(keys)), pre.shape)[paired]
+    cells = (item * levels + pre[paired].astype(np.int64) - 1) * levels + post[paired].astype(np.int64) - 1
+    counts = np.bincount(cells, minlength=len(keys) * levels * levels).reshape(len(keys), levels, levels)
+    return dict(zip(keys, counts))
+
+
+# Add up the transition tables of several files or subsets, stance by stance
+def merge_transition_tables(*tables):
+    merged = {}
+    for table in tables:
+        for key, counts in table.items():
+            merged[key] = merged[key] + counts if key in merged else np.array(counts)
+    return merged
+
+
+def pre_histogram(table):
+    return table.sum(axis=1)
+
+
+def post_histogram(table):
+    return table.sum(axis=0)
+
+
+# Respondents per change post - pre, from -(levels - 1) to levels - 1
+def change_histogram(table):
+    offsets = codes[None, :] - codes[:, None] + levels - 1
+    return np.bincount(offsets.ravel(), weights=np.asarray(table).ravel(), minlength=2 * levels - 1)
+
+
+# Paired t-test of post against pre, the same as ttest_rel on the answers themselves
+def transition_test(table):
+    counts = change_histogram(table)
+    return npstats.ttest_from_moments(*histogram_moments(counts, np.arange(-(levels - 1), levels)))
+
+
+# Respondents who moved to a lower code, kept their answer, and moved to a higher code
+def sign_counts(table):
+    table = np.asarray(table)
+    return {'decreased': int(np.tril(table, -1).sum()), 'unchanged': int(np.trace(table)),
+            'increased': int(np.triu(table, 1).sum())}
+
+
+# Boxplot statistics of the answers counted in a histogram, as matplotlib's boxplot computes
+# them from the answers (whiskers at the furthest answers within 1.5 IQR), for Axes.bxp
+def boxplot_stats(counts, label=None, whis=1.5):
+    q1, median, q3 = (histogram_quantile(counts, q) for q in (0.25, 0.5, 0.75))
+    answered = codes[counts > 0]
+    low = answered[answered >= q1 - whis * (q3 - q1)]
+    high = answered[answered <= q3 + whis * (q3 - q1)]
+    return {
+        'label': label,
+        'mean': histogram_moments(counts)[1],
+        'med': median,
+        'q1': q1,
+        'q3': q3,
+        'whislo': low.min() if low.size and low.min() <= q1 else q1,
+        'whishi': high.max() if high.size and high.max() >= q3 else q3,
+        'fliers': answered[(answered < q1 - whis * (q3 - q1)) | (answered > q3 + whis * (q3 - q1))],
+    }
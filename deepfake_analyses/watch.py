@@ -0,0 +1,184 @@
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from deepfake_analyses import npstats
+from deepfake_analyses.blocks import question_types
+from deepfake_analyses.cleaning import recode_column
+from deepfake_analyses.survey import (blocks, post_influence_cols, pre_influence_cols, quality_flags_column,
+                                      stance_titles)
+from deepfake_analyses.transitions import codes, histogram_quantile
+
+
+# Running count, mean and sum of squared deviations per column (Welford), updated one batch of
+# rows at a time by merging the batch's own moments (Chan et al.), NaN skipped
+class OnlineMoments:
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.n = np.zeros(len(self.columns))
+        self.mean = np.zeros(len(self.columns))
+        self.m2 = np.zeros(len(self.columns))
+
+    def update(self, values):
+        valid = ~np.isnan(values)
+        n_batch = valid.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_batch = np.where(n_batch > 0, np.where(valid, values, 0.0).sum(axis=0) / n_batch, 0.0)
+        m2_batch = (np.where(valid, values - mean_batch, 0.0) ** 2).sum(axis=0)
+
+        n = self.n + n_batch
+        delta = mean_batch - self.mean
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(n > 0, n_batch / n, 0.0)
+        self.m2 = self.m2 + m2_batch + delta ** 2 * self.n * weight
+        self.mean = self.mean + delta * weight
+        self.n = n
+
+    def variance(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.n > 1, self.m2 / (self.n - 1), np.nan)
+
+
+# Reads the rows appended to a growing export since the last call. Only complete lines are
+# consumed; a half-written last row is left for the next call.
+class ExportTail:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.offset = 0
+        self.columns = None
+
+    # New rows as a DataFrame of text, None if nothing new. Raises EOFError if the file shrank,
+    # e.g. because it was replaced by a different export.
+    def read_new_rows(self):
+        size = os.path.getsize(self.file_path)
+        if size < self.offset:
+            raise EOFError(f"{self.file_path} is shorter than what was already read.")
+        if size == self.offset:
+            return None
+
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        end = data.rfind(b'\n') + 1
+        # A newline inside a quoted field does not end a row
+        while end > 0 and data.count(b'"', 0, end) % 2:
+            end = data.rfind(b'\n', 0, end - 1) + 1
+        if end == 0:
+            return None
+
+        if self.columns is None:
+            # Column names and the two Qualtrics header rows must be complete first
+            rows = pd.read_csv(io.BytesIO(data[:end]), dtype=str, keep_default_na=False)
+            if len(rows) < 2:
+                return None
+            self.columns = list(rows.columns)
+            rows = rows.iloc[2:].copy()
+        else:
+            rows = pd.read_csv(io.BytesIO(data[:end]), header=None, names=self.columns, dtype=str, keep_default_na=False)
+        self.offset += end
+        return rows
+
+
+# Online 3_ stance shifts and 4_ block statistics of the valid responses seen so far
+class LiveStatistics:
+    def __init__(self, mappings=None, exclude='Trump_Bonus'):
+        self.mappings = mappings or {}
+        self.rows_read = 0
+        self.responses = 0
+        self.stances = OnlineMoments(pre_influence_cols)
+        self.block_columns = [q for questions in blocks.values() for q in questions]
+        self.items = OnlineMoments(self.block_columns)
+        # Answers per Likert code of every question type, pooled over the deepfake blocks
+        self.deepfake_columns = {suffix: [block + suffix for block in blocks if block != exclude] for suffix in question_types}
+        self.histograms = {suffix: np.zeros(len(codes), dtype=np.int64) for suffix in question_types}
+
+    @staticmethod
+    def _numeric(rows, columns):
+        return np.column_stack([pd.to_numeric(rows[column], errors='coerce').to_numpy(dtype=float)
+                                if column in rows.columns else np.full(len(rows), np.nan) for column in columns])
+
+    # Add a batch of new rows (text, as read by ExportTail); O(batch) whatever came before
+    def update(self, rows):
+        self.rows_read += len(rows)
+        for column, mapping in self.mappings.items():
+            if column in rows.columns:
+                rows = recode_column(rows, column, mapping)
+
+        valid = pd.to_numeric(rows['Finished'], errors='coerce') == 1
+        if quality_flags_column in rows.columns:
+            valid &= pd.to_numeric(rows[quality_flags_column], errors='coerce') == 0
+        rows = rows[valid.to_numpy()]
+        if rows.empty:
+            return
+        self.responses += len(rows)
+
+        pre = self._numeric(rows, pre_influence_cols.values())
+        post = self._numeric(rows, post_influence_cols.values())
+        self.stances.update(post - pre)
+
+        items = self._numeric(rows, self.block_columns)
+        self.items.update(items)
+        position = {column: i for i, column in enumerate(self.block_columns)}
+        for suffix, columns in self.deepfake_columns.items():
+            answers = items[:, [position[column] for column in columns]]
+            for i, code in enumerate(codes):
+                self.histograms[suffix][i] += np.count_nonzero(answers == code)
+
+    def stance_shifts(self):
+        t_stat, p_val = npstats.ttest_from_moments(self.stances.n, self.stances.mean, self.stances.m2)
+        return pd.DataFrame({'n': self.stances.n.astype(int), 'mean change': self.stances.mean, 't': t_stat, 'p': p_val},
+                            index=[stance_titles[key] for key in self.stances.columns])
+
+    # Mean of every block question, one row per block
+    def block_means(self):
+        means = np.where(self.items.n > 0, self.items.mean, np.nan).reshape(len(blocks), len(question_types))
+        return pd.DataFrame(means, index=list(blocks), columns=list(question_types.values()))
+
+    def aggregate(self):
+        return pd.DataFrame({
+            'Mean': [counts @ codes / counts.sum() if counts.sum() else np.nan for counts in self.histograms.values()],
+            'Median': [histogram_quantile(counts, 0.5) for counts in self.histograms.values()],
+        }, index=list(question_types.values())).T
+
+
+def print_live_summary(statistics):
+    print(f"\n[{time.strftime('%H:%M:%S')}] {statistics.rows_read} rows read, {statistics.responses} valid responses")
+    with pd.option_context('display.width', None, 'display.precision', 3):
+        print("\nStance shift (post - pre):")
+        print(statistics.stance_shifts())
+        print("\nBlock means:")
+        print(statistics.block_means())
+        print("\nAggregated deepfake blocks:")
+        print(statistics.aggregate())
+
+
+# Follow a growing export: read new rows every poll seconds, update the statistics with them
+# only, and print a summary at most every interval seconds. once reads what is there, prints
+# and returns. A file that shrinks (a new export replacing it) is read again from the start.
+def watch_export(file_path, mappings=None, interval=10.0, poll=1.0, once=False, report=print_live_summary):
+    tail = ExportTail(file_path)
+    statistics = LiveStatistics(mappings)
+    last_report = None
+    changed = False
+    while True:
+        try:
+            rows = tail.read_new_rows()
+        except EOFError:
+            tail = ExportTail(file_path)
+            statistics = LiveStatistics(mappings)
+            continue
+        if rows is not None and len(rows):
+            statistics.update(rows)
+            changed = True
+
+        now = time.monotonic()
+        if once or (changed and (last_report is None or now - last_report >= interval)):
+            report(statistics)
+            last_report = now
+            changed = False
+        if once:
+            return statistics
+        time.sleep(poll)